@@ -2,14 +2,13 @@ import asyncio
 import os
 import logging
 from decimal import Decimal
-from src.config.binance_config import loadSettings
+from src.config.binance_config import Settings, loadSettings
 from src.exchanges.binance_client import BinanceClient
 from src.utils.rate_limiter import RateLimiter
 from src.utils.logger import setupLogger
 
-async def cleanup():
-    # 1. 加载配置与日志
-    settings = loadSettings()
+async def cleanup(settings: Settings):
+    # 1. 初始化日志 (配置由入口处统一加载，避免重复解析 .env)
     setupLogger(logLevel="INFO")
     logger = logging.getLogger("cleanup")
     
@@ -40,9 +39,7 @@ async def cleanup():
         logger.info("🎉 环境清理完成！现在你可以安全启动机器人了。")
         
     except Exception as e:
-        logger.error(f"❌ 清理失败: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception("❌ 清理失败: %s", e)
     finally:
         # 确保异步客户端正确关闭 (V3.0 接口名由 close 改为 disconnect)
         await client.disconnect()
@@ -54,4 +51,4 @@ if __name__ == "__main__":
         os.environ["HTTPS_PROXY"] = settings.proxyUrl
         os.environ["HTTP_PROXY"] = settings.proxyUrl
         
-    asyncio.run(cleanup())
+    asyncio.run(cleanup(settings))
@@ -1,4 +1,4 @@
-import { useEffect } from "react";
+import { useCallback, useEffect } from "react";
 import {
     X,
     Bell,
@@ -58,15 +58,15 @@ export function NotificationDrawer({ isOpen, onClose, onUnreadChange }: Notifica
     });
 
     // 3. 监听实时 WebSocket 通道
-    const { lastMessage } = useWebSocket();
-
-    useEffect(() => {
-        if (lastMessage?.type === "NOTIFICATION") {
+    // NOTE: 使用逐条回调而非 lastMessage：同一帧内合并的多条消息只会留下最后一条 lastMessage
+    const handleMessage = useCallback((msg: any) => {
+        if (msg?.type === "NOTIFICATION") {
             // 实时追加或重新拉取
             refetch();
             // 如果是在关闭状态下收到消息，可以触发系统提示声或震动（可选）
         }
-    }, [lastMessage, refetch]);
+    }, [refetch]);
+    useWebSocket(handleMessage);
 
     // 计算未读数
     const unreadCount = notifications.filter((n: Notification) => !n.is_read).length;
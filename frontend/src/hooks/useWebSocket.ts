@@ -24,8 +24,12 @@ export function useWebSocket(onMessage?: (data: any) => void) {
         socket.onmessage = (event) => {
             try {
                 const data = JSON.parse(event.data);
-                setLastMessage(data);
-                if (onMessage) onMessage(data);
+                // 后端会把短时间内的多条私有消息合并为一个数组帧，逐条分发
+                const messages = Array.isArray(data) ? data : [data];
+                for (const msg of messages) {
+                    setLastMessage(msg);
+                    if (onMessage) onMessage(msg);
+                }
             } catch (e) {
                 console.warn("WS Message Parse Error:", e);
             }
@@ -13,12 +13,17 @@ from src.config.binance_config import loadSettings
 from src.utils.logger import setupLogger
 from src.utils.rate_limiter import RateLimiter
 from src.utils.notifier import Notifier
+from src.utils.http import get_shared_session, close_shared_session
 from src.exchanges.binance_client import BinanceClient
 from src.strategies.grid_strategy import GridStrategy
 
 logger = logging.getLogger(__name__)
 
 
+class _ShutdownRequested(Exception):
+    """收到关闭信号时在 TaskGroup 内抛出，用于取消全部 WebSocket 任务"""
+
+
 async def startHealthCheckServer(port: int):
     """启动轻量级健康检查服务，专为 Cloud Run/Serverless 探针设计"""
     from aiohttp import web
@@ -77,13 +82,16 @@ async def main() -> None:
     # ============================================
     # 3. 初始化核心组件
     # ============================================
+    # NOTE: 代理环境变量已设置完毕，通知器与交易所客户端共用同一连接池
+    session = get_shared_session()
     rateLimiter = RateLimiter()
     notifier = Notifier(
         botToken=settings.telegramBotToken,
         chatId=settings.telegramChatId,
         proxyUrl=settings.proxyUrl,
+        session=session,
     )
-    client = BinanceClient(settings=settings, rateLimiter=rateLimiter)
+    client = BinanceClient(settings=settings, rateLimiter=rateLimiter, connector=session.connector)
     strategy = GridStrategy(settings=settings, client=client, notifier=notifier)
 
     # ============================================
@@ -110,42 +118,51 @@ async def main() -> None:
 
     # NOTE: Windows 不完整支持 loop.add_signal_handler，
     # 使用 signal.signal 兼容跨平台
+    loop = asyncio.get_running_loop()
     try:
-        loop = asyncio.get_running_loop()
         for sig in (signal.SIGINT, signal.SIGTERM):
             loop.add_signal_handler(sig, onSignal)
     except NotImplementedError:
-        # Windows 回退方案
-        signal.signal(signal.SIGINT, lambda s, f: onSignal())
+        # Windows 回退方案：信号处理函数不在事件循环上下文中执行，
+        # asyncio.Event.set() 非线程安全，必须经 call_soon_threadsafe 投递回事件循环
+        windowsSignals = [signal.SIGINT]
+        if hasattr(signal, "SIGBREAK"):
+            windowsSignals.append(signal.SIGBREAK)  # Ctrl+Break
+        for sig in windowsSignals:
+            signal.signal(sig, lambda s, f: loop.call_soon_threadsafe(onSignal))
 
     # ============================================
     # 6. 启动 WebSocket 任务
     # ============================================
-    tasks: list[asyncio.Task] = []
-
+    # NOTE: TaskGroup 提供结构化并发：任一流异常退出会自动取消其余流，
+    # 收到关闭信号时抛出 _ShutdownRequested 统一展开整个任务组
     try:
-        # 实时行情流
-        tradeStreamTask = asyncio.create_task(
-            client.startTradeStream(onPrice=strategy.onPriceUpdate),
-            name="trade_stream",
-        )
-        tasks.append(tradeStreamTask)
-
-        # 用户数据流（订单状态更新）
-        userStreamTask = asyncio.create_task(
-            client.startUserDataStream(onOrderUpdate=strategy.onOrderUpdate),
-            name="user_data_stream",
-        )
-        tasks.append(userStreamTask)
-
-        logger.info("🟢 机器人已启动，等待交易信号...")
-        logger.info("   按 Ctrl+C 优雅退出")
-
-        # 等待关闭信号
-        await shutdownEvent.wait()
+        async with asyncio.TaskGroup() as tg:
+            # 实时行情流
+            tg.create_task(
+                client.startTradeStream(onPrice=strategy.onPriceUpdate),
+                name="trade_stream",
+            )
 
-    except Exception as e:
-        logger.error("运行时异常: %s", e)
+            # 用户数据流（订单状态更新）
+            tg.create_task(
+                client.startUserDataStream(onOrderUpdate=strategy.onOrderUpdate),
+                name="user_data_stream",
+            )
+
+            logger.info("🟢 机器人已启动，等待交易信号...")
+            logger.info("   按 Ctrl+C 优雅退出")
+
+            # 等待关闭信号
+            await shutdownEvent.wait()
+            raise _ShutdownRequested()
+
+    except* _ShutdownRequested:
+        pass
+
+    except* Exception as eg:
+        for e in eg.exceptions:
+            logger.error("运行时异常: %s", e)
 
     finally:
         # ============================================
@@ -153,14 +170,6 @@ async def main() -> None:
         # ============================================
         logger.info("🔄 正在关闭...")
 
-        # 取消所有后台任务
-        for task in tasks:
-            task.cancel()
-            try:
-                await task
-            except asyncio.CancelledError:
-                pass
-
         await _cleanup(client, notifier, strategy)
 
         if hc_runner:
@@ -184,21 +193,30 @@ async def _cleanup(
     try:
         await strategy.stop()
     except Exception as e:
-        logger.error("策略停止失败: %s", e)
+        logger.exception("策略停止失败: %s", e)
 
     try:
         await client.disconnect()
     except Exception as e:
-        logger.error("断开连接失败: %s", e)
+        logger.exception("断开连接失败: %s", e)
 
     try:
         await notifier.stop()
     except Exception as e:
-        logger.error("通知器关闭失败: %s", e)
+        logger.exception("通知器关闭失败: %s", e)
+
+    try:
+        await close_shared_session()
+    except Exception as e:
+        logger.exception("HTTP 连接池关闭失败: %s", e)
 
 
 def run() -> None:
     """程序入口点"""
+    # NOTE: 非 Windows 平台使用 uvloop (libuv) 事件循环，requirements 中仅在这些平台安装
+    if sys.platform != "win32":
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
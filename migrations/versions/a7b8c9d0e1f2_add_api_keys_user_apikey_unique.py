@@ -0,0 +1,28 @@
+"""Add unique (user_id, api_key) index on api_keys
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-15 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b8c9d0e1f2'
+down_revision: Union[str, Sequence[str], None] = 'f6a7b8c9d0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """同一用户不可重复绑定同一公钥。"""
+    op.create_index('ix_api_keys_user_apikey', 'api_keys', ['user_id', 'api_key'], unique=True)
+
+
+def downgrade() -> None:
+    """移除唯一索引。"""
+    op.drop_index('ix_api_keys_user_apikey', table_name='api_keys')
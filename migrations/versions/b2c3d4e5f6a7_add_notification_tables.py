@@ -9,6 +9,7 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 
 
 # revision identifiers, used by Alembic.
@@ -21,7 +22,7 @@ depends_on: Union[str, Sequence[str], None] = None
 def upgrade() -> None:
     """创建通知流水表和用户通知偏好设置表。"""
     # NOTE: 使用原生 SQL 创建枚举，IF NOT EXISTS 保证幂等
-    # 避免 SQLAlchemy sa.Enum 在 create_table 时重复创建枚举
+    # 建表时直接引用已存在的枚举 (create_type=False)，避免建表后再 ALTER COLUMN TYPE 触发整表重写
     op.execute("""
         DO $$
         BEGIN
@@ -31,10 +32,11 @@ def upgrade() -> None:
         END
         $$;
     """)
+    level_enum = postgresql.ENUM(name='notification_level_enum', create_type=False)
 
     op.create_table('notifications',
         sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
-        sa.Column('level', sa.Text(), nullable=True),
+        sa.Column('level', level_enum, nullable=True),
         sa.Column('title', sa.String(length=200), nullable=False),
         sa.Column('message', sa.String(length=2000), nullable=False),
         sa.Column('is_read', sa.Boolean(), nullable=True, server_default='false'),
@@ -46,23 +48,17 @@ def upgrade() -> None:
     )
     op.create_index(op.f('ix_notifications_id'), 'notifications', ['id'], unique=False)
 
-    # 将 level 列的类型改为枚举（Text -> notification_level_enum）
-    op.execute("ALTER TABLE notifications ALTER COLUMN level TYPE notification_level_enum USING level::notification_level_enum")
-
     op.create_table('notification_settings',
         sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
         sa.Column('telegram_enabled', sa.Boolean(), nullable=True, server_default='false'),
         sa.Column('email_enabled', sa.Boolean(), nullable=True, server_default='false'),
         sa.Column('web_enabled', sa.Boolean(), nullable=True, server_default='true'),
-        sa.Column('min_level', sa.Text(), nullable=True),
+        sa.Column('min_level', level_enum, nullable=True),
         sa.Column('telegram_chat_id', sa.String(length=100), nullable=True),
         sa.Column('email_address', sa.String(length=200), nullable=True),
         sa.PrimaryKeyConstraint('user_id')
     )
 
-    # 将 min_level 列的类型改为枚举
-    op.execute("ALTER TABLE notification_settings ALTER COLUMN min_level TYPE notification_level_enum USING min_level::notification_level_enum")
-
 
 def downgrade() -> None:
     """移除通知相关表。"""
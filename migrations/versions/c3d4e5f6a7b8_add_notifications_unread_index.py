@@ -0,0 +1,33 @@
+"""Add unread notifications index
+
+Revision ID: c3d4e5f6a7b8
+Revises: b2c3d4e5f6a7
+Create Date: 2026-10-15 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d4e5f6a7b8'
+down_revision: Union[str, Sequence[str], None] = 'b2c3d4e5f6a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """为「用户未读通知，按时间倒序」查询添加复合索引。"""
+    op.create_index(
+        'ix_notifications_user_unread_created',
+        'notifications',
+        ['user_id', 'is_read', sa.text('created_at DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """移除未读通知复合索引。"""
+    op.drop_index('ix_notifications_user_unread_created', table_name='notifications')
@@ -0,0 +1,28 @@
+"""Add bot_configs (user_id, api_key_id) index
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-15 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e5f6a7b8c9'
+down_revision: Union[str, Sequence[str], None] = 'c3d4e5f6a7b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """为仪表盘按用户 / API Key 的聚合查询添加复合索引。"""
+    op.create_index('ix_bot_configs_user_id_api_key_id', 'bot_configs', ['user_id', 'api_key_id'], unique=False)
+
+
+def downgrade() -> None:
+    """移除复合索引。"""
+    op.drop_index('ix_bot_configs_user_id_api_key_id', table_name='bot_configs')
@@ -0,0 +1,30 @@
+"""Add keyset pagination indexes
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f6a7b8c9d0'
+down_revision: Union[str, Sequence[str], None] = 'd4e5f6a7b8c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """为机器人列表与通知流水的 keyset 分页添加 (user_id, id DESC) 索引。"""
+    op.create_index('ix_bot_configs_user_id_id_desc', 'bot_configs', ['user_id', sa.text('id DESC')], unique=False)
+    op.create_index('ix_notifications_user_id_id_desc', 'notifications', ['user_id', sa.text('id DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """移除 keyset 分页索引。"""
+    op.drop_index('ix_notifications_user_id_id_desc', table_name='notifications')
+    op.drop_index('ix_bot_configs_user_id_id_desc', table_name='bot_configs')
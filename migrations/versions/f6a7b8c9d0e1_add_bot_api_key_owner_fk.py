@@ -0,0 +1,33 @@
+"""Add bot_configs api key ownership foreign key
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-15 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a7b8c9d0e1'
+down_revision: Union[str, Sequence[str], None] = 'e5f6a7b8c9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """以 (api_key_id, user_id) 复合外键保证机器人绑定的 API Key 属于同一用户。"""
+    op.create_unique_constraint('uq_api_keys_id_user_id', 'api_keys', ['id', 'user_id'])
+    op.create_foreign_key(
+        'fk_bot_configs_api_key_owner', 'bot_configs', 'api_keys',
+        ['api_key_id', 'user_id'], ['id', 'user_id'], ondelete='RESTRICT',
+    )
+
+
+def downgrade() -> None:
+    """移除复合外键与唯一约束。"""
+    op.drop_constraint('fk_bot_configs_api_key_owner', 'bot_configs', type_='foreignkey')
+    op.drop_constraint('uq_api_keys_id_user_id', 'api_keys', type_='unique')
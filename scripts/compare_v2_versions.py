@@ -3,18 +3,66 @@ import os
 import logging
 from decimal import Decimal
 from datetime import datetime, timedelta
-from src.strategies.market_analyzer import MarketAnalyzer, MarketState
+import numpy as np
+from src.strategies.market_analyzer import MarketAnalyzer, MarketState, IndicatorSnapshot, GridAdjustment
 from src.strategies.backtester import fetchHistoricalKlines
+from src.utils.kline_cache import load_klines
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
 
+# 预构造的 Decimal 常量，避免循环内重复解析字符串
+_D0 = Decimal("0")
+_D1 = Decimal("1")
+_D1_2 = Decimal("1.2")
+
+# V2.2 基础投入系数 (float)：状态 → 倍数
+_V22_STATE_MULTIPLIER = {
+    MarketState.LOW_VOL_RANGE: 1.2,
+    MarketState.PANIC_SELL: 1.5,
+}
+
+# 简化成交模型的盈利系数：状态 → (单笔利润率, 是否乘以密度系数)
+# 震荡套利 0.3% / 趋势跟踪 0.5% / 抄底反弹 1%
+PROFIT_COEFS: dict[MarketState, tuple[float, bool]] = {
+    MarketState.LOW_VOL_RANGE: (0.003, True),
+    MarketState.STRONG_BREAKOUT: (0.005, False),
+    MarketState.PANIC_SELL: (0.01, False),
+}
+
+# 指标缓存：{(窗口末根开盘时间, 窗口长度): IndicatorSnapshot}
+# NOTE: 指标只依赖 K 线窗口，与版本补丁 (_generateAdjustment) 无关，
+# 因此 V2.2 与 V2.3 两次模拟可共享同一份 RSI/ATR/EMA 计算结果
+_indicator_cache: dict[tuple[int, int], IndicatorSnapshot] = {}
+
+def _attach_indicator_cache(analyzer: MarketAnalyzer) -> None:
+    """为分析器挂载按窗口缓存的指标计算"""
+    compute = analyzer._calcIndicators
+
+    def cached(klinesBig):
+        key = (int(klinesBig[-1][0]), len(klinesBig))
+        snapshot = _indicator_cache.get(key)
+        if snapshot is None:
+            snapshot = _indicator_cache[key] = compute(klinesBig)
+        return snapshot
+
+    analyzer._calcIndicators = cached
+
+def _to_np(klines) -> np.ndarray:
+    """K 线数值列 [open_time, open, high, low, close, volume] 一次性解析为 (N, 6) float64 数组"""
+    return np.asarray([[float(x) for x in k[:6]] for k in klines], dtype=np.float64)
+
+def _to_decimal_rows(klines) -> list[list[Decimal]]:
+    """K 线数值列一次性解析为 Decimal，供 MarketAnalyzer 直接复用，避免每个窗口重复解析字符串"""
+    return [[Decimal(x) for x in k[:6]] for k in klines]
+
 def run_simulation(klines, version="v2.3"):
     """
     模拟回测：简化版的资产净值追踪。
     """
     analyzer = MarketAnalyzer()
+    _attach_indicator_cache(analyzer)
     initial_capital = 10000.0
     capital = initial_capital
     holdings = 0.0
@@ -27,44 +75,45 @@ def run_simulation(klines, version="v2.3"):
     max_drawdown = 0.0
     peak_equity = initial_capital
     
-    # 模拟 V2.2 补丁
+    # 模拟 V2.2 补丁 (回测专用，全部使用 float 运算，仅在构造 GridAdjustment 时转换一次)
     def v22_generate_adjustment_mock(state, rsi, atrRatio, volumeRatio, suggestedStep, isMacroBullish, positionRatio, *args, **kwargs):
         # 1. 基础调整 (模拟)
-        multiplier = Decimal("1.0")
-        if state == MarketState.LOW_VOL_RANGE:
-            multiplier = Decimal("1.2")
-        elif state == MarketState.PANIC_SELL:
-            multiplier = Decimal("1.5")
+        multiplier = _V22_STATE_MULTIPLIER.get(state, 1.0)
             
         # 2. V2.2 线性衰减
-        decay = max(Decimal("0.2"), Decimal("1") - positionRatio)
+        decay = max(0.2, 1.0 - float(positionRatio))
         
         # 3. 熊市限制
-        max_inv = Decimal("1.0") if not isMacroBullish else Decimal("2.0")
+        max_inv = 1.0 if not isMacroBullish else 2.0
         
-        from src.strategies.market_analyzer import GridAdjustment
         return GridAdjustment(
             state=state,
-            gridCenterShift=Decimal("0"),
-            densityMultiplier=Decimal("1.0"), # V2.2 没有动态密度
-            investmentMultiplier=min(max_inv, multiplier * decay),
+            gridCenterShift=_D0,
+            densityMultiplier=_D1, # V2.2 没有动态密度
+            investmentMultiplier=Decimal(repr(min(max_inv, multiplier * decay))),
             shouldPause=False,
-            suggestedGridStep=suggestedStep * (Decimal("1.2") if not isMacroBullish else Decimal("1.0"))
+            suggestedGridStep=suggestedStep * (_D1_2 if not isMacroBullish else _D1)
         )
 
     if version == "v2.2":
         # 运行时替换方法以模拟旧版本
         analyzer._generateAdjustment = v22_generate_adjustment_mock
 
+    # 数值列一次性解析：O(N) 次解析代替逐窗口 O(N*W) 次
+    arr = _to_np(klines)
+    rows = _to_decimal_rows(klines)
+    closes = arr[:, 4]
+    equity_curve = np.empty(max(len(klines) - 50, 0), dtype=np.float64)
+
     for i in range(50, len(klines)):
-        window = klines[i-50:i]
-        price = float(klines[i][4])
+        window = rows[i-50:i]
+        price = closes[i]
         equity = capital + holdings * price
-        peak_equity = max(peak_equity, equity)
-        dd = (peak_equity - equity) / peak_equity
-        max_drawdown = max(max_drawdown, dd)
+        equity_curve[i - 50] = equity
         
-        pos_ratio = Decimal(str(holdings * price / equity)) if equity > 0 else Decimal("0")
+        # 持仓占比用 float 计算，仅在 analyze 边界处转换为 Decimal
+        # NOTE: 量化到百分位，分析器只在该粒度上区分仓位，相邻 K 线间变化通常 < 1%
+        pos_ratio = Decimal(f"{holdings * price / equity:.2f}") if equity > 0 else _D0
         
         # V2.3 会用到 isGoldenCross 和 currentPrice
         adj = analyzer.analyze(window, positionRatio=pos_ratio)
@@ -78,21 +127,18 @@ def run_simulation(klines, version="v2.3"):
         
         # 简化成交模型：
         # 盈利因子贡献 = 基准单位 * 状态系数 * 密度系数
-        if adj.state == MarketState.LOW_VOL_RANGE:
-            # 震荡套利成交
-            trade_profit = (base_investment * m * d * 0.003) # 假设单笔 0.3% 利润
-            capital += trade_profit
-            trade_count += 1
-        elif adj.state == MarketState.STRONG_BREAKOUT:
-            # 趋势跟踪
-            capital += (base_investment * m * 0.005)
-            trade_count += 1
-        elif adj.state == MarketState.PANIC_SELL:
-            # 抄底反弹
-            capital += (base_investment * m * 0.01)
+        coef = PROFIT_COEFS.get(adj.state)
+        if coef is not None:
+            rate, use_d = coef
+            capital += base_investment * m * (d if use_d else 1.0) * rate
             trade_count += 1
+
+    # 峰值与回撤在循环结束后一次性向量化计算
+    if equity_curve.size:
+        peak_curve = np.maximum.accumulate(np.maximum(equity_curve, peak_equity))
+        max_drawdown = max(0.0, float(((peak_curve - equity_curve) / peak_curve).max()))
             
-    final_equity = capital + holdings * float(klines[-1][4])
+    final_equity = capital + holdings * float(closes[-1])
     return {
         "profit": final_equity - initial_capital,
         "profit_pct": (final_equity / initial_capital - 1) * 100,
@@ -103,11 +149,18 @@ def run_simulation(klines, version="v2.3"):
 async def main():
     logger.info("📡 正在获取 BTCUSDT 历史数据（最近 30 天）...")
     try:
-        klines = await fetchHistoricalKlines("BTCUSDT", "1h", 30)
+        # NOTE: 命中磁盘缓存时不发起网络请求，仅增量拉取尾部缺失的 K 线
+        klines = await load_klines(
+            "BTCUSDT", "1h", 30,
+            lambda startMs: fetchHistoricalKlines("BTCUSDT", "1h", 30, startMs=startMs),
+        )
     except Exception as e:
         logger.error("获取数据失败: %s. 请检查网络或代理。", e)
         return
 
+    # 新数据集需重新计算指标
+    _indicator_cache.clear()
+
     logger.info("🧪 运行 V2.2 (风控版) 模拟...")
     res22 = run_simulation(klines, version="v2.2")
     
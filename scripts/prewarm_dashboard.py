@@ -0,0 +1,34 @@
+import asyncio
+import logging
+
+import orjson
+
+from sqlalchemy import select
+
+from src.db.session import AsyncSessionLocal, redis_client
+from src.models.user import User
+from src.api.v1.dashboard import compute_overview
+from src.services.summary_cache import OVERVIEW_CACHE_TTL, overview_cache_key
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+async def prewarm_dashboard() -> int:
+    """为所有活跃用户预先计算并写入仪表盘概览缓存 (不区分 API Key 的默认视图)"""
+    warmed = 0
+    async with AsyncSessionLocal() as db:
+        user_ids = (await db.execute(select(User.id).where(User.is_active.is_(True)))).scalars().all()
+        for user_id in user_ids:
+            overview = await compute_overview(db, user_id)
+            await redis_client.setex(overview_cache_key(user_id, None), OVERVIEW_CACHE_TTL, orjson.dumps(overview))
+            warmed += 1
+    return warmed
+
+async def main():
+    warmed = await prewarm_dashboard()
+    logger.info(f"🔥 仪表盘概览缓存已预热: {warmed} 个用户")
+    await redis_client.aclose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
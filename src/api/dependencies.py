@@ -1,13 +1,15 @@
+import asyncio
 from typing import Annotated
+from binance import AsyncClient
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from src.db.session import get_db
+from src.db.session import get_db, get_db_readonly
 from src.core.security import decode_access_token
-from src.schemas.user import TokenPayload
 from src.models.user import User
+from src.utils.http import shared_session_params
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"/api/v1/auth/login",
@@ -16,21 +18,55 @@ reusable_oauth2 = OAuth2PasswordBearer(
 
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 SessionDep = Annotated[AsyncSession, Depends(get_db)]
+ReadOnlySessionDep = Annotated[AsyncSession, Depends(get_db_readonly)]
+
+# 进程级共享的公共行情客户端 (无需 API Key)，复用底层 aiohttp 连接池与 TLS 会话
+_binance_async: AsyncClient | None = None
+_binance_async_lock = asyncio.Lock()
+
+async def get_shared_binance_client() -> AsyncClient:
+    """Dependency to retrieve the app-lifetime public Binance AsyncClient (lazily created)."""
+    global _binance_async
+    if _binance_async is None:
+        async with _binance_async_lock:
+            if _binance_async is None:
+                _binance_async = await AsyncClient.create(session_params=shared_session_params())
+    return _binance_async
+
+async def close_shared_binance_client() -> None:
+    """Close the shared public Binance AsyncClient on application shutdown."""
+    global _binance_async
+    if _binance_async is not None:
+        await _binance_async.close_connection()
+        _binance_async = None
+
+BinanceAsyncDep = Annotated[AsyncClient, Depends(get_shared_binance_client)]
 
 async def get_current_user(session: SessionDep, token: TokenDep) -> User:
     """Dependency to retrieve current user based on JWT block."""
+    return await _resolve_user(session, token)
+
+async def get_current_user_readonly(session: ReadOnlySessionDep, token: TokenDep) -> User:
+    """
+    Read-only variant of get_current_user for GET endpoints that use get_db_readonly.
+    用户查询与接口查询共用同一条 AUTOCOMMIT 连接，每个请求只占用一个连接池槽位。
+    """
+    return await _resolve_user(session, token)
+
+async def _resolve_user(session: AsyncSession, token: str) -> User:
+    # NOTE: 签名校验已保证声明结构可信，直接读取 sub，无需再构造 TokenPayload 做二次校验
+    payload = decode_access_token(token)
     try:
-        payload = decode_access_token(token)
         if payload is None:
-            raise ValueError()
-        token_data = TokenPayload(**payload)
-    except Exception:
+            raise ValueError("invalid token")
+        user_id = int(payload["sub"])
+    except (KeyError, TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
         
-    user = await session.get(User, int(token_data.sub))
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
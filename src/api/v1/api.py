@@ -1,13 +1,13 @@
+import importlib
 from fastapi import APIRouter
-from src.api.v1 import keys, auth, bots, dashboard, market, ws, backtest, notifications
+from src.core.config import settings
 
 api_router = APIRouter()
 
-api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(keys.router, prefix="/keys", tags=["keys"])
-api_router.include_router(bots.router, prefix="/bots", tags=["bots"])
-api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
-api_router.include_router(market.router, prefix="/market", tags=["market"])
-api_router.include_router(backtest.router, prefix="/backtest", tags=["backtest"])
-api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
-api_router.add_api_websocket_route("/ws", ws.websocket_endpoint)
+# NOTE: 按 ENABLED_MODULES 懒加载路由模块，未启用的模块 (及其 numpy / 策略引擎等依赖) 不会被导入
+for name in settings.ENABLED_MODULES:
+    module = importlib.import_module(f"src.api.v1.{name}")
+    if name == "ws":
+        api_router.add_api_websocket_route("/ws", module.websocket_endpoint)
+    else:
+        api_router.include_router(module.router, prefix=f"/{name}", tags=[name])
@@ -1,21 +1,85 @@
+import asyncio
+from binance import AsyncClient
 from fastapi import APIRouter, Depends, HTTPException, Body
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Any
 
 from src.db.session import get_db
-from src.api.dependencies import get_current_user
+from src.api.dependencies import get_current_user, BinanceAsyncDep
 from src.models.user import User
 from src.models.bot import BotConfig, StrategyType
-from src.engine.backtest_engine import BacktestEngine
-from src.engine.strategy_manager import strategy_manager
-from src.exchanges.binance_client import BinanceClient, ClientConfig
-from src.utils.rate_limiter import RateLimiter
+from src.utils.kline_cache import load_klines
 
 router = APIRouter()
 
+# NOTE: 限制同时向币安拉取历史 K 线的并发数，避免多用户回测时耗尽权重
+MAX_CONCURRENT_KLINE_FETCHES = 10
+_kline_fetch_sem = asyncio.Semaphore(MAX_CONCURRENT_KLINE_FETCHES)
+
+# 单次参数扫描允许的最大配置组数 (每组占用一个子进程内的完整回测)
+MAX_SWEEP_CONFIGS = 64
+
+# 进行中的 K 线请求: {(symbol, interval, days, limit): Future}，相同参数的并发回测共享同一次上游调用
+_inflight: dict[tuple[str, str, int, int], asyncio.Future] = {}
+
+async def _fetch_klines(client: AsyncClient, symbol: str, interval: str, days: int, limit: int) -> list:
+    """优先读取磁盘缓存，仅对缺失的尾部区间向币安增量拉取"""
+    async def fetcher(startMs: int) -> list:
+        async with _kline_fetch_sem:
+            return await client.get_klines(symbol=symbol, interval=interval, startTime=startMs, limit=1000)
+
+    klines = await load_klines(symbol, interval, days, fetcher)
+    return klines[-limit:]
+
+def _get_klines_coalesced(client: AsyncClient, symbol: str, interval: str, days: int, limit: int) -> asyncio.Future:
+    """返回该参数组合的进行中请求；无则新建，完成后自动从表中移除"""
+    key = (symbol, interval, days, limit)
+    fut = _inflight.get(key)
+    if fut is None:
+        fut = asyncio.ensure_future(_fetch_klines(client, symbol, interval, days, limit))
+        _inflight[key] = fut
+        fut.add_done_callback(lambda _: _inflight.pop(key, None))
+    return fut
+
+def _build_temp_bot(user_id: int, config_override: dict) -> BotConfig:
+    """拟合模式：由 config_override 构造一个不入库的 BotConfig"""
+    return BotConfig(
+        id=0,
+        user_id=user_id,
+        name=config_override.get("name", "Backtest_Temp"),
+        symbol=config_override.get("symbol", "BTCUSDT"),
+        strategy_type=config_override.get("strategy_type", "grid"),
+        parameters=config_override.get("parameters", {}),
+        total_investment=config_override.get("total_investment", 1000),
+        is_testnet=True
+    )
+
+def _resolve_strategy_class(strategy_type) -> type:
+    # NOTE: 策略注册表依赖较重 (numpy / 策略模块)，仅在真正执行回测时才导入
+    from src.engine.strategy_manager import strategy_manager
+
+    strategy_class = strategy_manager._strategy_registry.get(strategy_type)
+    if not strategy_class:
+        raise HTTPException(status_code=400, detail=f"不支持类型 [{strategy_type}] 的回测")
+    return strategy_class
+
+async def _load_history(client: AsyncClient, symbol: str, interval: str, days: int) -> list:
+    """抓取回测所需的历史 K 线 (复用进程级共享客户端，避免每次请求重建连接池与 TLS 握手)"""
+    try:
+        limit = min(1000, days * (24 if interval == "1h" else 96))
+        # shield: 单个请求方断开时不取消其他回测共享的上游调用
+        history_data = await asyncio.shield(_get_klines_coalesced(client, symbol, interval, days, limit))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"行情获取失败: {str(e)}")
+
+    if not history_data:
+        raise HTTPException(status_code=500, detail="无法获取该币种的历史行情数据")
+    return history_data
+
 @router.post("/run")
 async def run_backtest(
     bot_id: int,
+    binance_async: BinanceAsyncDep,
     days: int = 7,
     interval: str = "1h",
     config_override: Optional[dict] = Body(None),
@@ -40,39 +104,53 @@ async def run_backtest(
             raise HTTPException(status_code=400, detail="拟合模式必须提供 config_override 参数")
         
         # 模拟一个符合需求的 BotConfig 对象
-        bot = BotConfig(
-            id=0,
-            user_id=current_user.id,
-            name=config_override.get("name", "Backtest_Temp"),
-            symbol=config_override.get("symbol", "BTCUSDT"),
-            strategy_type=config_override.get("strategy_type", "grid"),
-            parameters=config_override.get("parameters", {}),
-            total_investment=config_override.get("total_investment", 1000),
-            is_testnet=True
-        )
+        bot = _build_temp_bot(current_user.id, config_override)
+
+    from src.engine.backtest_engine import BacktestEngine
 
     # 2. 获取策略实现类
-    strategy_class = strategy_manager._strategy_registry.get(bot.strategy_type)
-    if not strategy_class:
-        raise HTTPException(status_code=400, detail=f"不支持类型 [{bot.strategy_type}] 的回测")
+    strategy_class = _resolve_strategy_class(bot.strategy_type)
 
     # 3. 抓取历史数据
-    from binance import AsyncClient
-    binance_async = await AsyncClient.create()
-    
-    try:
-        limit = min(1000, days * (24 if interval == "1h" else 96))
-        history_data = await binance_async.get_klines(symbol=bot.symbol, interval=interval, limit=limit)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"行情获取失败: {str(e)}")
-    finally:
-        await binance_async.close_connection()
-
-    if not history_data:
-        raise HTTPException(status_code=500, detail="无法获取该币种的历史行情数据")
+    history_data = await _load_history(binance_async, bot.symbol, interval, days)
 
     # 4. 初始化并运行回测引擎
     engine = BacktestEngine(strategy_class, bot)
     results = await engine.run(history_data)
     
     return results
+
+@router.post("/sweep")
+async def run_backtest_sweep(
+    binance_async: BinanceAsyncDep,
+    config_override: dict = Body(...),
+    parameter_grid: List[dict] = Body(...),
+    days: int = 7,
+    interval: str = "1h",
+    current_user: User = Depends(get_current_user),
+):
+    """
+    参数扫描：同一段行情下对多组策略参数并行回测。
+    parameter_grid 的每一项覆盖 config_override["parameters"] 中的同名参数，
+    返回结果与 parameter_grid 一一对应 (每项附带本组参数)。
+    """
+    if not 1 <= len(parameter_grid) <= MAX_SWEEP_CONFIGS:
+        raise HTTPException(status_code=400, detail=f"parameter_grid 需包含 1 ~ {MAX_SWEEP_CONFIGS} 组参数")
+
+    base_parameters = config_override.get("parameters", {})
+    configs = [
+        _build_temp_bot(current_user.id, {**config_override, "parameters": {**base_parameters, **overrides}})
+        for overrides in parameter_grid
+    ]
+
+    from src.engine.backtest_engine import BacktestEngine
+
+    strategy_class = _resolve_strategy_class(configs[0].strategy_type)
+    history_data = await _load_history(binance_async, configs[0].symbol, interval, days)
+
+    # NOTE: run_sweep 会阻塞等待进程池，放到线程中执行以免占住事件循环
+    results = await asyncio.to_thread(BacktestEngine.run_sweep, strategy_class, configs, history_data)
+    return [
+        {"parameters": config.parameters, **result}
+        for config, result in zip(configs, results)
+    ]
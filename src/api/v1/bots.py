@@ -1,18 +1,22 @@
+import asyncio
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 
-from src.db.session import get_db
-from src.api.dependencies import get_current_user
+from src.db.session import get_db, get_db_readonly
+from src.api.dependencies import get_current_user, get_current_user_readonly
 from src.models.user import User
 from src.models.bot import BotConfig, BotStatus
 from src.models.trade import Trade
 from src.schemas.bot import BotConfigCreate, BotConfigUpdate, BotConfigResponse, TradeResponse
 from src.engine.strategy_manager import strategy_manager
 from src.services.crypto_service import crypto_service
-from src.models.api_key import ApiKey
+from src.services.summary_cache import invalidate_overview
 
 router = APIRouter()
 
@@ -23,15 +27,9 @@ async def create_bot(
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """创建新的机器人配置"""
-    # 验证 API Key 是否属于该用户
-    query = select(ApiKey).where(ApiKey.id == bot_in.api_key_id, ApiKey.user_id == current_user.id)
-    result = await db.execute(query)
-    api_key = result.scalar_one_or_none()
-    
-    if not api_key:
-        raise HTTPException(status_code=404, detail="绑定的 API Key 不存在或无权访问")
-        
-    bot_config = BotConfig(
+    # NOTE: API Key 归属由 (api_key_id, user_id) 复合外键在数据库侧保证，
+    # 直接插入并以 RETURNING 取回整行，成功路径只需一次往返
+    stmt = pg_insert(BotConfig).values(
         user_id=current_user.id,
         api_key_id=bot_in.api_key_id,
         name=bot_in.name,
@@ -43,27 +41,48 @@ async def create_bot(
         total_investment=bot_in.total_investment,
         is_testnet=bot_in.is_testnet,
         status=BotStatus.IDLE
-    )
-    db.add(bot_config)
-    await db.commit()
-    await db.refresh(bot_config)
+    ).returning(BotConfig)
+    try:
+        result = await db.execute(stmt)
+        bot_config = result.scalar_one()
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        # 23503: foreign_key_violation —— API Key 不存在或不属于当前用户
+        if getattr(e.orig, "sqlstate", None) == "23503":
+            raise HTTPException(status_code=404, detail="绑定的 API Key 不存在或无权访问")
+        raise
+    await invalidate_overview(current_user.id, bot_config.api_key_id)
     return bot_config
 
 @router.get("/", response_model=list[BotConfigResponse])
 async def list_bots(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    db: AsyncSession = Depends(get_db_readonly),
+    current_user: User = Depends(get_current_user_readonly),
     api_key_id: int | None = None,
-    skip: int = 0,
-    limit: int = 100,
+    after_id: int | None = None,
+    limit: int = Query(100, ge=1, le=500),
+    skip: int = Query(0, ge=0, deprecated=True),
 ) -> Any:
-    """获取用户的机器人列表"""
+    """
+    获取用户的机器人列表 (按 id 倒序)。
+    使用 keyset 分页：传入上一页响应头 X-Next-Cursor 作为 after_id 获取下一页，
+    翻页深度不影响查询代价。skip 仅为兼容旧客户端保留，新代码请改用 after_id。
+    """
     query = select(BotConfig).where(BotConfig.user_id == current_user.id)
     if api_key_id is not None:
         query = query.where(BotConfig.api_key_id == api_key_id)
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    return result.scalars().all()
+    if after_id is not None:
+        query = query.where(BotConfig.id < after_id)
+    query = query.order_by(BotConfig.id.desc()).limit(limit)
+    if skip:
+        query = query.offset(skip)
+    # NOTE: 只读会话为 AUTOCOMMIT，asyncpg 的服务端游标必须处于事务内；单页至多 500 行，直接整批取回
+    bots = (await db.scalars(query)).all()
+    if len(bots) == limit:
+        response.headers["X-Next-Cursor"] = str(bots[-1].id)
+    return bots
 
 @router.post("/{bot_id}/start")
 async def start_bot(
@@ -72,7 +91,12 @@ async def start_bot(
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """在后台拉起某个机器人的运行实例"""
-    query = select(BotConfig).where(BotConfig.id == bot_id, BotConfig.user_id == current_user.id)
+    # NOTE: api_key 为多对一关系，joinedload 在同一条 SQL 中取回，省去二次查询
+    query = (
+        select(BotConfig)
+        .options(joinedload(BotConfig.api_key))
+        .where(BotConfig.id == bot_id, BotConfig.user_id == current_user.id)
+    )
     result = await db.execute(query)
     bot = result.scalar_one_or_none()
     
@@ -83,17 +107,17 @@ async def start_bot(
         raise HTTPException(status_code=400, detail="该机器人已在运行中")
 
     # 获取关联的 API Key 和解密
-    query_key = select(ApiKey).where(ApiKey.id == bot.api_key_id)
-    key_result = await db.execute(query_key)
-    api_key = key_result.scalar_one_or_none()
+    api_key = bot.api_key
     
     if not api_key:
         raise HTTPException(status_code=400, detail="绑定的 API Key 已被删除")
         
     try:
         # NOTE: 使用 CryptoService 的正确方法签名
-        api_secret_str = crypto_service.decrypt_user_secret(
-            current_user.encrypted_dek, api_key.encrypted_secret
+        # NOTE: 解密为同步 CPU 运算，放到线程池执行，避免阻塞事件循环上的其他请求
+        api_secret_str = await asyncio.to_thread(
+            crypto_service.decrypt_api_secret,
+            current_user.id, api_key.id, current_user.encrypted_dek, api_key.encrypted_secret,
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail="解密 API Secret 失败，请检查 DEK 连通性")
@@ -102,13 +126,12 @@ async def start_bot(
     # 调用大盘 StrategyManager 调度此实例
     success = await strategy_manager.start_bot(bot, api_key_str=api_key.api_key, api_secret_str=api_secret_str)
     
+    bot.status = BotStatus.RUNNING if success else BotStatus.ERROR
+    await db.commit()
+    await invalidate_overview(current_user.id, bot.api_key_id)
     if success:
-        bot.status = BotStatus.RUNNING
-        await db.commit()
         return {"msg": "Bot 已成功启动"}
     else:
-        bot.status = BotStatus.ERROR
-        await db.commit()
         raise HTTPException(status_code=500, detail="拉起运行时环境失败，请查看引擎日志")
 
 @router.post("/{bot_id}/stop")
@@ -131,6 +154,7 @@ async def stop_bot(
     # 都把它的名份给清理成停止，以便允许用户接下来的操作。
     bot.status = BotStatus.STOPPED
     await db.commit()
+    await invalidate_overview(current_user.id, bot.api_key_id)
 
     if success:
         return {"msg": "Bot 已停止工作并清理挂单"}
@@ -156,6 +180,7 @@ async def panic_close_bot(
     # 将数据库状态标记为 STOPPED
     bot.status = BotStatus.STOPPED
     await db.commit()
+    await invalidate_overview(current_user.id, bot.api_key_id)
     
     # 按照清算结果返回状态
     if result_data.get("status") == "success":
@@ -200,6 +225,7 @@ async def delete_bot(
         
     await db.delete(bot)
     await db.commit()
+    await invalidate_overview(current_user.id, bot.api_key_id)
 
 @router.get("/{bot_id}/trades", response_model=list[TradeResponse])
 async def list_bot_trades(
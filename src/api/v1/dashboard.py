@@ -1,41 +1,27 @@
 from typing import Any, Optional
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, case
 
-from src.db.session import get_db
-from src.api.dependencies import get_current_user
+from src.db.session import get_db_readonly
+from src.api.dependencies import get_current_user_readonly
 from src.models.user import User
 from src.models.bot import BotConfig, BotStatus
+from src.services.summary_cache import OVERVIEW_CACHE_TTL, cached_json, overview_cache_key
 
 router = APIRouter()
 
-@router.get("/overview")
-async def get_dashboard_overview(
-    api_key_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-) -> Any:
-    # 投资总额
-    inv_query = select(func.sum(BotConfig.total_investment)).where(BotConfig.user_id == current_user.id)
+async def compute_overview(db: AsyncSession, user_id: int, api_key_id: Optional[int] = None) -> dict:
+    """直接查库计算概览聚合 (投资总额 / 累计收益 / 活跃机器人数)"""
+    # NOTE: 投资总额 / 累计收益 / 活跃机器人数合并为一条聚合查询，单次往返、单次扫描
+    query = select(
+        func.coalesce(func.sum(BotConfig.total_investment), 0),
+        func.coalesce(func.sum(BotConfig.total_pnl), 0),
+        func.coalesce(func.sum(case((BotConfig.status == BotStatus.RUNNING, 1), else_=0)), 0),
+    ).where(BotConfig.user_id == user_id)
     if api_key_id:
-        inv_query = inv_query.where(BotConfig.api_key_id == api_key_id)
-    inv_result = await db.execute(inv_query)
-    total_investment = inv_result.scalar() or 0
-
-    # 累计收益
-    profit_query = select(func.sum(BotConfig.total_pnl)).where(BotConfig.user_id == current_user.id)
-    if api_key_id:
-        profit_query = profit_query.where(BotConfig.api_key_id == api_key_id)
-    profit_result = await db.execute(profit_query)
-    total_profit = profit_result.scalar() or 0
-
-    # 活跃机器人
-    active_query = select(func.count(BotConfig.id)).where(BotConfig.user_id == current_user.id, BotConfig.status == BotStatus.RUNNING)
-    if api_key_id:
-        active_query = active_query.where(BotConfig.api_key_id == api_key_id)
-    active_result = await db.execute(active_query)
-    active_bots = active_result.scalar() or 0
+        query = query.where(BotConfig.api_key_id == api_key_id)
+    total_investment, total_profit, active_bots = (await db.execute(query)).one()
 
     return {
         "total_investment": float(total_investment),
@@ -43,3 +29,15 @@ async def get_dashboard_overview(
         "active_bots": int(active_bots),
         "risk_level": "低"
     }
+
+@router.get("/overview")
+async def get_dashboard_overview(
+    api_key_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db_readonly),
+    current_user: User = Depends(get_current_user_readonly),
+) -> Any:
+    return await cached_json(
+        overview_cache_key(current_user.id, api_key_id),
+        OVERVIEW_CACHE_TTL,
+        lambda: compute_overview(db, current_user.id, api_key_id),
+    )
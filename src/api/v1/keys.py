@@ -4,9 +4,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, ConfigDict, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from src.db.session import get_db
-from src.api.dependencies import get_current_user
+from src.db.session import get_db, get_db_readonly
+from src.api.dependencies import get_current_user, get_current_user_readonly
 from src.models.user import User
 from src.models.api_key import ApiKey
 from src.services.crypto_service import crypto_service
@@ -31,6 +32,35 @@ class ApiKeyResponse(BaseModel):
 router = APIRouter()
 
 
+async def _resolve_user_dek(db: AsyncSession, user: User) -> str:
+    """
+    返回用户当前可用的加密 DEK。
+    DEK 缺失或无法被主密钥解开时，若用户尚未绑定任何 API Key 则自动重建并保存；
+    已有绑定数据时拒绝重建，防止旧密文彻底无法解密。
+    """
+    if user.encrypted_dek and crypto_service.is_valid_dek(user.encrypted_dek):
+        return user.encrypted_dek
+
+    logger.warning(f"Invalid or missing DEK for user {user.id}. Attempting self-healing...")
+    # 自愈逻辑：这一步能解决之前 Master Key 变更导致老账号 500 的问题
+    stmt = select(ApiKey.id).where(ApiKey.user_id == user.id).limit(1)
+    if (await db.execute(stmt)).first():
+        logger.error(f"DEK invalid but user has existing keys. Cannot auto-reset.")
+        raise HTTPException(status_code=500, detail="解密密钥失效且账号已绑定数据，请联系管理员或清理环境")
+
+    logger.info(f"Resetting invalid/missing DEK for user {user.id}")
+    try:
+        _, new_encrypted_dek = crypto_service.generate_user_dek()
+    except Exception as fatal_e:
+        logger.error(f"Self-healing failed: {fatal_e}")
+        raise HTTPException(status_code=500, detail=f"无法恢复加密环境: {fatal_e}")
+    user.encrypted_dek = new_encrypted_dek
+    db.add(user)
+    # DEK 已覆盖，丢弃旧 DEK 下缓存的明文
+    crypto_service.invalidate_secrets(user.id)
+    return new_encrypted_dek
+
+
 @router.post("/", response_model=ApiKeyResponse, status_code=status.HTTP_201_CREATED)
 async def create_api_key(
     key_in: ApiKeyCreate,
@@ -38,72 +68,40 @@ async def create_api_key(
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """绑定新的交易所 API Key。私钥将被用户的信封密钥 (DEK) 加密存储"""
-    
-    # 检查当前用户的公钥是否已重复绑定
-    stmt = select(ApiKey).where(ApiKey.user_id == current_user.id, ApiKey.api_key == key_in.api_key)
-    existing = await db.execute(stmt)
-    if existing.scalar_one_or_none():
-        raise HTTPException(status_code=400, detail="此 API Key 已经绑定")
 
-    # 使用用户的加密上下文解密得到 DEK 原始字节串，再用 DEK 对目标秘钥执行信封加密
+    # 先确定可用的 DEK (必要时自愈重建)，再对目标秘钥执行一次信封加密
+    encrypted_dek = await _resolve_user_dek(db, current_user)
     try:
-        if not current_user.encrypted_dek:
-            # 强制触发自愈逻辑
-            raise ValueError("Invalid DEK (Empty)")
-
         encrypted_secret = crypto_service.encrypt_secret_with_dek(
-            encrypted_dek_b64=current_user.encrypted_dek,
+            encrypted_dek_b64=encrypted_dek,
             secret_str=key_in.api_secret
         )
     except Exception as e:
-        logger.warning(f"Encryption failed for user {current_user.id}: {str(e)}. Attempting self-healing...")
-        # 自愈逻辑：如果解密失败且用户没有 API Key，则尝试自动重新生成并保存新的 DEK
-        # 这一步能解决之前 Master Key 变更导致老账号 500 的问题
-        if isinstance(e, ValueError) or "Invalid DEK" in str(e) or not current_user.encrypted_dek:
-            # 检查用户是否已有绑定的 Key，如有则不能自愈（防止误删导致数据彻底无法解密）
-            stmt = select(ApiKey).where(ApiKey.user_id == current_user.id)
-            existing_count = await db.execute(stmt)
-            if not existing_count.scalars().first():
-                logger.info(f"Resetting invalid/missing DEK for user {current_user.id}")
-                # 重新生成 DEK 并保存
-                try:
-                    plain_dek, new_encrypted_dek = crypto_service.generate_user_dek()
-                    current_user.encrypted_dek = new_encrypted_dek
-                    db.add(current_user)
-                    # 重新尝试加密
-                    encrypted_secret = crypto_service.encrypt_secret_with_dek(
-                        encrypted_dek_b64=new_encrypted_dek,
-                        secret_str=key_in.api_secret
-                    )
-                except Exception as fatal_e:
-                    logger.error(f"Self-healing failed: {fatal_e}")
-                    raise HTTPException(status_code=500, detail=f"无法恢复加密环境: {fatal_e}")
-            else:
-                logger.error(f"DEK invalid but user has existing keys. Cannot auto-reset.")
-                raise HTTPException(status_code=500, detail="解密密钥失效且账号已绑定数据，请联系管理员或清理环境")
-        else:
-            logger.exception("Unexpected error during API Key encryption")
-            raise HTTPException(status_code=500, detail=f"加密处理异常: {str(e)}")
-
-    new_key = ApiKey(
+        logger.exception("Unexpected error during API Key encryption")
+        raise HTTPException(status_code=500, detail=f"加密处理异常: {str(e)}")
+
+    # NOTE: 重复绑定由 (user_id, api_key) 唯一索引在数据库侧原子拦截，无需先查后插
+    stmt = pg_insert(ApiKey).values(
         user_id=current_user.id,
         exchange=key_in.exchange,
         api_key=key_in.api_key,
         encrypted_secret=encrypted_secret,
         is_testnet=key_in.is_testnet
-    )
+    ).on_conflict_do_nothing(index_elements=["user_id", "api_key"]).returning(ApiKey)
+    new_key = (await db.execute(stmt)).scalar_one_or_none()
+    if new_key is None:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="此 API Key 已经绑定")
 
-    db.add(new_key)
     await db.commit()
-    await db.refresh(new_key)
     return new_key
 
 @router.get("/", response_model=list[ApiKeyResponse])
 async def list_api_keys(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_readonly),
+    current_user: User = Depends(get_current_user_readonly),
 ) -> Any:
     """列出当前用户绑定的所有凭证"""
     stmt = select(ApiKey).where(ApiKey.user_id == current_user.id)
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    # NOTE: 只读会话为 AUTOCOMMIT，asyncpg 的服务端游标必须处于事务内，因此这里一次性取回
+    return (await db.scalars(stmt)).all()
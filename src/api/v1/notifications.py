@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from typing import List
 
-from src.db.session import get_db
-from src.api.dependencies import get_current_user
+from src.db.session import get_db, get_db_readonly
+from src.api.dependencies import get_current_user, get_current_user_readonly
 from src.models.user import User
 from src.models.notification import Notification, NotificationSetting, NotificationLevel
 
@@ -12,16 +13,22 @@ router = APIRouter()
 
 @router.get("/")
 async def get_notifications(
-    limit: int = 20,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    after_id: int | None = None,
+    db: AsyncSession = Depends(get_db_readonly),
+    current_user: User = Depends(get_current_user_readonly),
 ):
-    """获取当前用户的通知历史流水"""
-    stmt = select(Notification).where(
-        Notification.user_id == current_user.id
-    ).order_by(Notification.id.desc()).limit(limit)
+    """获取当前用户的通知历史流水 (keyset 分页，下一页游标见响应头 X-Next-Cursor)"""
+    stmt = select(Notification).where(Notification.user_id == current_user.id)
+    if after_id is not None:
+        stmt = stmt.where(Notification.id < after_id)
+    stmt = stmt.order_by(Notification.id.desc()).limit(limit)
     result = await db.execute(stmt)
-    return result.scalars().all()
+    notifications = result.scalars().all()
+    if len(notifications) == limit:
+        response.headers["X-Next-Cursor"] = str(notifications[-1].id)
+    return notifications
 
 @router.post("/{notif_id}/read")
 async def mark_as_read(
@@ -33,11 +40,33 @@ async def mark_as_read(
     stmt = update(Notification).where(
         Notification.id == notif_id, 
         Notification.user_id == current_user.id
-    ).values(is_read=True)
-    await db.execute(stmt)
+    ).values(is_read=True).returning(Notification.id)
+    # NOTE: RETURNING 在同一次往返中同时完成写入与归属校验
+    result = await db.execute(stmt)
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="未找到该通知")
     await db.commit()
     return {"status": "success"}
 
+# 允许用户修改的偏好字段
+SETTING_FIELDS = ("telegram_enabled", "email_enabled", "web_enabled", "min_level", "telegram_chat_id", "email_address")
+
+async def _upsert_settings(db: AsyncSession, user_id: int, fields: dict) -> NotificationSetting:
+    """
+    INSERT ... ON CONFLICT (user_id) DO UPDATE 一条语句完成「不存在则创建、存在则更新」，
+    避免先查后插的两次往返与并发重复插入。
+    """
+    stmt = pg_insert(NotificationSetting).values(user_id=user_id, **fields)
+    # NOTE: 冲突更新不会触发 ORM 的 onupdate，显式刷新 updated_at；无字段可更新时也保证 RETURNING 返回该行
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NotificationSetting.user_id],
+        set_={**fields, "updated_at": stmt.excluded.updated_at},
+    ).returning(NotificationSetting)
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    setting = result.scalar_one()
+    await db.commit()
+    return setting
+
 @router.get("/settings")
 async def get_settings(
     db: AsyncSession = Depends(get_db),
@@ -49,11 +78,8 @@ async def get_settings(
     setting = result.scalar_one_or_none()
     
     if not setting:
-        # 默认初始化
-        setting = NotificationSetting(user_id=current_user.id)
-        db.add(setting)
-        await db.commit()
-        await db.refresh(setting)
+        # 默认初始化 (并发首次访问时由 ON CONFLICT 保证只有一行)
+        setting = await _upsert_settings(db, current_user.id, {})
         
     return setting
 
@@ -64,19 +90,7 @@ async def update_settings(
     current_user: User = Depends(get_current_user),
 ):
     """更新用户通知偏好设置 (渠道与等级)"""
-    stmt = select(NotificationSetting).where(NotificationSetting.user_id == current_user.id)
-    result = await db.execute(stmt)
-    setting = result.scalar_one_or_none()
-    
-    if not setting:
-        setting = NotificationSetting(user_id=current_user.id)
-        db.add(setting)
-
     # 安全地映射字段
-    allowed_fields = ["telegram_enabled", "email_enabled", "web_enabled", "min_level", "telegram_chat_id", "email_address"]
-    for field in allowed_fields:
-        if field in settings_data:
-            setattr(setting, field, settings_data[field])
-            
-    await db.commit()
+    fields = {field: settings_data[field] for field in SETTING_FIELDS if field in settings_data}
+    await _upsert_settings(db, current_user.id, fields)
     return {"status": "success"}
@@ -1,7 +1,6 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from src.engine.ws_hub import ws_hub
 from src.core.security import decode_access_token
-from src.schemas.user import TokenPayload
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,9 +22,8 @@ async def websocket_endpoint(
         try:
             payload = decode_access_token(token)
             if payload:
-                token_data = TokenPayload(**payload)
-                user_id = int(token_data.sub)
-        except Exception as e:
+                user_id = int(payload["sub"])
+        except (KeyError, TypeError, ValueError) as e:
             logger.warning(f"WS Auth failed: {e}")
             # 对于公共看板，我们可以允许未登录访问，或者直接关闭
             # 这里我们选择允许连接，但 user_id 为 None (进入 public_connections)
@@ -35,11 +33,14 @@ async def websocket_endpoint(
     try:
         while True:
             # 持续监听客户端发来的消息 (比如前端可能发心跳或指令)
-            data = await websocket.receive_text()
-            # 目前仅作为推送中心，不处理业务指令
-            pass
+            # NOTE: 目前仅作为推送中心，不处理业务指令：直接读取原始帧，不做 UTF-8 解码，仅识别断开事件
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
     except WebSocketDisconnect:
-        ws_hub.disconnect(websocket, user_id=user_id)
+        pass
     except Exception as e:
         logger.error(f"WS Error: {e}")
+    finally:
+        # NOTE: 任何退出路径 (含取消 / 断管) 都要注销连接，避免句柄泄漏
         ws_hub.disconnect(websocket, user_id=user_id)
@@ -6,18 +6,29 @@
 """
 import os
 import logging
+import functools
 from dataclasses import dataclass, field
 from pathlib import Path
 from decimal import Decimal
 
+import numpy as np
 from dotenv import load_dotenv
 
+from src.config.grid_math import grid_levels
+
 logger = logging.getLogger(__name__)
 
 # NOTE: 项目根目录定位基于此文件的相对路径 (src/config/ → 根)
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 
 
+# 币安 REST / WebSocket 端点：useTestnet → (baseUrl, wsBaseUrl)
+_ENDPOINTS: dict[bool, tuple[str, str]] = {
+    True: ("https://testnet.binance.vision/api", "wss://testnet.binance.vision/ws"),
+    False: ("https://api.binance.com/api", "wss://stream.binance.com:9443/ws"),
+}
+
+
 def _maskSecret(value: str) -> str:
     """
     对敏感字符串脱敏，仅保留末 4 位。
@@ -89,12 +100,7 @@ class Settings:
 
     def __post_init__(self) -> None:
         """根据 useTestnet 设置 API 端点"""
-        if self.useTestnet:
-            self.baseUrl = "https://testnet.binance.vision/api"
-            self.wsBaseUrl = "wss://testnet.binance.vision/ws"
-        else:
-            self.baseUrl = "https://api.binance.com/api"
-            self.wsBaseUrl = "wss://stream.binance.com:9443/ws"
+        self.baseUrl, self.wsBaseUrl = _ENDPOINTS[self.useTestnet]
 
     def validate(self) -> None:
         """
@@ -132,6 +138,13 @@ class Settings:
 
         logger.info("✅ 配置校验通过")
 
+    def gridLevels(self) -> np.ndarray:
+        """
+        网格价位的 float64 版本，Decimal 在此边界一次性转换。
+        仅供分析 / 回测等数值路径使用，下单价位请使用 Decimal。
+        """
+        return grid_levels(float(self.gridLowerPrice), float(self.gridUpperPrice), self.gridCount)
+
     def logSummary(self) -> None:
         """安全地输出配置摘要，敏感字段脱敏"""
         logger.info("=" * 50)
@@ -156,9 +169,12 @@ class Settings:
         logger.info("=" * 50)
 
 
+@functools.lru_cache(maxsize=1)
 def loadSettings(envPath: str | None = None) -> Settings:
     """
     从 .env 文件加载配置并返回 Settings 实例。
+    结果按 envPath 缓存，同一进程内重复调用不会再次解析 .env；
+    测试中如需重新加载，调用 loadSettings.cache_clear()。
 
     @param envPath 自定义 .env 文件路径，默认使用项目根目录下的 .env
     @returns 经过校验的 Settings 实例
@@ -0,0 +1,20 @@
+"""
+币安交易机器人 — 网格价位数值计算
+
+面向分析 / 回测等浮点路径的向量化网格计算。
+下单路径仍使用 GridStrategy.generateGrid 的 Decimal 价位，保证价格精度。
+"""
+import numpy as np
+
+
+def grid_levels(lo: float, hi: float, n: int) -> np.ndarray:
+    """
+    生成等差网格价位 (float64)，与 generateGrid 相同的 lo + step * i 形式。
+
+    @param lo 网格下界
+    @param hi 网格上界
+    @param n 网格数量 (区间数)
+    @returns 长度为 n + 1 的价位数组
+    """
+    step = (hi - lo) / n
+    return lo + step * np.arange(n + 1, dtype=np.float64)
@@ -1,3 +1,6 @@
+import functools
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 
@@ -16,10 +19,24 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = Field(..., description="PostgreSQL async connection string")
     REDIS_URL: str = Field(..., description="Redis connection string")
+    # 连接池规模 (每个 worker 进程)：Redis 单次操作为微秒级，小池即可满足
+    DB_POOL_SIZE: int = 25
+    DB_MAX_OVERFLOW: int = 10
+    REDIS_POOL_SIZE: int = 8
     
     # Exchange
     BINANCE_TESTNET: bool = True
+    # 行情推送流类型：miniTicker / ticker 取最新成交价，bookTicker 取买一卖一中间价 (负载最小)
+    MARKET_STREAM: Literal["miniTicker", "ticker", "bookTicker"] = "miniTicker"
+
+    # 事件循环：Linux 上安装 rloop 后可开启，否则使用 uvloop (见 src/core/event_loop.py)
+    USE_IO_URING: bool = False
     IGNORE_GEO_CHECK: bool = False
+
+    # Feature flags: 启用的 API 模块 (src/api/v1/<name>.py)，纯鉴权节点可只保留 ["auth"]
+    ENABLED_MODULES: list[str] = [
+        "auth", "keys", "bots", "dashboard", "market", "notifications", "backtest", "ws",
+    ]
     
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
@@ -29,8 +46,20 @@ class Settings(BaseSettings):
         self.MASTER_ENCRYPTION_KEY = self.MASTER_ENCRYPTION_KEY.strip("'\"")
         self.JWT_SECRET_KEY = self.JWT_SECRET_KEY.strip("'\"")
         self.DATABASE_URL = self.DATABASE_URL.strip("'\"")
+        # 未指定驱动的 PostgreSQL 连接串统一使用 asyncpg (原生二进制协议)
+        for prefix in ("postgresql://", "postgres://"):
+            if self.DATABASE_URL.startswith(prefix):
+                self.DATABASE_URL = "postgresql+asyncpg://" + self.DATABASE_URL[len(prefix):]
         self.REDIS_URL = self.REDIS_URL.strip("'\"")
 
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    进程级 Settings 单例，环境变量与 .env 只解析一次。
+    测试中可调用 get_settings.cache_clear() 强制重新加载。
+    """
+    return Settings()
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
 
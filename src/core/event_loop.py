@@ -0,0 +1,27 @@
+"""
+事件循环工厂，供 uvicorn --loop src.core.event_loop:loop_factory 使用。
+
+默认使用 uvloop (libuv)；USE_IO_URING=true 且在 Linux 上安装了 rloop 时改用 rloop，
+导入失败则回退到 uvloop，Windows 等无 uvloop 的平台回退到标准 asyncio 事件循环。
+"""
+import asyncio
+import logging
+import sys
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def loop_factory() -> asyncio.AbstractEventLoop:
+    if settings.USE_IO_URING and sys.platform.startswith("linux"):
+        try:
+            import rloop
+            return rloop.new_event_loop()
+        except ImportError:
+            logger.warning("USE_IO_URING 已开启但未安装 rloop，回退到 uvloop")
+    try:
+        import uvloop
+        return uvloop.new_event_loop()
+    except ImportError:
+        return asyncio.new_event_loop()
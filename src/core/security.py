@@ -1,4 +1,6 @@
 from datetime import datetime, timedelta
+import functools
+import time
 import jwt
 from typing import Any
 from src.core.config import settings
@@ -6,6 +8,11 @@ from src.core.config import settings
 ALGORITHM = settings.JWT_ALGORITHM
 SECRET_KEY = settings.JWT_SECRET_KEY
 
+# NOTE: 签名密钥与校验选项在导入时一次性构造，避免每次验签重复编码
+_SIGNING_KEY = SECRET_KEY.encode()
+_ALGORITHMS = [ALGORITHM]
+_JWT_OPTIONS = {"require": ["exp", "sub"]}
+
 def create_access_token(subject: str | Any, is_admin: bool = False, expires_delta: timedelta | None = None) -> str:
     """Generate JWT Access Token"""
     if expires_delta:
@@ -18,13 +25,24 @@ def create_access_token(subject: str | Any, is_admin: bool = False, expires_delt
         "is_admin": is_admin,
         "exp": expire
     }
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _SIGNING_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# NOTE: 解码为纯 CPU 运算且结果只取决于 token 字符串，按 token 缓存验签结果；
+# 过期时间在命中缓存后重新校验，因此缓存条目不会让过期 token 继续生效。
+# 验签失败时抛出异常 (lru_cache 不缓存异常)，伪造 token 无法挤占缓存
+@functools.lru_cache(maxsize=4096)
+def _decode_verified(token: str) -> dict[str, Any]:
+    return jwt.decode(token, _SIGNING_KEY, algorithms=_ALGORITHMS, options=_JWT_OPTIONS)
+
 def decode_access_token(token: str) -> dict[str, Any] | None:
     """Decode and verify JWT token"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        payload = _decode_verified(token)
     except jwt.PyJWTError:
         return None
+    exp = payload.get("exp")
+    if exp is not None and exp <= time.time():
+        return None
+    # 返回副本，避免调用方修改缓存中的 payload
+    return dict(payload)
@@ -1,14 +1,22 @@
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from redis.asyncio import Redis
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from redis.asyncio import BlockingConnectionPool, Redis
 
 from src.core.config import settings
 
 # SQLAlchemy asyncio engine
+# NOTE: 接口以大量小型 SELECT 为主：开启 asyncpg 语句缓存复用预编译语句，
+# pre_ping / recycle 避免拿到被数据库或中间代理断开的空闲连接
 engine = create_async_engine(
-    settings.DATABASE_URL,
+    make_url(settings.DATABASE_URL).update_query_dict({"prepared_statement_cache_size": "512"}),
     echo=False,
-    pool_size=20,
-    max_overflow=10,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    connect_args={"statement_cache_size": 1024},
     future=True,
 )
 
@@ -22,23 +30,43 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 # Redis Connection Pool
-redis_client = Redis.from_url(
+# NOTE: 池规模较小，使用阻塞式连接池：突发并发时排队等待空闲连接，而不是直接抛出连接数超限
+redis_client = Redis(
+    connection_pool=BlockingConnectionPool.from_url(
+        settings.REDIS_URL,
+        encoding="utf-8",
+        decode_responses=True,
+        max_connections=settings.REDIS_POOL_SIZE,
+        timeout=5,
+    )
+)
+
+# 订阅专用客户端：不解码响应，pub/sub 负载以 bytes 直接交给 orjson 解析
+# (订阅会长期独占一条连接，因此与 redis_client 的共享池分开)
+redis_pubsub_client = Redis.from_url(
     settings.REDIS_URL,
-    encoding="utf-8",
-    decode_responses=True,
-    max_connections=50
+    decode_responses=False,
+    max_connections=2,
 )
 
 async def get_db() -> AsyncSession:
     """Dependency for getting async DB session"""
+    # NOTE: async with 退出时 close() 会回滚未提交的事务并归还连接，无需再手动 rollback / close
+    # 不包裹 session.begin()：写接口自行 commit，且提交后仍可能继续使用会话 (如注册后的 refresh)，
+    # 而在 begin() 上下文内提交后再发出语句会被 SQLAlchemy 拒绝
     async with AsyncSessionLocal() as session:
-        try:
+        yield session
+
+async def get_db_readonly() -> AsyncSession:
+    """
+    Dependency for read-only endpoints.
+    连接以 AUTOCOMMIT 模式运行，查询不再包裹 BEGIN / ROLLBACK，每个请求省去两次往返。
+    仅用于纯查询接口，不要在此会话上写入。
+    """
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        async with AsyncSession(bind=conn, expire_on_commit=False, autoflush=False) as session:
             yield session
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
 
 async def get_redis() -> Redis:
     """Dependency for getting sync Redis client"""
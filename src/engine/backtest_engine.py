@@ -1,26 +1,51 @@
 import logging
 import asyncio
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from decimal import Decimal
 from datetime import datetime
 from typing import List, Dict, Any, Type
 
+import numpy as np
+
 from src.models.bot import BotConfig, StrategyType
 from src.strategies.base_strategy import BaseStrategy
 
 logger = logging.getLogger(__name__)
 
+
+def _max_drawdown(equity: np.ndarray, start_equity: float) -> float:
+    """净值序列的最大回撤比例 (以起始资金作为初始峰值)"""
+    if equity.size == 0:
+        return 0.0
+    running_max = np.maximum.accumulate(equity)
+    np.maximum(running_max, start_equity, out=running_max)
+    # (peak - eq) / peak = 1 - eq / peak，原地复用峰值缓冲区，只需一次除法与一次归约
+    np.divide(equity, running_max, out=running_max)
+    return float(1.0 - running_max.min())
+
 class MockBinanceClient:
     """
     影子客户端 (Mock Client)。
     在回测过程中替代真实的 BinanceClient，模拟撮合与资产变动。
+
+    backtest_mode=True 时内部账本 (balance / positions / avg_price / current_price)
+    以 float 记账，回测不需要 Decimal 的 28 位精度；对策略暴露的查询接口仍返回 Decimal。
     """
-    def __init__(self, initial_balance: Decimal = Decimal("10000")):
-        self.balance = initial_balance
-        self.initial_balance = initial_balance
-        self.positions = Decimal("0")
-        self.avg_price = Decimal("0")
-        self.trades = []
-        self.current_price = Decimal("0")
+    def __init__(self, initial_balance: Decimal = Decimal("10000"), backtest_mode: bool = False):
+        self.backtest_mode = backtest_mode
+        self._num = float if backtest_mode else Decimal
+        self.balance = self._num(initial_balance)
+        self.initial_balance = self.balance
+        self.positions = self._num(0)
+        self.avg_price = self._num(0)
+        # NOTE: 成交记录按列存储 (SoA)：每笔只追加三个定长数值，不再为每笔构造 dict
+        self._trade_sides = array("b")    # 1 = BUY, -1 = SELL
+        self._trade_prices = array("d")
+        self._trade_qtys = array("d")
+        self.current_price = self._num(0)
         self._pricePrecision = 4
         self._quantityPrecision = 4
         # NOTE: GridStrategy.__init__ 会引用 client._rateLimiter，回测时不需要限速
@@ -28,14 +53,19 @@ class MockBinanceClient:
 
     async def getCurrentPrice(self, symbol: str | None = None) -> Decimal:
         """获取当前模拟价格 (回测时由引擎注入)"""
-        return self.current_price
+        return self._toDecimal(self.current_price)
+
+    def _toDecimal(self, value) -> Decimal:
+        # float 账本仅在回传给策略的边界处转换一次
+        return Decimal(repr(value)) if self.backtest_mode else value
 
     def _ensureConnected(self):
         return self
 
     async def createOrder(self, symbol: str, side: str, type: str, quantity: Decimal, price: Decimal = None, **kwargs):
         """模拟下单撮合"""
-        exec_price = price if price else self.current_price
+        exec_price = self._num(price) if price else self.current_price
+        quantity = self._num(quantity)
         notional = exec_price * quantity
         
         if side == "BUY":
@@ -49,12 +79,22 @@ class MockBinanceClient:
             self.balance += notional
             self.positions -= quantity
             
-        self.trades.append({
-            "side": side,
-            "price": exec_price,
-            "qty": quantity,
-        })
-        return {"orderId": f"mock_{len(self.trades)}", "status": "FILLED", "price": str(exec_price), "origQty": str(quantity)}
+        self._trade_sides.append(1 if side == "BUY" else -1)
+        self._trade_prices.append(exec_price)
+        self._trade_qtys.append(quantity)
+        return {"orderId": f"mock_{self.trade_count}", "status": "FILLED", "price": str(exec_price), "origQty": str(quantity)}
+
+    @property
+    def trade_count(self) -> int:
+        return len(self._trade_prices)
+
+    @property
+    def trades(self) -> list[dict]:
+        """按需还原为逐笔 dict 列表 (仅供分析 / 调试，回测热路径请使用列数组)"""
+        return [
+            {"side": "BUY" if s > 0 else "SELL", "price": p, "qty": q}
+            for s, p, q in zip(self._trade_sides, self._trade_prices, self._trade_qtys)
+        ]
 
     async def futuresCreateOrder(self, **kwargs):
         """模拟合约下单"""
@@ -67,16 +107,16 @@ class MockBinanceClient:
 
     async def getFreeBalance(self, asset: str) -> Decimal:
         # 回测时简单返回可用余额
-        return self.balance if asset != "BTC" else self.positions # 简化处理
+        return self._toDecimal(self.balance if asset != "BTC" else self.positions) # 简化处理
 
     async def getFuturesPosition(self, symbol: str):
         return {"positionAmt": str(self.positions), "entryPrice": str(self.avg_price)}
 
     def formatPrice(self, price: Decimal) -> str:
-        return str(round(price, self._pricePrecision))
+        return f"{price:.{self._pricePrecision}f}"
 
     def formatQuantity(self, quantity: Decimal) -> str:
-        return str(round(quantity, self._quantityPrecision))
+        return f"{quantity:.{self._quantityPrecision}f}"
 
     async def getKlines(self, symbol: str | None = None, interval: str = "1h", limit: int = 50, **kwargs):
         return []
@@ -97,42 +137,47 @@ class BacktestEngine:
     def __init__(self, strategy_class: Type[BaseStrategy], bot_config: BotConfig):
         self.strategy_class = strategy_class
         self.bot_config = bot_config
-        self.mock_client = MockBinanceClient(initial_balance=bot_config.total_investment)
+        self.mock_client = MockBinanceClient(initial_balance=bot_config.total_investment, backtest_mode=True)
         
     async def run(self, history_data: List[list]) -> Dict[str, Any]:
         """
         开始回测。
         @param history_data: 币安 K 线数组 [[time, open, high, low, close, vol...], ...]
         """
+        return await self.run_closes(np.asarray([k[4] for k in history_data], dtype=np.float64))
+
+    async def run_closes(self, closes: np.ndarray) -> Dict[str, Any]:
+        """
+        以收盘价序列驱动回测 (回测只使用收盘价)。
+        @param closes: 收盘价序列 (float64)
+        """
         # 1. 实例化策略并注入 Mock 客户端
         strategy = self.strategy_class(bot_config=self.bot_config, client=self.mock_client)
         
-        # 2. 执行初始化
+        # 2. 执行初始化，并让策略一次性预计算整段指标
         await strategy.initialize()
+        strategy.prepare_backtest(closes)
+        on_price_update = strategy.on_price_update
         
         # 3. 逐 K 线驱动 (使用收盘价)
         start_equity = self.mock_client.balance
-        max_equity = start_equity
-        min_equity = start_equity
-        max_drawdown = Decimal("0")
+        # NOTE: 循环内只记录净值，峰值与回撤在循环结束后由 NumPy 一次性归约
+        equity_arr = np.empty(len(closes), dtype=np.float64)
         
-        logger.info(f"📊 开始回测: {len(history_data)} 条 K 线数据...")
+        logger.info(f"📊 开始回测: {len(closes)} 条 K 线数据...")
         
-        for kline in history_data:
-            close_price = Decimal(str(kline[4]))
-            self.mock_client.current_price = close_price
+        for i, close in enumerate(closes.tolist()):
+            self.mock_client.current_price = close
             
             # TODO: 模拟订单更新事件 (回测简版可忽略详情)
             
-            # 触发策略逻辑
-            await strategy.on_price_update(close_price)
+            # 触发策略逻辑 (策略侧仍以 Decimal 计算下单量)
+            await on_price_update(Decimal(repr(close)), idx=i)
             
-            # 计算当前净值 (Equity)
-            current_equity = self.mock_client.balance + (self.mock_client.positions * close_price)
-            max_equity = max(max_equity, current_equity)
-            drawdown = (max_equity - current_equity) / max_equity
-            max_drawdown = max(max_drawdown, drawdown)
+            # 计算当前净值 (Equity)，float 账本
+            equity_arr[i] = self.mock_client.balance + (self.mock_client.positions * close)
             
+        max_drawdown = _max_drawdown(equity_arr, float(start_equity))
         end_equity = self.mock_client.balance + (self.mock_client.positions * self.mock_client.current_price)
         total_pnl = end_equity - start_equity
         roi = total_pnl / start_equity
@@ -143,8 +188,52 @@ class BacktestEngine:
             "end_balance": float(end_equity),
             "total_pnl": float(total_pnl),
             "roi": float(roi * 100),
-            "max_drawdown": float(max_drawdown * 100),
-            "trade_count": len(self.mock_client.trades),
+            "max_drawdown": max_drawdown * 100,
+            "trade_count": self.mock_client.trade_count,
         }
 
+    @classmethod
+    def run_sweep(cls, strategy_class: Type[BaseStrategy], configs: List[BotConfig], history_data: List[list]) -> List[Dict[str, Any]]:
+        """
+        参数扫描：同一段行情、多组配置并行回测 (多进程)，结果顺序与 configs 一致。
+        收盘价序列放入共享内存，子进程直接映射读取，不再逐进程序列化整段 K 线。
+        策略类需可在子进程中导入 (模块级定义)。
+        """
+        if not configs:
+            return []
+        closes = np.asarray([k[4] for k in history_data], dtype=np.float64)
+        workers = os.cpu_count() or 1
+        # 自适应批大小：每个进程约分到 4 批，兼顾负载均衡与进程间通信开销
+        batch_size = max(1, len(configs) // (workers * 4))
+        batches = [configs[i:i + batch_size] for i in range(0, len(configs), batch_size)]
+
+        shm = shared_memory.SharedMemory(create=True, size=max(closes.nbytes, 1))
+        try:
+            np.ndarray(closes.shape, dtype=np.float64, buffer=shm.buf)[:] = closes
+            with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+                futures = [
+                    pool.submit(_run_sweep_batch, shm.name, len(closes), strategy_class, batch)
+                    for batch in batches
+                ]
+                return [result for future in futures for result in future.result()]
+        finally:
+            shm.close()
+            shm.unlink()
+
+
+def _run_sweep_batch(shm_name: str, length: int, strategy_class: Type[BaseStrategy], configs: List[BotConfig]) -> List[Dict[str, Any]]:
+    """子进程入口：映射共享内存中的收盘价，依次回测本批配置"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    closes = np.ndarray((length,), dtype=np.float64, buffer=shm.buf)
+
+    async def _run_all() -> List[Dict[str, Any]]:
+        return [await BacktestEngine(strategy_class, config).run_closes(closes) for config in configs]
+
+    try:
+        return asyncio.run(_run_all())
+    finally:
+        # 释放对共享缓冲区的全部引用后才能 close
+        del closes, _run_all
+        shm.close()
+
 backtest_engine = None # 这里不需要单例，每次回测都是独立实例
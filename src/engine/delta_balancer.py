@@ -7,22 +7,25 @@ class DeltaBalancer:
     """
     期现对冲平衡器 (Delta Balancer)。
     专门用于量化并管理现货 (Spot) 与 U 本位合约 (Futures) 之间的风险敞口差额。
+
+    NOTE: 风险判定只需与 0.5% 量级的阈值比较，内部统一使用 float 计算；
+    需要交易所精度的下单数量由调用方在下单边界处转换为 Decimal。
     """
     
     def __init__(self, threshold_percent: Decimal = Decimal("0.005")):
         """
         @param threshold_percent: 允许的最大偏移阈值，默认 0.5%。超过此值将触发同步补单。
         """
-        self.threshold_percent = threshold_percent
+        self.threshold_percent = float(threshold_percent)
 
-    def get_exposure(self, spot_qty: Decimal, futures_qty: Decimal) -> Decimal:
+    def get_exposure(self, spot_qty: float, futures_qty: float) -> float:
         """
         计算绝对净敞口 (Delta)。
         对冲场景下：Spot Qty (多) + Futures Qty (空/负) = 0 为理想态。
         """
         return spot_qty + futures_qty
 
-    def analyze_imbalance(self, spot_qty: Decimal, futures_qty: Decimal, mid_price: Decimal) -> dict:
+    def analyze_imbalance(self, spot_qty: float, futures_qty: float, mid_price: float) -> dict:
         """
         分析不平衡状态及其修正方案。
         """
@@ -30,7 +33,7 @@ class DeltaBalancer:
         notional_delta = abs(delta * mid_price)
         
         # 计算偏移比例 (相对于现货持仓)
-        deviation_ratio = Decimal("0")
+        deviation_ratio = 0.0
         if spot_qty > 0:
             deviation_ratio = abs(delta) / spot_qty
 
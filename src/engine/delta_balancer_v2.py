@@ -1,6 +1,5 @@
 import logging
 import asyncio
-from decimal import Decimal
 from typing import Dict, Any, Optional
 
 from src.exchanges.binance_client import BinanceClient
@@ -19,17 +18,32 @@ class DeltaBalancerV2:
         self.client = client
         
         # 算法超参数
-        self.base_threshold = Decimal(str(bot_config.parameters.get("rebalance_threshold", 0.005)))
-        self.k_volatility = Decimal("1.5")           # 波动率调节灵敏度系数
-        self.fee_rate = Decimal("0.001")             # 预计综合交易成本 (Maker/Taker + 滑点预紧)
+        # NOTE: 代价函数只做风险量级比较，全部以 float 计算；下单数量的 Decimal 转换由调用方在下单边界完成
+        self.base_threshold = float(bot_config.parameters.get("rebalance_threshold", 0.005))
+        self.k_volatility = 1.5                      # 波动率调节灵敏度系数
+        self.fee_rate = 0.001                        # 预计综合交易成本 (Maker/Taker + 滑点预紧)
         
         self.vol_monitor = VolatilityMonitor(window=window)
 
+        # 每 tick 的波动率派生量缓存，仅在 update_market_context 时失效重算
+        self._cached_threshold: float = self.base_threshold
+        self._cached_std: float = 0.0001
+
     def update_market_context(self, price: float):
-        """同步最新价格到波动率分析器"""
+        """同步最新价格到波动率分析器，并一次性刷新本 tick 的阈值与标准差"""
         self.vol_monitor.update(price)
+        self._refresh_cache()
+
+    def _refresh_cache(self):
+        # NOTE: 窗口只在注入新价格时前进，同一 tick 内的多次分析直接复用缓存
+        if self.vol_monitor.is_ready():
+            self._cached_threshold = self.get_adaptive_threshold()
+            self._cached_std = float(self.vol_monitor.current_std)
+        else:
+            self._cached_threshold = self.base_threshold
+            self._cached_std = 0.0001
 
-    def get_adaptive_threshold(self) -> Decimal:
+    def get_adaptive_threshold(self) -> float:
         """
         计算动态死区阈值: 
         Threshold_adj = Base * (1 + k * max(0, Current_Vol/Avg_Vol - 1))
@@ -39,15 +53,15 @@ class DeltaBalancerV2:
         if not self.vol_monitor.is_ready():
             return self.base_threshold
             
-        ratio = Decimal(str(self.vol_monitor.get_volatility_ratio()))
+        ratio = float(self.vol_monitor.get_volatility_ratio())
         # 计算因波动率激增产生的“超额死区”权重
-        excess_vol_factor = max(Decimal("0"), ratio - Decimal("1"))
-        adaptive_limit = self.base_threshold * (Decimal("1") + self.k_volatility * excess_vol_factor)
+        excess_vol_factor = max(0.0, ratio - 1.0)
+        adaptive_limit = self.base_threshold * (1.0 + self.k_volatility * excess_vol_factor)
         
         # 硬限幅：最大放宽到 2.0% (4倍基准)，防止对冲完全瘫痪
-        return min(adaptive_limit, Decimal("0.02"))
+        return min(adaptive_limit, 0.02)
 
-    async def analyze_imbalance_v2(self, spot_qty: Decimal, futures_qty: Decimal, price: Decimal) -> dict:
+    async def analyze_imbalance_v2(self, spot_qty: float, futures_qty: float, price: float) -> dict:
         """
         执行基于代价函数 (Cost Function) 的不平衡分析。
         """
@@ -55,24 +69,24 @@ class DeltaBalancerV2:
         notional_delta = abs(delta * price)
         
         # 1. 计算偏离比例
-        deviation_ratio = Decimal("0")
+        deviation_ratio = 0.0
         if spot_qty > 0:
             deviation_ratio = abs(delta) / spot_qty
             
-        # 2. 计算动态阈值
-        dynamic_threshold = self.get_adaptive_threshold()
+        # 2. 动态阈值 (本 tick 缓存)
+        dynamic_threshold = self._cached_threshold
         
         # 3. 核心评估: 代价函数判定 (VaR vs Execution Cost)
         # 风险价值 (Risk Exposure): 敞口部分在即时波动下的潜在损失预期
-        std_factor = self.vol_monitor.get_current_std() if self.vol_monitor.is_ready() else Decimal("0.0001")
+        std_factor = self._cached_std
         risk_value = notional_delta * std_factor
         
         # 执行代价 (Execution Cost): 预估手续费 + 盘口滑点
         # 假设最小滑点为价格的 0.01%
-        execution_cost = (notional_delta * self.fee_rate) + (notional_delta * Decimal("0.0001"))
+        execution_cost = (notional_delta * self.fee_rate) + (notional_delta * 0.0001)
         
         # 判定：只有当 潜在风险 > 2倍执行代价 时，且 比例超过动态阈值，才触发真实下单
-        needs_fix = (deviation_ratio > dynamic_threshold) and (risk_value > execution_cost * Decimal("2.0"))
+        needs_fix = (deviation_ratio > dynamic_threshold) and (risk_value > execution_cost * 2.0)
         
         # 影子日志：如果满足老版本阈值但不满足代价函数，记录“节省的手续费”
         if not needs_fix and deviation_ratio > self.base_threshold:
@@ -82,14 +96,14 @@ class DeltaBalancerV2:
             "type": "HEDGE_DELTA_UPDATE",
             "bot_id": self.bot_config.id,
             "data": {
-                "delta_qty": float(delta),
-                "notional_usdt": float(notional_delta),
-                "deviation_ratio": float(deviation_ratio),
-                "dynamic_threshold": float(dynamic_threshold),
+                "delta_qty": delta,
+                "notional_usdt": notional_delta,
+                "deviation_ratio": deviation_ratio,
+                "dynamic_threshold": dynamic_threshold,
                 "needs_fix": needs_fix,
-                "spot_qty": float(spot_qty),
-                "futures_qty": float(futures_qty),
-                "price": float(price),
-                "risk_premium": float(risk_value / execution_cost) if execution_cost > 0 else 0
+                "spot_qty": spot_qty,
+                "futures_qty": futures_qty,
+                "price": price,
+                "risk_premium": risk_value / execution_cost if execution_cost > 0 else 0
             }
         }
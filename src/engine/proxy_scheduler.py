@@ -1,10 +1,23 @@
+import asyncio
 import logging
 import random
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
+
+import aiohttp
+
+try:
+    from aiohttp_socks import ProxyConnector
+except ImportError:  # SOCKS5 支持为可选依赖
+    ProxyConnector = None
 
 logger = logging.getLogger(__name__)
 
+# 探活并发上限，避免代理池较大时瞬间打开过多连接
+HEALTH_CHECK_CONCURRENCY = 32
+# 连续探活失败达到该次数后将节点移出代理池
+MAX_CONSECUTIVE_FAILURES = 3
+
 class ProxyScheduler:
     """
     分布式代理调度器。
@@ -13,6 +26,12 @@ class ProxyScheduler:
     def __init__(self, proxy_list: List[str] = None):
         # 内部代理池: {proxy_url: active_count}
         self._pool: Dict[str, int] = {}
+        # 按载荷分桶: {active_count: {proxy_url}}，配合 _min_load 以 O(1) 取出最小载荷的候选集
+        self._load_buckets: Dict[int, Set[str]] = {}
+        self._min_load: int = 0
+        # 每个代理复用一个探活会话，跨周期保持长连接，省去重复的 TCP/TLS 握手
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._failures: Dict[str, int] = {}
         
         # 尝试从环境变量加载初始化列表 (格式: SOCKS5_PROXIES=http://1.1.1.1:80,http://2.2.2.2:80)
         env_proxies = os.getenv("BINANCE_PROXY_POOL", "")
@@ -26,6 +45,7 @@ class ProxyScheduler:
             for p in proxy_list:
                 self._pool[p] = 0
         
+        self._rebuild_buckets()
         if self._pool:
             logger.info(f"📦 [ProxyScheduler] 代理池初始化完成，节点数量: {len(self._pool)}")
 
@@ -33,23 +53,45 @@ class ProxyScheduler:
         """动态向池中添加新的代理节点"""
         if proxy_url not in self._pool:
             self._pool[proxy_url] = 0
+            self._load_buckets.setdefault(0, set()).add(proxy_url)
+            self._min_load = 0
             logger.info(f"[ProxyScheduler] 已载入新代理节点: {proxy_url}")
+
+    def _rebuild_buckets(self):
+        self._load_buckets = {}
+        for url, count in self._pool.items():
+            self._load_buckets.setdefault(count, set()).add(url)
+        self._min_load = min(self._load_buckets, default=0)
+
+    def _move(self, proxy_url: str, new_load: int | None):
+        """将代理移出当前载荷桶并放入新桶 (new_load 为 None 表示移出代理池)"""
+        old_load = self._pool[proxy_url]
+        bucket = self._load_buckets[old_load]
+        bucket.discard(proxy_url)
+        if not bucket:
+            del self._load_buckets[old_load]
+        if new_load is None:
+            del self._pool[proxy_url]
+        else:
+            self._pool[proxy_url] = new_load
+            self._load_buckets.setdefault(new_load, set()).add(proxy_url)
+        # 载荷每次只变化 1，最小值通常可直接推出；仅在最小桶被清空时才扫描桶的键
+        if new_load is not None and new_load < self._min_load:
+            self._min_load = new_load
+        elif self._min_load not in self._load_buckets:
+            self._min_load = min(self._load_buckets, default=0)
             
     def get_best_proxy(self) -> Optional[str]:
         """按最小载荷分配代理并递增计数"""
         if not self._pool:
             return None
             
-        # 1. 寻找当前使用最少的代理 (Least Loaded)
-        sorted_proxies = sorted(self._pool.items(), key=lambda x: x[1])
-        min_count = sorted_proxies[0][1]
-        
-        # 2. 随机挑选一个使用率同为最低的，防止“堆积”在第一个
-        candidates = [p for p, c in self._pool.items() if c == min_count]
-        chosen = random.choice(candidates)
+        # 1. 取出当前使用最少的代理集合 (Least Loaded)，随机挑选一个，防止“堆积”在第一个
+        candidates = self._load_buckets[self._min_load]
+        chosen = random.choice(tuple(candidates))
         
-        # 3. 递增该代理的载荷计数
-        self._pool[chosen] += 1
+        # 2. 递增该代理的载荷计数
+        self._move(chosen, self._pool[chosen] + 1)
         
         logger.info(f"🚀 [ProxyScheduler] 成功分配代理: {chosen} (当前总载荷: {self._pool[chosen]})")
         return chosen
@@ -57,36 +99,68 @@ class ProxyScheduler:
     def release_proxy(self, proxy_url: Optional[str]):
         """当 Bot 停止时，释放代理占用的载荷计数"""
         if proxy_url and proxy_url in self._pool:
-            self._pool[proxy_url] = max(0, self._pool[proxy_url] - 1)
+            self._move(proxy_url, max(0, self._pool[proxy_url] - 1))
             logger.info(f"♻️ [ProxyScheduler] 代理已回收: {proxy_url} (剩余载荷: {self._pool[proxy_url]})")
 
     async def start_health_check(self):
         """[P3] 启动代理周期性探活任务"""
-        while True:
-            if self._pool:
-                tasks = [self._check_node(p) for p in self._pool.keys()]
-                await asyncio.gather(*tasks)
-            await asyncio.sleep(60) # 每分钟探活一次
-
-    async def _check_node(self, proxy_url: str):
-        """测试单个节点可用性，若失效则暂时剔除或标记"""
-        import aiohttp
+        sem = asyncio.Semaphore(HEALTH_CHECK_CONCURRENCY)
         try:
-            connector = None
+            while True:
+                if self._pool:
+                    tasks = [self._check_node(p, sem) for p in list(self._pool.keys())]
+                    await asyncio.gather(*tasks)
+                await asyncio.sleep(60) # 每分钟探活一次
+        finally:
+            await self.close()
+
+    def _get_session(self, proxy_url: str) -> aiohttp.ClientSession:
+        """按代理惰性创建并缓存探活会话 (连接器须在事件循环内创建，故不在 add_proxy 时预建)"""
+        session = self._sessions.get(proxy_url)
+        if session is None or session.closed:
             if proxy_url.startswith("socks5"):
-                from aiohttp_socks import ProxyConnector
-                connector = ProxyConnector.from_url(proxy_url)
-            
-            async with aiohttp.ClientSession(connector=connector) as session:
+                if ProxyConnector is None:
+                    raise RuntimeError("SOCKS5 代理需要安装 aiohttp_socks")
+                connector = ProxyConnector.from_url(proxy_url, limit=1, keepalive_timeout=60)
+            else:
+                connector = aiohttp.TCPConnector(limit=1, keepalive_timeout=60)
+            session = aiohttp.ClientSession(connector=connector)
+            self._sessions[proxy_url] = session
+        return session
+
+    async def _check_node(self, proxy_url: str, sem: asyncio.Semaphore):
+        """测试单个节点可用性，连续失败多次则移出代理池"""
+        async with sem:
+            try:
+                session = self._get_session(proxy_url)
+                # HTTP 代理走请求级 proxy 参数，SOCKS5 代理已由连接器接管
+                proxy = None if proxy_url.startswith("socks5") else proxy_url
                 # 访问币安 API 测试连通性
-                async with session.get("https://api.binance.com/api/v3/ping", timeout=5) as resp:
+                async with session.get("https://api.binance.com/api/v3/ping", proxy=proxy, timeout=5) as resp:
                     if resp.status != 200:
                         raise Exception(f"Status {resp.status}")
-        except Exception as e:
-            logger.warning(f"⚠️ [ProxyScheduler] 节点故障: {proxy_url} | 原因: {e}")
-            # 这里可以根据需要将节点从 pool 中暂时移除或标记
-            # 简单起见，如果连续失败多次，可以 pop 掉
-            pass
+                self._failures.pop(proxy_url, None)
+            except Exception as e:
+                failures = self._failures.get(proxy_url, 0) + 1
+                self._failures[proxy_url] = failures
+                logger.warning(f"⚠️ [ProxyScheduler] 节点故障: {proxy_url} | 原因: {e} (连续 {failures} 次)")
+                if failures >= MAX_CONSECUTIVE_FAILURES:
+                    await self._evict(proxy_url)
+
+    async def _evict(self, proxy_url: str):
+        """移除失效节点"""
+        if proxy_url in self._pool:
+            self._move(proxy_url, None)
+        self._failures.pop(proxy_url, None)
+        session = self._sessions.pop(proxy_url, None)
+        if session is not None:
+            await session.close()
+        logger.error(f"🗑️ [ProxyScheduler] 节点连续 {MAX_CONSECUTIVE_FAILURES} 次探活失败，已移出代理池: {proxy_url}")
+
+    async def close(self):
+        """关闭所有缓存的探活会话"""
+        sessions, self._sessions = list(self._sessions.values()), {}
+        await asyncio.gather(*(s.close() for s in sessions), return_exceptions=True)
 
     @property
     def total_capacity(self) -> int:
@@ -1,16 +1,21 @@
 import asyncio
-import json
 import logging
 from typing import Callable, Coroutine
 
+import orjson
+
 from redis.asyncio.client import PubSub
 
-from src.db.session import redis_client
+from src.db.session import redis_client, redis_pubsub_client
 # from src.engine.strategy_manager import strategy_manager # Moved to lazy import in handle method
 from src.engine.ws_hub import ws_hub
 
 logger = logging.getLogger(__name__)
 
+# 交易事件聚合发布：窗口内最多合并多少条、聚合窗口时长 (秒)
+TRADE_EVENT_BATCH_SIZE = 64
+TRADE_EVENT_FLUSH_INTERVAL = 0.005
+
 class RedisEventBus:
     """
     负责订阅跨进程级的指令 (如外部 Web 发出的强制停机指令 / 熔断系统广播)。
@@ -21,13 +26,25 @@ class RedisEventBus:
     def __init__(self):
         self._pubsub: PubSub | None = None
         self._listener_task: asyncio.Task | None = None
+        # 待发布的交易事件 (已编码)，由后台任务按批次以 pipeline 发出
+        self._outbox: asyncio.Queue[bytes] = asyncio.Queue()
+        self._flusher_task: asyncio.Task | None = None
+        # 后台任务已从发件箱取出、尚未发布成功的在途批次 (停止时补发)
+        self._pending: list[bytes] = []
+        # 频道 → 处理函数 (订阅客户端不解码响应，频道名为 bytes)
+        self._handlers: dict[bytes, Callable[[bytes], Coroutine]] = {
+            self.KILL_SWITCH_CHANNEL.encode(): self._handle_kill_switch_event,
+            self.TRADE_EVENTS_CHANNEL.encode(): self._handle_trade_event,
+        }
 
     async def start(self):
         """连入 Redis 并挂载订阅"""
-        # NOTE: 直接使用模块级单例，而非 FastAPI 依赖注入专用的 get_redis() 生成器
-        self._pubsub = redis_client.pubsub()
-        await self._pubsub.subscribe(self.KILL_SWITCH_CHANNEL)
-        logger.info(f"[RedisEventBus] Subscribed to '{self.KILL_SWITCH_CHANNEL}'")
+        # NOTE: 直接使用模块级单例，而非 FastAPI 依赖注入专用的 get_redis() 生成器；
+        # 订阅确认类消息在 PubSub 内部即被丢弃，listen() 只产出真正的消息
+        self._pubsub = redis_pubsub_client.pubsub(ignore_subscribe_messages=True)
+        # NOTE: 两个频道在同一条 SUBSCRIBE 中完成订阅，_listen_loop 按频道分发
+        await self._pubsub.subscribe(self.KILL_SWITCH_CHANNEL, self.TRADE_EVENTS_CHANNEL)
+        logger.info(f"[RedisEventBus] Subscribed to '{self.KILL_SWITCH_CHANNEL}', '{self.TRADE_EVENTS_CHANNEL}'")
         
         # 启动后台守护任务循环读消息
         self._listener_task = asyncio.create_task(self._listen_loop())
@@ -35,6 +52,17 @@ class RedisEventBus:
     async def stop(self):
         if self._listener_task:
             self._listener_task.cancel()
+        if self._flusher_task:
+            self._flusher_task.cancel()
+            try:
+                await self._flusher_task
+            except asyncio.CancelledError:
+                pass
+            # 发出退出前尚未 flush 的事件：先是在途批次，再按批清空发件箱
+            pending, self._pending = self._pending, []
+            while batch := self._drain(pending):
+                await self._flush(batch)
+                pending = []
         if self._pubsub:
             try:
                 await self._pubsub.unsubscribe()
@@ -48,7 +76,7 @@ class RedisEventBus:
     async def publish_kill_switch(self, reason: str, triggered_by: int):
         """主动触发全局交易挂起"""
         # NOTE: 直接使用模块级单例
-        payload = json.dumps({
+        payload = orjson.dumps({
             "action": "HALT_ALL",
             "reason": reason,
             "triggered_by": triggered_by
@@ -58,38 +86,62 @@ class RedisEventBus:
 
         
     async def publish_trade_event(self, user_id: int, bot_id: int, event_type: str, data: dict):
-        """推送具体的交易事件 (如 PnL 释放、成交提醒) 到频道，由各 WS 进程转发给对应用户"""
-        payload = json.dumps({
+        """
+        推送具体的交易事件 (如 PnL 释放、成交提醒) 到频道，由各 WS 进程转发给对应用户。
+        事件先进入发件箱，由后台任务在短窗口内合并为一次 pipeline 发布。
+        """
+        payload = orjson.dumps({
             "user_id": user_id,
             "bot_id": bot_id,
             "type": event_type,
             "data": data
         })
-        await redis_client.publish(self.TRADE_EVENTS_CHANNEL, payload)
-        logger.debug(f"[RedisEventBus] Published trade event for Bot [{bot_id}]: {event_type}")
+        self._outbox.put_nowait(payload)
+        if self._flusher_task is None or self._flusher_task.done():
+            self._flusher_task = asyncio.create_task(self._flush_loop())
+        logger.debug(f"[RedisEventBus] Queued trade event for Bot [{bot_id}]: {event_type}")
+
+    def _drain(self, batch: list[bytes]) -> list[bytes]:
+        """从发件箱非阻塞地取出事件，直至批次满或发件箱为空"""
+        while len(batch) < TRADE_EVENT_BATCH_SIZE and not self._outbox.empty():
+            batch.append(self._outbox.get_nowait())
+        return batch
+
+    async def _flush(self, batch: list[bytes]):
+        if not batch:
+            return
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for payload in batch:
+                    pipe.publish(self.TRADE_EVENTS_CHANNEL, payload)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"[RedisEventBus] 批量发布 {len(batch)} 条交易事件失败: {e}")
+
+    async def _flush_loop(self):
+        """后台发件任务：等到首条事件后再聚合一个短窗口，整批一次往返发出"""
+        while True:
+            self._pending = [await self._outbox.get()]
+            await asyncio.sleep(TRADE_EVENT_FLUSH_INTERVAL)
+            await self._flush(self._drain(self._pending))
+            self._pending = []
 
     async def _listen_loop(self):
         try:
-            while True:
-                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
-                if message:
-                    channel = message["channel"].decode("utf-8")
-                    data = message["data"].decode("utf-8")
-                    
-                    if channel == self.KILL_SWITCH_CHANNEL:
-                        await self._handle_kill_switch_event(data)
-                    elif channel == self.TRADE_EVENTS_CHANNEL:
-                        await self._handle_trade_event(data)
-                        
-                await asyncio.sleep(0.1)
+            # NOTE: listen() 直接挂起在 socket 上等待推送，消息到达即处理，无定时轮询延迟
+            async for message in self._pubsub.listen():
+                # data 为原始 bytes，直接交给 orjson.loads，无需 decode
+                handler = self._handlers.get(message["channel"])
+                if handler:
+                    await handler(message["data"])
         except asyncio.CancelledError:
             pass
         except Exception as e:
             logger.error(f"RedisEventBus 监听崩溃: {e}")
 
-    async def _handle_kill_switch_event(self, raw_data: str):
+    async def _handle_kill_switch_event(self, raw_data: bytes):
         try:
-            payload = json.loads(raw_data)
+            payload = orjson.loads(raw_data)
             action = payload.get("action")
             if action == "HALT_ALL":
                 logger.critical("🛑 [Kill Switch] 收到全服挂起指令，立即斩断交易并推送给所有的前端!")
@@ -107,10 +159,10 @@ class RedisEventBus:
         except Exception as e:
             logger.error(f"处理 Kill Switch 消息时发生错误: {e}")
 
-    async def _handle_trade_event(self, raw_data: str):
+    async def _handle_trade_event(self, raw_data: bytes):
         """解析来自 Redis 的私有交易事件并将其通过 WS 推送给特定用户"""
         try:
-            payload = json.loads(raw_data)
+            payload = orjson.loads(raw_data)
             user_id = payload.get("user_id")
             if user_id:
                 # 路由给 WS 挂载点进行推送
@@ -7,6 +7,9 @@ from src.models.bot import BotConfig, BotStatus, StrategyType
 from src.models.api_key import ApiKey
 from src.strategies.base_strategy import BaseStrategy
 from src.services.crypto_service import crypto_service
+from src.services.notification_service import notification_service
+from src.services.summary_cache import invalidate_overview
+from src.models.notification import NotificationLevel
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
@@ -15,9 +18,18 @@ from src.strategies.grid_strategy import GridStrategy
 from src.strategies.hedge_strategy import HedgeStrategy
 from src.services.geo_check_service import geo_check_service
 from src.engine.proxy_scheduler import proxy_scheduler
+from src.utils.http import get_shared_connector
+from src.db.session import redis_client
+from src.utils.rate_limiter import RateLimiter
 
 logger = logging.getLogger(__name__)
 
+# 同时进行清理 (撤单 / 断开连接 / 释放代理) 的机器人数量上限，避免批量停机时 IO 雪崩
+SHUTDOWN_CONCURRENCY = 16
+_shutdown_sem = asyncio.Semaphore(SHUTDOWN_CONCURRENCY)
+# 启动自愈时同时拉起的机器人数量上限 (解密 / 合规检查 / 建连在并发任务间相互重叠)
+RESUME_CONCURRENCY = 8
+
 class StrategyManager:
     """
     负责所有策略实例生命周期管理（启动、挂起、停止、状态查询）。
@@ -27,6 +39,10 @@ class StrategyManager:
         # 存储正在运行的机器人的 task 和对应的 strategy 实例
         # key: bot_config.id, value: { "task": asyncio.Task, "strategy": BaseStrategy }
         self._active_bots: Dict[int, Dict[str, any]] = {}
+
+        # 按 API Key 共享的速率桶 (币安权重按 Key / IP 计，而非按机器人计)
+        # key: api_key_id, value: { "rate_limiter": RateLimiter, "refcount": int }
+        self._key_pool: Dict[int, Dict[str, any]] = {}
         
         # 策略类型 -> 策略实现类的映射表
         self._strategy_registry: Dict[StrategyType, Type[BaseStrategy]] = {
@@ -34,6 +50,23 @@ class StrategyManager:
             StrategyType.HEDGE: HedgeStrategy,
         }
 
+    def _acquire_rate_limiter(self, api_key_id: int) -> RateLimiter:
+        """取得该 API Key 的共享速率桶，引用计数 +1"""
+        entry = self._key_pool.get(api_key_id)
+        if entry is None:
+            entry = self._key_pool[api_key_id] = {"rate_limiter": RateLimiter(), "refcount": 0}
+        entry["refcount"] += 1
+        return entry["rate_limiter"]
+
+    def _release_rate_limiter(self, api_key_id: int) -> None:
+        """引用计数 -1，最后一个使用该 Key 的机器人退出时移除速率桶"""
+        entry = self._key_pool.get(api_key_id)
+        if entry is None:
+            return
+        entry["refcount"] -= 1
+        if entry["refcount"] <= 0:
+            del self._key_pool[api_key_id]
+
     def register_strategy(self, strategy_type: StrategyType, strategy_class: Type[BaseStrategy]):
         """注册具体策略路由"""
         self._strategy_registry[strategy_type] = strategy_class
@@ -62,6 +95,8 @@ class StrategyManager:
             logger.error("❌ 未知或尚未注册的策略类型: %s", bot_config.strategy_type)
             return False
 
+        rate_limiter = None
+        client = None
         try:
             # 1. 初始化客户端连接池代理/凭据
             # V3.0 多租户架构：优先使用机器人参数中的固定代理，如无则由调度器按最小负载分配
@@ -89,10 +124,16 @@ class StrategyManager:
                 proxy=proxy
             )
             
-            from src.utils.rate_limiter import RateLimiter
-            rate_limiter = RateLimiter() # 为每个机器人独立分配速率桶（或稍后改造为连接池级共享）
-            
-            client = BinanceClient(config=client_config, rateLimiter=rate_limiter)
+            # NOTE: 同一 API Key 下的机器人共享速率桶；BinanceClient 绑定交易对 (精度 / 余额快照)，
+            # 仍按机器人创建，但复用进程级共享连接器，TCP / TLS 连接不再随机器人数量增长
+            rate_limiter = self._acquire_rate_limiter(bot_config.api_key_id)
+            client = BinanceClient(
+                config=client_config,
+                rateLimiter=rate_limiter,
+                connector=get_shared_connector(),
+                # 同交易对的机器人经 Redis 共享 K 线，减少重复的 REST 请求
+                klineRedis=redis_client,
+            )
             await client.connect()
 
             # 2. 实例化对应策略并调用统一生命周期的钩子
@@ -110,32 +151,42 @@ class StrategyManager:
                 "strategy": strategy_instance,
                 "client": client,
                 "proxy": proxy,
-                "is_auto_proxy": is_auto_proxy
+                "is_auto_proxy": is_auto_proxy,
+                "api_key_id": bot_config.api_key_id,
+                "user_id": bot_config.user_id,
             }
+            # 运行中机器人数变化，概览缓存失效
+            await invalidate_overview(bot_config.user_id, bot_config.api_key_id)
             logger.info("🟢 Bot [%d] 启动成功 (策略: %s, 代理: %s)", bot_id, bot_config.strategy_type.value, proxy or "DIRECT")
             return True
 
         except Exception as e:
             logger.exception("💥 Bot [%d] 启动时发生异常: %s", bot_id, str(e))
+            if client:
+                try:
+                    await client.disconnect()
+                except Exception:
+                    pass
+            if rate_limiter:
+                self._release_rate_limiter(bot_config.api_key_id)
             return False
 
     async def _run_bot_loop(self, bot_id: int, strategy: BaseStrategy, client: BinanceClient) -> None:
         """
         内部的运行大循环，负责维护各个流的健康挂载。
-        这里使用 asyncio.gather 并发管理行情与订单推送流。
+        这里使用 asyncio.TaskGroup 管理行情与订单推送流：任一流异常或本任务被取消时，
+        另一条流会被同步取消并等待退出，不会遗留仍在订阅的僵尸任务。
         """
         try:
             logger.info("📡 Bot [%d] 协程开始拉起 WebSocket 监听...", bot_id)
-            # 在单独的任务中挂载 WebSocket 流，若抛出异常则被 catch 住。
-            await asyncio.gather(
-                client.startTradeStream(onPrice=strategy.on_price_update),
-                client.startUserDataStream(onOrderUpdate=strategy.on_order_update)
-            )
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(client.startTradeStream(onPrice=strategy.on_price_update))
+                tg.create_task(client.startUserDataStream(onOrderUpdate=strategy.on_order_update))
         except asyncio.CancelledError:
             logger.info("🛑 Bot [%d] 的执行任务已收到取消指令，准备清理并退出...", bot_id)
             raise
-        except Exception as e:
-            logger.error("💥 Bot [%d] 运行时奔溃: %s", bot_id, e)
+        except ExceptionGroup as eg:
+            logger.error("💥 Bot [%d] 运行时奔溃: %s", bot_id, "; ".join(str(e) for e in eg.exceptions))
             # Todo: 此处可触发数据库状态回写 BotStatus.ERROR
         finally:
             logger.info("🧹 Bot [%d] 执行清理程序...", bot_id)
@@ -152,9 +203,12 @@ class StrategyManager:
             # 从管理器卸载本任务
             if bot_id in self._active_bots:
                 bot_info = self._active_bots.pop(bot_id, None)
-                # 释放代理负载计数
+                # 释放代理负载计数与共享速率桶引用
                 if bot_info and bot_info.get("is_auto_proxy"):
                     proxy_scheduler.release_proxy(bot_info.get("proxy"))
+                if bot_info:
+                    self._release_rate_limiter(bot_info["api_key_id"])
+                    await invalidate_overview(bot_info["user_id"], bot_info["api_key_id"])
                 logger.info("🗑️ Bot [%d] 的运行态数据已彻底从系统擦除", bot_id)
 
     async def stop_bot(self, bot_id: int) -> bool:
@@ -167,14 +221,16 @@ class StrategyManager:
             logger.info("Bot [%d] 不在运行列表中", bot_id)
             return False
 
-        logger.info("⏳ 正在请求停止 Bot [%d]...", bot_id)
-        task: asyncio.Task = bot_info["task"]
-        task.cancel()
-        
-        try:
-            await task
-        except asyncio.CancelledError:
-            logger.info("✅ Bot [%d] 现已安全停止完毕", bot_id)
+        # NOTE: 取消后的清理在 bot 任务内执行，持有信号量直到任务退出即可限制并发清理数
+        async with _shutdown_sem:
+            logger.info("⏳ 正在请求停止 Bot [%d]...", bot_id)
+            task: asyncio.Task = bot_info["task"]
+            task.cancel()
+
+            try:
+                await task
+            except asyncio.CancelledError:
+                logger.info("✅ Bot [%d] 现已安全停止完毕", bot_id)
             
         return True
 
@@ -191,11 +247,8 @@ class StrategyManager:
         logger.warning("🚨 引擎正在强平 Bot [%d]...", bot_id)
         strategy: BaseStrategy = bot_info["strategy"]
         
-        # 强平逻辑
-        if hasattr(strategy, "panic_close"):
-            result = await strategy.panic_close()
-        else:
-            result = {"status": "error", "message": "该策略类型暂不支持一键平仓"}
+        # 强平逻辑 (不支持的策略由 BaseStrategy 默认实现返回错误说明)
+        result = await strategy.panic_close()
             
         # 无论清盘由于精度或市价等原因有没有完全清算成功，机器人本身都必须立刻挂起下线
         await self.stop_bot(bot_id)
@@ -232,21 +285,30 @@ class StrategyManager:
             return
             
         logger.info("🚀 发现 %d 个待恢复机器人，正在批量拉起...", len(bots))
-        
-        for bot in bots:
+
+        # NOTE: 以有界并发代替逐个串行 + 固定休眠，某个机器人的网络握手期间其他机器人可继续解密与建连
+        sem = asyncio.Semaphore(RESUME_CONCURRENCY)
+        await asyncio.gather(*(self._resume_bot(bot, sem) for bot in bots))
+
+    async def _resume_bot(self, bot: BotConfig, sem: asyncio.Semaphore) -> None:
+        """恢复单个机器人 (异常在内部记录，不影响同批其他机器人)"""
+        async with sem:
             try:
                 # 检查是否重复拉起 (例如人工重启刚好撞在自动化钩子上)
                 if bot.id in self._active_bots:
-                    continue
+                    return
                 
                 # 获取解密凭据
                 api_key = bot.api_key
                 if not api_key:
                     logger.error("❌ Bot [%d] 缺少 API Key 关联，跳过恢复", bot.id)
-                    continue
+                    return
                     
-                # 使用用户的 DEK 解密该 ApiKey 的 Secret
-                secret = crypto_service.decrypt_user_secret(
+                # 使用用户的 DEK 解密该 ApiKey 的 Secret (同步 CPU 运算，放到线程池执行)
+                secret = await asyncio.to_thread(
+                    crypto_service.decrypt_api_secret,
+                    bot.user_id,
+                    api_key.id,
                     bot.user.encrypted_dek, 
                     api_key.encrypted_secret
                 )
@@ -265,8 +327,6 @@ class StrategyManager:
                 else:
                     logger.error("❌ Bot [%d] (%s) 恢复失败", bot.id, bot.name)
                 
-                await asyncio.sleep(0.5) # 避锋
-                
             except Exception as e:
                 logger.error("💥 恢复 Bot [%d] 时发生致命错误: %s", bot.id, e)
 
@@ -1,6 +1,7 @@
 import asyncio
 import logging
 import json
+import random
 from decimal import Decimal
 from typing import Dict, List, Set, Callable, Any, Optional
 
@@ -9,11 +10,76 @@ from src.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# 流异常断开后的重连退避 (秒)：指数增长并加入 ±50% 抖动，避免大量连接在故障恢复瞬间同时重连
+WS_BACKOFF_INITIAL = 1.0
+WS_BACKOFF_MAX = 60.0
+
+
+def _backoff_delay(backoff: float) -> float:
+    return backoff * (0.5 + random.random())
+
+
+def _split_callbacks(sub: Dict[str, Any]) -> None:
+    """
+    按同步 / 异步拆分回调并缓存为元组，仅在订阅变更时重建，
+    行情热路径上不再逐条调用 iscoroutinefunction。
+    """
+    callbacks = sub["callbacks"]
+    sub["async_cbs"] = tuple(cb for cb in callbacks if asyncio.iscoroutinefunction(cb))
+    sub["sync_cbs"] = tuple(cb for cb in callbacks if not asyncio.iscoroutinefunction(cb))
+
+
+def _split_market_callbacks(sub: Dict[str, Any]) -> None:
+    """行情订阅额外按价格类型 (float / Decimal) 拆分，供热路径按需构造价格对象"""
+    _split_callbacks(sub)
+    float_cbs = sub["float_cbs"]
+    sub["dispatch"] = (
+        tuple(cb for cb in sub["sync_cbs"] if cb in float_cbs),
+        tuple(cb for cb in sub["sync_cbs"] if cb not in float_cbs),
+        tuple(cb for cb in sub["async_cbs"] if cb in float_cbs),
+        tuple(cb for cb in sub["async_cbs"] if cb not in float_cbs),
+    )
+
+
+def _last_float(msg: dict) -> float:
+    return float(msg["c"])
+
+
+def _last_decimal(msg: dict) -> Decimal:
+    return Decimal(msg["c"])
+
+
+def _mid_float(msg: dict) -> float:
+    return (float(msg["b"]) + float(msg["a"])) / 2
+
+
+def _mid_decimal(msg: dict) -> Decimal:
+    return (Decimal(msg["b"]) + Decimal(msg["a"])) / 2
+
+
+# 行情流类型 → (流名后缀, 必备字段, float 取价, Decimal 取价)
+# NOTE: 策略只用价格，24h ticker 每秒约 500B 统计负载中绝大部分被丢弃；
+# miniTicker 保留最新成交价语义且负载更小，bookTicker 负载最小但以中间价近似成交价
+_MARKET_STREAMS: Dict[str, tuple[str, str, Callable[[dict], float], Callable[[dict], Decimal]]] = {
+    "miniTicker": ("@miniTicker", "c", _last_float, _last_decimal),
+    "ticker": ("@ticker", "c", _last_float, _last_decimal),
+    "bookTicker": ("@bookTicker", "b", _mid_float, _mid_decimal),
+}
+
+
+async def _gather_callbacks(coros: list, label: str) -> None:
+    """在同一个 Task 内并发执行一条消息的全部异步回调"""
+    results = await asyncio.gather(*coros, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error(f"{label}: {result}")
+
 class StreamAggregator:
     """
     WebSocket 流聚合器。
     
-    1. 行情聚合 (Market Aggregator): 多 Bot 共享同一个 Symbol 的 Ticker 流。
+    1. 行情聚合 (Market Aggregator): 多 Bot 共享同一个 Symbol 的 Ticker 流，
+       且同一环境 (主网 / 测试网) 的全部 Symbol 复用一条组合流 (combined stream) 连接。
     2. 用户流聚合 (User Stream Aggregator): 同一 API Key 的 Bot 共享同一个 UserData 流。
     """
     
@@ -21,8 +87,10 @@ class StreamAggregator:
         self._public_clients: Dict[bool, Optional[AsyncClient]] = {False: None, True: None}
         self._socket_managers: Dict[bool, Optional[BinanceSocketManager]] = {False: None, True: None}
         
-        # 行情订阅: { (symbol, is_testnet): { "callbacks": set(), "task": Task } }
+        # 行情订阅: { (symbol, is_testnet): { "callbacks": set(), "float_cbs": set(), "dispatch": tuple } }
         self._market_subscriptions: Dict[tuple[str, bool], Dict[str, Any]] = {}
+        # 每个环境一条组合行情流任务，订阅的 Symbol 集合变化时重建
+        self._market_tasks: Dict[bool, Optional[asyncio.Task]] = {False: None, True: None}
         
         # 用户流订阅: { api_key_id: { "callbacks": set(), "task": Task, "client": AsyncClient } }
         self._user_subscriptions: Dict[int, Dict[str, Any]] = {}
@@ -36,23 +104,39 @@ class StreamAggregator:
             self._public_clients[is_testnet] = client
             self._socket_managers[is_testnet] = BinanceSocketManager(client)
 
-    async def subscribe_market(self, symbol: str, callback: Callable[[Decimal], Any], is_testnet: bool = False):
-        """订阅公共行情流 (Ticker)"""
+    async def subscribe_market(
+        self,
+        symbol: str,
+        callback: Callable[[Decimal], Any] | Callable[[float], Any],
+        is_testnet: bool = False,
+        as_float: bool = False,
+    ):
+        """
+        订阅公共行情流 (Ticker)。
+        @param as_float: 以 float 接收价格 (仅做比较 / 展示的订阅者)；默认 Decimal。
+        每个 tick 的 float / Decimal 价格各最多构造一次，由同类订阅者共享。
+        """
         async with self._lock:
             await self._ensure_public_client(is_testnet)
             symbol = symbol.lower()
             key = (symbol, is_testnet)
             
             if key not in self._market_subscriptions:
-                logger.info(f"📡 [Aggregator] 开启新行情流: {symbol} (Testnet: {is_testnet})")
-                task = asyncio.create_task(self._market_loop(symbol, is_testnet))
+                logger.info(f"📡 [Aggregator] 加入行情组合流: {symbol} (Testnet: {is_testnet})")
                 self._market_subscriptions[key] = {
                     "callbacks": {callback},
-                    "task": task
+                    "float_cbs": set(),
                 }
-            else:
-                self._market_subscriptions[key]["callbacks"].add(callback)
-                logger.info(f"🔗 [Aggregator] 共享现有行情流: {symbol} (订阅数: {len(self._market_subscriptions[key]['callbacks'])})")
+                if as_float:
+                    self._market_subscriptions[key]["float_cbs"].add(callback)
+                _split_market_callbacks(self._market_subscriptions[key])
+                await self._restart_market_stream(is_testnet)
+                return
+            self._market_subscriptions[key]["callbacks"].add(callback)
+            logger.info(f"🔗 [Aggregator] 共享现有行情流: {symbol} (订阅数: {len(self._market_subscriptions[key]['callbacks'])})")
+            if as_float:
+                self._market_subscriptions[key]["float_cbs"].add(callback)
+            _split_market_callbacks(self._market_subscriptions[key])
 
     async def unsubscribe_market(self, symbol: str, callback: Callable, is_testnet: bool = False):
         """取消行情订阅"""
@@ -61,40 +145,80 @@ class StreamAggregator:
             key = (symbol, is_testnet)
             if key in self._market_subscriptions:
                 self._market_subscriptions[key]["callbacks"].discard(callback)
+                self._market_subscriptions[key]["float_cbs"].discard(callback)
+                _split_market_callbacks(self._market_subscriptions[key])
                 if not self._market_subscriptions[key]["callbacks"]:
-                    logger.info(f"🛑 [Aggregator] 无订阅者，正在销毁行情流: {symbol}")
-                    task = self._market_subscriptions[key]["task"]
-                    task.cancel()
+                    logger.info(f"🛑 [Aggregator] 无订阅者，移出行情组合流: {symbol}")
                     del self._market_subscriptions[key]
+                    await self._restart_market_stream(is_testnet)
 
-    async def _market_loop(self, symbol: str, is_testnet: bool):
-        """行情推送主循环"""
-        try:
-            sm = self._socket_managers[is_testnet]
-            res_socket = sm.symbol_ticker_socket(symbol=symbol)
-            key = (symbol, is_testnet)
-            async with res_socket as stream:
-                while True:
-                    msg = await stream.recv()
-                    if not msg or "c" not in msg:
-                        continue
-                        
-                    price = Decimal(msg["c"])
-                    # 分发给所有回调
-                    callbacks = self._market_subscriptions.get(key, {}).get("callbacks", set())
-                    for cb in list(callbacks):
-                        try:
-                            if asyncio.iscoroutinefunction(cb):
-                                asyncio.create_task(cb(price))
-                            else:
-                                cb(price)
-                        except Exception as e:
-                            logger.error(f"Market Callback Error [{symbol}]: {e}")
-                            
-        except asyncio.CancelledError:
-            pass
-        except Exception as e:
-            logger.error(f"Market Loop Crash [{symbol}]: {e}")
+    async def _restart_market_stream(self, is_testnet: bool):
+        """
+        按当前订阅的 Symbol 集合重建该环境的组合行情流 (需在 _lock 内调用)。
+        旧任务完全退出后才启动新任务，避免新旧连接重叠期间重复推送。
+        """
+        old = self._market_tasks[is_testnet]
+        if old:
+            old.cancel()
+            await asyncio.gather(old, return_exceptions=True)
+        suffix = _MARKET_STREAMS[settings.MARKET_STREAM][0]
+        # 流名 → (symbol, 订阅条目, 错误标签)。订阅条目在原 dict 上原地更新 (dispatch 元组整体替换)，
+        # 热路径持有其引用即可看到增减的回调，无需每条消息再查订阅表；Symbol 增删则会重建本路由表
+        routes = {
+            f"{symbol}{suffix}": (symbol, sub, f"Market Callback Error [{symbol}]")
+            for (symbol, testnet), sub in sorted(self._market_subscriptions.items())
+            if testnet == is_testnet
+        }
+        self._market_tasks[is_testnet] = (
+            asyncio.create_task(self._market_loop(routes, is_testnet)) if routes else None
+        )
+
+    async def _market_loop(self, routes: Dict[str, tuple[str, Dict[str, Any], str]], is_testnet: bool):
+        """行情推送主循环：一条组合流承载该环境的全部 Symbol，按流名路由到对应订阅"""
+        backoff = WS_BACKOFF_INITIAL
+        while True:
+            try:
+                sm = self._socket_managers[is_testnet]
+                _, field, to_float, to_decimal = _MARKET_STREAMS[settings.MARKET_STREAM]
+                # 组合流消息形如 {"stream": "btcusdt@miniTicker", "data": {...}}
+                res_socket = sm.multiplex_socket(list(routes))
+                async with res_socket as stream:
+                    while True:
+                        envelope = await stream.recv()
+                        if not envelope:
+                            continue
+                        if envelope.get("e") == "error":
+                            # python-binance 内部重连耗尽后以错误消息形式返回，交由外层退避重连
+                            raise ConnectionError(envelope.get("m") or envelope.get("type"))
+                        backoff = WS_BACKOFF_INITIAL
+                        route = routes.get(envelope.get("stream"))
+                        msg = envelope.get("data")
+                        if route is None or not msg or field not in msg:
+                            continue
+                        _, sub, label = route
+
+                        # NOTE: float 价格 (C 级解析) 与 Decimal 价格只在有对应订阅者时才构造
+                        sync_float, sync_dec, async_float, async_dec = sub["dispatch"]
+                        price_f = to_float(msg) if sync_float or async_float else None
+                        price_d = to_decimal(msg) if sync_dec or async_dec else None
+                        # 分发给所有回调：同步回调内联执行；异步回调合并到一个 Task 中并发执行，
+                        # 不再为每个订阅者单独创建 Task，也不阻塞行情读取
+                        for cbs, price in ((sync_float, price_f), (sync_dec, price_d)):
+                            for cb in cbs:
+                                try:
+                                    cb(price)
+                                except Exception as e:
+                                    logger.error(f"{label}: {e}")
+                        if async_float or async_dec:
+                            coros = [cb(price_f) for cb in async_float] + [cb(price_d) for cb in async_dec]
+                            asyncio.create_task(_gather_callbacks(coros, label))
+            except asyncio.CancelledError:
+                return
+            except Exception as e:
+                delay = _backoff_delay(backoff)
+                logger.error(f"Market Loop Crash [{','.join(route[0] for route in routes.values())}]: {e}，{delay:.1f}s 后重连")
+                await asyncio.sleep(delay)
+                backoff = min(backoff * 2, WS_BACKOFF_MAX)
 
     # --- User Data Stream Section ---
 
@@ -117,12 +241,14 @@ class StreamAggregator:
             else:
                 self._user_subscriptions[api_key_id]["callbacks"].add(callback)
                 logger.info(f"🔗 [Aggregator] 共享用户私有流: KeyID {api_key_id}")
+            _split_callbacks(self._user_subscriptions[api_key_id])
 
     async def unsubscribe_user_data(self, api_key_id: int, callback: Callable):
         """取消用户流订阅"""
         async with self._lock:
             if api_key_id in self._user_subscriptions:
                 self._user_subscriptions[api_key_id]["callbacks"].discard(callback)
+                _split_callbacks(self._user_subscriptions[api_key_id])
                 if not self._user_subscriptions[api_key_id]["callbacks"]:
                     logger.info(f"🛑 [Aggregator] 无订阅者，正在销毁用户流: {api_key_id}")
                     task = self._user_subscriptions[api_key_id]["task"]
@@ -151,46 +277,61 @@ class StreamAggregator:
 
         keepalive = asyncio.create_task(_keepalive_task())
         
+        backoff = WS_BACKOFF_INITIAL
         try:
-            user_socket = bm.user_socket()
-            async with user_socket as stream:
-                while True:
-                    msg = await stream.recv()
-                    if not msg:
-                        continue
+            while True:
+                try:
+                    user_socket = bm.user_socket()
+                    async with user_socket as stream:
+                        while True:
+                            msg = await stream.recv()
+                            if not msg:
+                                continue
+                            if msg.get("e") == "error":
+                                raise ConnectionError(msg.get("m") or msg.get("type"))
+                            backoff = WS_BACKOFF_INITIAL
                     
-                    # 分发给所有对该 Key 感兴趣的 Bot
-                    callbacks = self._user_subscriptions.get(api_key_id, {}).get("callbacks", set())
-                    for cb in list(callbacks):
-                        try:
-                            if asyncio.iscoroutinefunction(cb):
-                                asyncio.create_task(cb(msg))
-                            else:
-                                cb(msg)
-                        except Exception as e:
-                            logger.error(f"User Stream Callback Error [{api_key_id}]: {e}")
-                            
+                            # 分发给所有对该 Key 感兴趣的 Bot (回调已按同步 / 异步预先拆分)
+                            sub = self._user_subscriptions.get(api_key_id)
+                            if sub is None:
+                                continue
+                            for cb in sub["sync_cbs"]:
+                                try:
+                                    cb(msg)
+                                except Exception as e:
+                                    logger.error(f"User Stream Callback Error [{api_key_id}]: {e}")
+                            if sub["async_cbs"]:
+                                asyncio.create_task(_gather_callbacks(
+                                    [cb(msg) for cb in sub["async_cbs"]], f"User Stream Callback Error [{api_key_id}]"
+                                ))
+                except asyncio.CancelledError:
+                    return
+                except Exception as e:
+                    delay = _backoff_delay(backoff)
+                    logger.error(f"User Stream Loop Crash [{api_key_id}]: {e}，{delay:.1f}s 后重连")
+                    await asyncio.sleep(delay)
+                    backoff = min(backoff * 2, WS_BACKOFF_MAX)
         except asyncio.CancelledError:
             pass
-        except Exception as e:
-            logger.error(f"User Stream Loop Crash [{api_key_id}]: {e}")
         finally:
             keepalive.cancel()
 
     async def stop(self):
         """停机清理"""
         async with self._lock:
-            for sub in self._market_subscriptions.values():
-                sub["task"].cancel()
-            for sub in self._user_subscriptions.values():
-                sub["task"].cancel()
-                await sub["client"].close_connection()
-            
-            for client in self._public_clients.values():
-                if client:
-                    await client.close_connection()
+            # 先统一取消，再并发等待全部流退出，关闭耗时取最慢的一条而非逐条累加
+            tasks = [task for task in self._market_tasks.values() if task]
+            tasks += [sub["task"] for sub in self._user_subscriptions.values()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            clients = [sub["client"] for sub in self._user_subscriptions.values()]
+            clients += [client for client in self._public_clients.values() if client]
+            await asyncio.gather(*(c.close_connection() for c in clients), return_exceptions=True)
             
             self._market_subscriptions.clear()
+            self._market_tasks = {False: None, True: None}
             self._user_subscriptions.clear()
             logger.info("🏁 [Aggregator] 全局流聚合中心已下线")
 
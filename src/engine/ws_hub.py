@@ -1,12 +1,29 @@
 import asyncio
-import json
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional, Set, Tuple
+from weakref import WeakKeyDictionary
 
+import orjson
 from fastapi import WebSocket
 
 logger = logging.getLogger(__name__)
 
+# 单批并发推送的连接数上限：超过时分批推送，批间让出事件循环
+BROADCAST_BATCH_SIZE = 50
+# 私有消息合并窗口 (秒) 与单次合并条数上限：窗口内的多条消息以一个 JSON 数组帧推送
+PERSONAL_FLUSH_INTERVAL = 0.05
+PERSONAL_MAX_BATCH = 140
+
+# 与 json.dumps 行为对齐：允许非字符串键与 numpy 标量 (分析模块常产出 np.float64)
+_ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _encode(message) -> str:
+    """
+    将消息编码为文本帧内容，每次推送只编码一次，所有连接共用同一字符串。
+    前端按文本帧 JSON.parse，因此仍以 str 发送而非二进制帧。
+    """
+    return orjson.dumps(message, option=_ORJSON_OPTS).decode()
+
 class ConnectionManager:
     """
     WebSocket 连接管理器 (Hub)
@@ -16,66 +33,105 @@ class ConnectionManager:
     """
 
     def __init__(self):
-        # 维护基于 user_id 或会话的全部激活连接
-        self.active_connections: Dict[int, List[WebSocket]] = {}
-        # 专门针对大盘/行情看板的广播列表 (可不用登录也看到的公共连接)
-        self.public_connections: List[WebSocket] = []
+        # 维护基于 user_id 或会话的全部激活连接 (集合：断开清理为 O(1))
+        self.active_connections: Dict[int, Set[WebSocket]] = {}
+        # 专门针对大盘/行情看板的广播集合 (可不用登录也看到的公共连接)
+        self.public_connections: Set[WebSocket] = set()
+        # 反向索引：连接 → user_id (公共连接为 0)，断开时未传 user_id 也能 O(1) 定位归属；弱引用不延长连接生命周期
+        self._ws_to_user: WeakKeyDictionary[WebSocket, int] = WeakKeyDictionary()
+        # 待合并推送的私有消息及其定时 flush 任务 (按 user_id)
+        self._pending: Dict[int, list] = {}
+        self._flush_tasks: Dict[int, asyncio.Task] = {}
 
     async def connect(self, websocket: WebSocket, user_id: int = None):
         """接入新的 WebSocket 并接受"""
         await websocket.accept()
+        self._ws_to_user[websocket] = user_id or 0
         if user_id:
-            if user_id not in self.active_connections:
-                self.active_connections[user_id] = []
-            self.active_connections[user_id].append(websocket)
+            self.active_connections.setdefault(user_id, set()).add(websocket)
         else:
-            self.public_connections.append(websocket)
+            self.public_connections.add(websocket)
         logger.info(f"🟢 [WS Hub] 新连接入场. UserId: {user_id}")
 
     def disconnect(self, websocket: WebSocket, user_id: int = None):
         """下线断开清理资源"""
+        owner = self._ws_to_user.pop(websocket, None)
+        if user_id is None:
+            user_id = owner
         if user_id and user_id in self.active_connections:
-            if websocket in self.active_connections[user_id]:
-                self.active_connections[user_id].remove(websocket)
-                if not self.active_connections[user_id]:
-                    del self.active_connections[user_id]
+            connections = self.active_connections[user_id]
+            connections.discard(websocket)
+            if not connections:
+                del self.active_connections[user_id]
+                # 用户已无在线连接，丢弃尚未推送的缓冲消息
+                self._pending.pop(user_id, None)
+                task = self._flush_tasks.pop(user_id, None)
+                if task:
+                    task.cancel()
         else:
-            if websocket in self.public_connections:
-                self.public_connections.remove(websocket)
+            self.public_connections.discard(websocket)
         logger.info(f"🔌 [WS Hub] 连接已断开. UserId: {user_id}")
 
     async def send_personal_message(self, message: dict, user_id: int):
-        """发送私有频道消息，常用于推送用户自己的网格交易买卖结果"""
-        connections = self.active_connections.get(user_id, [])
-        dead_sockets = []
-        payload = json.dumps(message, ensure_ascii=False)
-        for connection in connections:
-            try:
-                await connection.send_text(payload)
-            except Exception:
-                dead_sockets.append(connection)
-                
-        # 清理异常或断线的连接
-        for d in dead_sockets:
-            self.disconnect(d, user_id)
+        """
+        发送私有频道消息，常用于推送用户自己的网格交易买卖结果。
+        消息先进入该用户的缓冲区，PERSONAL_FLUSH_INTERVAL 内的突发消息合并为一帧 JSON 数组推送
+        (只有一条时仍按单个对象推送)；缓冲达到 PERSONAL_MAX_BATCH 条时立即推送。
+        """
+        if user_id not in self.active_connections:
+            return
+        pending = self._pending.setdefault(user_id, [])
+        pending.append(message)
+        if len(pending) >= PERSONAL_MAX_BATCH:
+            # 已排程的定时任务保留，负责随后新到的消息
+            await self._flush_personal(user_id)
+        elif user_id not in self._flush_tasks:
+            self._flush_tasks[user_id] = asyncio.create_task(self._flush_personal_after(user_id))
+
+    async def _flush_personal_after(self, user_id: int):
+        await asyncio.sleep(PERSONAL_FLUSH_INTERVAL)
+        self._flush_tasks.pop(user_id, None)
+        await self._flush_personal(user_id)
+
+    async def _flush_personal(self, user_id: int):
+        messages = self._pending.pop(user_id, None)
+        if not messages:
+            return
+        payload = _encode(messages[0] if len(messages) == 1 else messages)
+        connections = self.active_connections.get(user_id, ())
+        await self._send_all([(ws, user_id) for ws in connections], payload)
 
     async def broadcast(self, message: dict):
         """向所有连接广播消息，多用于全服广播熔断等极强提醒"""
-        payload = json.dumps(message, ensure_ascii=False)
-        # 1. 广播所有访客
-        for connection in self.public_connections:
-            await self._safe_send(connection, payload, user_id=None)
-            
-        # 2. 广播所有登录用户
+        payload = _encode(message)
+        # 1. 所有访客 + 2. 所有登录用户
+        targets = [(ws, None) for ws in self.public_connections]
         for user_id, connections in self.active_connections.items():
-            for connection in connections:
-                await self._safe_send(connection, payload, user_id=user_id)
-
-    async def _safe_send(self, ws: WebSocket, msg: str, user_id: int = None):
-        try:
-            await ws.send_text(msg)
-        except Exception:
-            self.disconnect(ws, user_id=user_id)
+            targets.extend((ws, user_id) for ws in connections)
+        await self._send_all(targets, payload)
+
+    async def _send_all(self, targets: List[Tuple[WebSocket, Optional[int]]], payload: str):
+        """
+        并发推送到一组连接，推送耗时取最慢的一个而非逐个累加，慢客户端不会阻塞其他连接。
+        连接数较多时按 BROADCAST_BATCH_SIZE 分批，批间 sleep(0) 让出事件循环，避免大规模扇出饿死其他任务。
+        发送失败的连接视为已断线并清理。
+        """
+        if len(targets) <= BROADCAST_BATCH_SIZE:
+            await self._send_batch(targets, payload)
+            return
+        for start in range(0, len(targets), BROADCAST_BATCH_SIZE):
+            await self._send_batch(targets[start:start + BROADCAST_BATCH_SIZE], payload)
+            await asyncio.sleep(0)
+
+    async def _send_batch(self, targets: List[Tuple[WebSocket, Optional[int]]], payload: str):
+        if not targets:
+            return
+        results = await asyncio.gather(
+            *(ws.send_text(payload) for ws, _ in targets), return_exceptions=True
+        )
+        for (ws, user_id), result in zip(targets, results):
+            if isinstance(result, Exception):
+                self.disconnect(ws, user_id=user_id)
 
 # 暴露单例
 ws_hub = ConnectionManager()
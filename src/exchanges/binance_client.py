@@ -5,12 +5,15 @@
 所有请求自动经过速率限制器拦截，异常自动处理和重试。
 """
 import asyncio
+import inspect
 import logging
 import time
 from decimal import Decimal, ROUND_DOWN
-from typing import Any
+from typing import Any, TYPE_CHECKING
 
 from dataclasses import dataclass
+import aiohttp
+import orjson
 from binance import AsyncClient, BinanceSocketManager
 from binance.exceptions import BinanceAPIException
 
@@ -24,11 +27,35 @@ from src.utils.error_handler import (
     retryOnError,
 )
 
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
 logger = logging.getLogger(__name__)
 
 # NOTE: WebSocket 余额推送超过此时间未更新，视为断线，回退 REST
 BALANCE_STALE_TIMEOUT = 3600
 
+# K 线缓存有效期 (秒)：本实例内存缓存与跨机器人 / 跨进程共享的 Redis 缓存共用
+KLINE_CACHE_TTL = 60
+# 共享 K 线缓存读写失败后暂停使用的秒数，Redis 不可达时不让每次取 K 线都卡在连接池超时上
+KLINE_REDIS_RETRY_DELAY = 30
+
+# 智能撤单时同时在途的撤单请求上限 (权重仍由 RateLimiter 逐单扣减)
+CANCEL_CONCURRENCY = 10
+
+
+def _forwardsRequestParams(method: Any) -> bool:
+    """python-binance 内部请求方法是否仍把额外关键字参数 (data=...) 透传给 REST 请求"""
+    try:
+        params = inspect.signature(method).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(p.kind is p.VAR_KEYWORD or p.name == "data" for p in params)
+
+
+# NOTE: 单交易对 exchangeInfo 依赖 AsyncClient 的内部 _get，导入时按签名探测一次，不兼容的版本走公开接口
+_SYMBOL_EXCHANGE_INFO_SUPPORTED = _forwardsRequestParams(getattr(AsyncClient, "_get", None))
+
 
 def _toBinanceApiError(e: BinanceAPIException, rateLimiter: RateLimiter | None = None) -> ApiError:
     """
@@ -69,20 +96,33 @@ class BinanceClient:
     支持 V3.0 多账户隔离，基于实例级 ClientConfig 注入凭据。
     """
 
-    def __init__(self, config: ClientConfig, rateLimiter: RateLimiter) -> None:
+    def __init__(
+        self,
+        config: ClientConfig,
+        rateLimiter: RateLimiter,
+        connector: aiohttp.BaseConnector | None = None,
+        klineRedis: "Redis | None" = None,
+    ) -> None:
         self._settings = config
         self._rateLimiter = rateLimiter
+        # 可选的共享连接器：传入后 AsyncClient 复用该连接池而非自建 (不负责关闭)
+        self._connector = connector
+        # 可选的共享 K 线缓存 (Redis)：未传入时 (如独立运行的 CLI 机器人) 只使用本实例内存缓存
+        self._klineRedis = klineRedis
+        self._klineRedisRetryAt: float = 0.0
         self._client: AsyncClient | None = None
         self._socketManager: BinanceSocketManager | None = None
 
         # 交易对精度信息缓存
         self._pricePrecision: int = 2
         self._quantityPrecision: int = 6
+        # quantize 用的精度单位 (10^-precision)，随精度一起更新，格式化时不再重复求幂
+        self._priceQuant: Decimal = Decimal("0.01")
+        self._qtyQuant: Decimal = Decimal("0.000001")
         self._minNotional: Decimal = Decimal("10")
 
         # K 线缓存：减少 API 权重消耗
         self._klinesCache: dict[str, tuple[float, list]] = {}
-        _KLINE_CACHE_TTL = 60  # 缓存有效期（秒）
 
         # 订单 ID 前缀，用于重启后识别自己的挂单
         self._orderIdPrefix = "GRID_V2_"  # 最小下单金额
@@ -108,12 +148,14 @@ class BinanceClient:
 
         # NOTE: 支持针对该 Client 级别的独立代理绑定
         requests_params = {"proxy": self._settings.proxy} if self._settings.proxy else None
+        session_params = {"connector": self._connector, "connector_owner": False} if self._connector else None
         
         self._client = await AsyncClient.create(
             api_key=self._settings.apiKey,
             api_secret=self._settings.apiSecret,
             testnet=self._settings.useTestnet,
             requests_params=requests_params,
+            session_params=session_params,
         )
 
         # 同步服务器时间
@@ -125,9 +167,6 @@ class BinanceClient:
         # 初始化资金快照 (首次全量从 REST 获取)
         await self._syncBalances()
 
-        # 初始化单例 SocketManager，防止多流并发创建导致竞争
-        self._socketManager = BinanceSocketManager(self._client)
-
         logger.info("✅ 币安连接成功")
 
     async def disconnect(self) -> None:
@@ -147,6 +186,15 @@ class BinanceClient:
             self._client = None
             logger.info("🔌 已断开币安连接并清理 Socket 资源")
 
+    def _sm(self) -> BinanceSocketManager:
+        """
+        按需创建本客户端的单例 SocketManager。
+        行情与用户流已由 stream_aggregator 统一托管，仅在需要直连 Socket 时才分配。
+        """
+        if not self._socketManager:
+            self._socketManager = BinanceSocketManager(self._ensureConnected())
+        return self._socketManager
+
     def _ensureConnected(self) -> AsyncClient:
         """检查客户端是否已连接，未连接则抛出异常"""
         if not self._client:
@@ -186,51 +234,72 @@ class BinanceClient:
 
         try:
             await self._rateLimiter.acquireWeight(10)
-            info = await client.get_exchange_info()
-
-            for symbolInfo in info.get("symbols", []):
-                if symbolInfo["symbol"] == self._settings.tradingSymbol:
-                    for f in symbolInfo["filters"]:
-                        if f["filterType"] == "PRICE_FILTER":
-                            # NOTE: 从 tickSize 推算价格精度
-                            tickSize = Decimal(f["tickSize"])
-                            self._pricePrecision = max(0, -tickSize.normalize().as_tuple().exponent)
-
-                        elif f["filterType"] == "LOT_SIZE":
-                            stepSizeRaw = f["stepSize"]
-                            minQtyRaw = f["minQty"]
-                            stepSize = Decimal(stepSizeRaw)
-                            self._quantityPrecision = max(0, -stepSize.normalize().as_tuple().exponent)
-                            self._minQty = Decimal(minQtyRaw)
-                            logger.debug("DEBUG: LOT_SIZE filter: stepSize=%s, minQty=%s, calculated_precision=%d", stepSizeRaw, minQtyRaw, self._quantityPrecision)
-
-                        elif f["filterType"] == "NOTIONAL":
-                            self._minNotional = Decimal(f.get("minNotional", "10"))
-                            logger.debug("DEBUG: NOTIONAL filter: minNotional=%s", self._minNotional)
-
-                    logger.info(
-                        "📊 %s 精度: 价格=%d位, 数量=%d位, 最小金额=%s",
-                        self._settings.tradingSymbol,
-                        self._pricePrecision,
-                        self._quantityPrecision,
-                        self._minNotional,
-                    )
-                    return
+            symbolInfo = await self._fetchSymbolInfo(client)
+
+            if symbolInfo is not None:
+                # 按 filterType 分发，未关心的过滤器类型直接跳过
+                for f in symbolInfo["filters"]:
+                    handler = _FILTER_HANDLERS.get(f["filterType"])
+                    if handler:
+                        handler(self, f)
+
+                logger.info(
+                    "📊 %s 精度: 价格=%d位, 数量=%d位, 最小金额=%s",
+                    self._settings.tradingSymbol,
+                    self._pricePrecision,
+                    self._quantityPrecision,
+                    self._minNotional,
+                )
+                return
 
             logger.warning("⚠️ 未找到交易对 %s 的精度信息，使用默认值", self._settings.tradingSymbol)
 
         except BinanceAPIException as e:
+            # -1121: 交易对不存在，与全量查询时未匹配到的行为保持一致
+            if e.code == -1121:
+                logger.warning("⚠️ 未找到交易对 %s 的精度信息，使用默认值", self._settings.tradingSymbol)
+                return
             raise _toBinanceApiError(e, self._rateLimiter)
 
+    async def _fetchSymbolInfo(self, client: AsyncClient) -> dict[str, Any] | None:
+        """
+        获取当前交易对的 exchangeInfo 条目。
+        优先只请求当前交易对 (响应约 2KB，而非全市场约 2MB)：python-binance 公开的 get_exchange_info
+        不支持 symbol 参数，只能经其内部 _get 透传；所装版本不再兼容时回退到公开的 get_symbol_info。
+        """
+        symbol = self._settings.tradingSymbol
+        if _SYMBOL_EXCHANGE_INFO_SUPPORTED:
+            info = await client._get("exchangeInfo", data={"symbol": symbol})
+            return next(iter(info.get("symbols", [])), None)
+        return await client.get_symbol_info(symbol)
+
+    def _applyPriceFilter(self, f: dict[str, Any]) -> None:
+        # NOTE: 从 tickSize 推算价格精度
+        tickSize = Decimal(f["tickSize"])
+        self._pricePrecision = max(0, -tickSize.normalize().as_tuple().exponent)
+        # NOTE: 由精度而非 tickSize 本身推导，整数位 tickSize (如 10) 仍格式化为整数而非科学计数法
+        self._priceQuant = Decimal(1).scaleb(-self._pricePrecision)
+
+    def _applyLotSizeFilter(self, f: dict[str, Any]) -> None:
+        stepSizeRaw = f["stepSize"]
+        minQtyRaw = f["minQty"]
+        stepSize = Decimal(stepSizeRaw)
+        self._quantityPrecision = max(0, -stepSize.normalize().as_tuple().exponent)
+        self._qtyQuant = Decimal(1).scaleb(-self._quantityPrecision)
+        self._minQty = Decimal(minQtyRaw)
+        logger.debug("DEBUG: LOT_SIZE filter: stepSize=%s, minQty=%s, calculated_precision=%d", stepSizeRaw, minQtyRaw, self._quantityPrecision)
+
+    def _applyNotionalFilter(self, f: dict[str, Any]) -> None:
+        self._minNotional = Decimal(f.get("minNotional", "10"))
+        logger.debug("DEBUG: NOTIONAL filter: minNotional=%s", self._minNotional)
+
     def formatPrice(self, price: Decimal) -> str:
         """将价格截断到交易对允许的精度"""
-        quantize = Decimal(10) ** -self._pricePrecision
-        return str(price.quantize(quantize, rounding=ROUND_DOWN))
+        return str(price.quantize(self._priceQuant, rounding=ROUND_DOWN))
 
     def formatQuantity(self, quantity: Decimal) -> str:
         """将数量截断到交易对允许的精度"""
-        quantize = Decimal(10) ** -self._quantityPrecision
-        return str(quantity.quantize(quantize, rounding=ROUND_DOWN))
+        return str(quantity.quantize(self._qtyQuant, rounding=ROUND_DOWN))
 
     # ==================================================
     # 账户信息
@@ -261,6 +330,12 @@ class BinanceClient:
         @param asset 资产名称
         @returns 可用余额
         """
+        return (await self._getFreeBalances(asset))[0]
+
+    async def _getFreeBalances(self, *assets: str) -> list[Decimal]:
+        """
+        一次读取多个资产的可用余额：过期检查与缺失回退同步对整批只做一次。
+        """
         # NOTE: 过期保护 — 防止 WebSocket 断线后用僵尸数据做风控决策
         if self._lastBalanceUpdate > 0:
             staleness = time.time() - self._lastBalanceUpdate
@@ -271,12 +346,12 @@ class BinanceClient:
                 )
                 await self._syncBalances()
 
-        if asset in self._balances:
-            return self._balances[asset]
-        
-        # 如果缓存为空（尚未初始化），回退到一次性 REST 请求并填充缓存
-        await self._syncBalances()
-        return self._balances.get(asset, Decimal("0"))
+        balances = self._balances
+        if any(asset not in balances for asset in assets):
+            # 如果缓存为空（尚未初始化），回退到一次性 REST 请求并填充缓存
+            await self._syncBalances()
+        zero = Decimal("0")
+        return [balances.get(asset, zero) for asset in assets]
 
     async def _syncBalances(self) -> None:
         """全量同步资金快照 (REST 请求，消耗 10 权重)"""
@@ -287,7 +362,9 @@ class BinanceClient:
                 free = Decimal(balance["free"])
                 self._balances[asset] = free
             self._lastBalanceUpdate = time.time()
-            logger.info("💰 资金快照初始化完成: %s", self._getBalancesSummary())
+            # NOTE: 摘要需遍历全部资产 (数百个)，日志级别未开启 INFO 时不生成
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("💰 资金快照初始化完成: %s", self._getBalancesSummary())
         except Exception as e:
             logger.error("资金快照初始化失败: %s", e)
 
@@ -532,21 +609,41 @@ class BinanceClient:
         openOrders = await self.getOpenOrders()
         cancelCount = 0
 
+        # NOTE: 偏离判断只是阈值比较，无需 Decimal 精度：预先算出 float 上下界，逐单只做两次比较
+        cp = float(currentPrice)
+        th = float(threshold)
+        lo = cp * (1 - th)
+        hi = cp * (1 + th)
+
+        farOrderIds = []
         for order in openOrders:
             try:
-                orderPrice = Decimal(order["price"])
-                deviation = abs(orderPrice - currentPrice) / currentPrice
+                orderPrice = float(order["price"])
 
-                if deviation > threshold:
+                if orderPrice < lo or orderPrice > hi:
                     logger.debug(
                         "🧠 智能撤单: 价格偏离过大 (%.1f%% > %.1f%%), orderId=%s",
-                        float(deviation * 100), float(threshold * 100), order.get("orderId")
+                        abs(orderPrice - cp) / cp * 100, th * 100, order.get("orderId")
                     )
-                    await self.cancelOrder(int(order["orderId"]))
-                    cancelCount += 1
+                    farOrderIds.append(int(order["orderId"]))
             except Exception as e:
                 logger.error("撤销订单失败: %s", e)
 
+        # NOTE: 远端订单的撤单请求并发发出 (有界)，耗时约为 1 次往返而非 N 次；
+        # 不采用「全撤再重挂近端单」，重挂会改变订单 ID 并丢失排队优先级
+        sem = asyncio.Semaphore(CANCEL_CONCURRENCY)
+
+        async def _cancel(orderId: int) -> None:
+            async with sem:
+                await self.cancelOrder(orderId)
+
+        results = await asyncio.gather(*(_cancel(orderId) for orderId in farOrderIds), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("撤销订单失败: %s", result)
+            else:
+                cancelCount += 1
+
         if cancelCount > 0:
             logger.info("🧠 智能撤单完成: 共撤销 %d 个远端订单", cancelCount)
 
@@ -621,7 +718,8 @@ class BinanceClient:
     ) -> list[list]:
         """
         获取 K 线历史数据（带缓存）。
-        相同参数 60 秒内不重复请求，减少 API 权重消耗。
+        相同参数 60 秒内不重复请求，减少 API 权重消耗：
+        先查本实例缓存，再查 Redis (同交易对的所有机器人共享)，均未命中才请求币安。
 
         @param interval K 线周期
         @param limit 获取数量
@@ -636,23 +734,58 @@ class BinanceClient:
         # 检查缓存
         if cacheKey in self._klinesCache:
             cachedTime, cachedData = self._klinesCache[cacheKey]
-            if now - cachedTime < 60:
+            if now - cachedTime < KLINE_CACHE_TTL:
                 logger.debug("✅ K 线缓存命中: %s (%.0f秒前)", cacheKey, now - cachedTime)
                 return cachedData
 
         client = self._ensureConnected()
-        try:
-            klines = await client.get_klines(
-                symbol=target_symbol,
-                interval=interval,
-                limit=limit,
-            )
-            # 更新缓存
-            self._klinesCache[cacheKey] = (now, klines)
+
+        async def fetch() -> list[list]:
+            try:
+                klines = await client.get_klines(
+                    symbol=target_symbol,
+                    interval=interval,
+                    limit=limit,
+                )
+            except BinanceAPIException as e:
+                raise _toBinanceApiError(e, self._rateLimiter)
             logger.debug("获取 %s %d 根 %s K 线 (已缓存)", target_symbol, len(klines), interval)
             return klines
-        except BinanceAPIException as e:
-            raise _toBinanceApiError(e, self._rateLimiter)
+
+        # NOTE: 测试网与主网行情不同，键中区分环境；共享缓存不可用时直接请求
+        redisKey = f"klines:{'testnet' if self._settings.useTestnet else 'main'}:{cacheKey}"
+        klines = await self._readSharedKlines(redisKey)
+        if klines is None:
+            klines = await fetch()
+            await self._writeSharedKlines(redisKey, klines)
+        # 更新缓存
+        self._klinesCache[cacheKey] = (now, klines)
+        return klines
+
+    def _sharedKlinesAvailable(self) -> bool:
+        return self._klineRedis is not None and time.monotonic() >= self._klineRedisRetryAt
+
+    def _suspendSharedKlines(self, action: str, e: Exception) -> None:
+        self._klineRedisRetryAt = time.monotonic() + KLINE_REDIS_RETRY_DELAY
+        logger.warning("[KlineCache] 共享 K 线缓存%s失败，%d 秒内仅使用本地缓存: %s", action, KLINE_REDIS_RETRY_DELAY, e)
+
+    async def _readSharedKlines(self, key: str) -> list[list] | None:
+        if not self._sharedKlinesAvailable():
+            return None
+        try:
+            raw = await self._klineRedis.get(key)
+        except Exception as e:
+            self._suspendSharedKlines("读取", e)
+            return None
+        return orjson.loads(raw) if raw is not None else None
+
+    async def _writeSharedKlines(self, key: str, klines: list[list]) -> None:
+        if not self._sharedKlinesAvailable():
+            return
+        try:
+            await self._klineRedis.setex(key, KLINE_CACHE_TTL, orjson.dumps(klines))
+        except Exception as e:
+            self._suspendSharedKlines("写入", e)
 
     # 别名兼容：某些策略可能使用 snake_case 调用
     get_klines = getKlines
@@ -698,8 +831,7 @@ class BinanceClient:
         @returns (positionValue, totalValue) 以 USDT 计价
         """
         baseAsset = self._settings.tradingSymbol.replace("USDT", "")
-        baseFree = await self.getFreeBalance(baseAsset)
-        usdtFree = await self.getFreeBalance("USDT")
+        baseFree, usdtFree = await self._getFreeBalances(baseAsset, "USDT")
 
         # 如果未提供价格，则回退到 REST 请求 (1 权重)
         if currentPrice == 0:
@@ -785,3 +917,11 @@ class BinanceClient:
         except Exception as e:
             logger.error("❌ 用户流桥接异常: %s", e)
             raise
+
+
+# 交易对过滤器类型 → 精度解析方法 (_loadExchangeInfo 按 filterType 分发)
+_FILTER_HANDLERS = {
+    "PRICE_FILTER": BinanceClient._applyPriceFilter,
+    "LOT_SIZE": BinanceClient._applyLotSizeFilter,
+    "NOTIONAL": BinanceClient._applyNotionalFilter,
+}
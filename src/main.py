@@ -28,6 +28,14 @@ async def lifespan(app: FastAPI):
     # [P4] 停止流聚合中心
     from src.engine.stream_aggregator import stream_aggregator
     await stream_aggregator.stop()
+
+    # 释放共享的公共行情客户端连接池
+    from src.api.dependencies import close_shared_binance_client
+    await close_shared_binance_client()
+
+    # 关闭进程级共享 HTTP 连接池
+    from src.utils.http import close_shared_session
+    await close_shared_session()
         
     await redis_bus.stop()
 
@@ -46,6 +54,8 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # NOTE: 列表接口的 keyset 分页游标经响应头下发，跨域时需显式暴露给前端脚本
+        expose_headers=["X-Next-Cursor"],
     )
 
     from src.api.v1.api import api_router
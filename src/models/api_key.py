@@ -1,9 +1,15 @@
-from sqlalchemy import Column, String, Boolean, Integer, ForeignKey
+from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from src.models.base import Base
 
 class ApiKey(Base):
     __tablename__ = "api_keys"
+    __table_args__ = (
+        # 供 bot_configs (api_key_id, user_id) 复合外键引用，由数据库保证 API Key 归属
+        UniqueConstraint("id", "user_id", name="uq_api_keys_id_user_id"),
+        # 同一用户不可重复绑定同一公钥 (create_api_key 依赖其做 ON CONFLICT)
+        Index("ix_api_keys_user_apikey", "user_id", "api_key", unique=True),
+    )
 
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     exchange = Column(String(50), default="binance", nullable=False)
@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Numeric, Enum, JSON
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, ForeignKeyConstraint, Numeric, Enum, JSON, Index, text
 from sqlalchemy.orm import relationship
 
 from src.models.base import Base
@@ -20,6 +20,17 @@ class BotStatus(str, enum.Enum):
 
 class BotConfig(Base):
     __tablename__ = "bot_configs"
+    __table_args__ = (
+        # 仪表盘按用户 (及 API Key) 聚合
+        Index("ix_bot_configs_user_id_api_key_id", "user_id", "api_key_id"),
+        # 机器人列表 keyset 分页
+        Index("ix_bot_configs_user_id_id_desc", "user_id", text("id DESC")),
+        # 绑定的 API Key 必须属于同一用户
+        ForeignKeyConstraint(
+            ["api_key_id", "user_id"], ["api_keys.id", "api_keys.user_id"],
+            name="fk_bot_configs_api_key_owner", ondelete="RESTRICT",
+        ),
+    )
 
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     api_key_id = Column(Integer, ForeignKey("api_keys.id", ondelete="RESTRICT"), nullable=False)
@@ -42,5 +53,5 @@ class BotConfig(Base):
     is_testnet = Column(Boolean, default=False, nullable=False)
 
     user = relationship("User")
-    api_key = relationship("ApiKey")
+    api_key = relationship("ApiKey", foreign_keys=[api_key_id])
     trades = relationship("Trade", back_populates="bot_config", cascade="all, delete-orphan")
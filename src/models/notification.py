@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Enum, JSON
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Enum, JSON, Index, text
 from sqlalchemy.orm import relationship
 import enum
 
@@ -18,6 +18,12 @@ class Notification(Base):
     记录系统向用户发送的所有关键信息。
     """
     __tablename__ = "notifications"
+    __table_args__ = (
+        # 「用户未读通知，按时间倒序」的常用查询
+        Index("ix_notifications_user_unread_created", "user_id", "is_read", text("created_at DESC")),
+        # 通知流水 keyset 分页
+        Index("ix_notifications_user_id_id_desc", "user_id", text("id DESC")),
+    )
 
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     level = Column(Enum(NotificationLevel, name="notification_level_enum"), default=NotificationLevel.INFO)
@@ -1,9 +1,19 @@
 import base64
+import functools
+import threading
+import time
+from collections import OrderedDict
 from cryptography.fernet import Fernet, InvalidToken
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError
 from src.core.config import settings
 
+# API Secret 明文的进程内 L1 缓存：条目上限 / 存活秒数
+SECRET_CACHE_MAXSIZE = 1024
+SECRET_CACHE_TTL = 60
+# 按加密 DEK 缓存的用户 Fernet 实例上限
+USER_FERNET_CACHE_SIZE = 256
+
 class CryptoService:
     """
     Master Key & DEK Management Service
@@ -26,6 +36,12 @@ class CryptoService:
             raise ValueError(f"Invalid MASTER_ENCRYPTION_KEY (Length: {key_len}). Must be 32 url-safe base64-encoded bytes.") from e
             
         self._ph = PasswordHasher()
+        # NOTE: 主密钥解密 DEK 与 Fernet 密钥拆分只需做一次，按加密 DEK 复用已初始化的用户 Fernet
+        self._user_fernet = functools.lru_cache(maxsize=USER_FERNET_CACHE_SIZE)(self._build_user_fernet)
+        # {(user_id, api_key_id, hash(encrypted_dek), hash(encrypted_secret)): (过期时间, 明文)}
+        # NOTE: 明文以 bytearray 保存，淘汰时原地清零；解密可能被放到线程池执行，缓存读写需加锁
+        self._secret_cache: OrderedDict[tuple, tuple[float, bytearray]] = OrderedDict()
+        self._secret_cache_lock = threading.Lock()
 
 
     # --- PWD Hashing ---
@@ -55,6 +71,22 @@ class CryptoService:
         user_fernet = Fernet(plain_dek.encode())
         return user_fernet.encrypt(data.encode()).decode()
 
+    def _build_user_fernet(self, encrypted_dek: str) -> Fernet:
+        """用主密钥解开用户 DEK 并构造其 Fernet 实例 (失败不会被缓存)"""
+        try:
+            dek_bytes = self._master_fernet.decrypt(encrypted_dek.encode())
+        except InvalidToken:
+            raise ValueError("Invalid DEK (Master Key might have changed)")
+        return Fernet(dek_bytes)
+
+    def is_valid_dek(self, encrypted_dek: str) -> bool:
+        """检查加密 DEK 能否被当前主密钥解开 (成功结果会被缓存供后续加解密复用)"""
+        try:
+            self._user_fernet(encrypted_dek)
+            return True
+        except ValueError:
+            return False
+
     def encrypt_secret_with_dek(self, encrypted_dek_b64: str, secret_str: str) -> str:
         """
         信封加密便捷方法：先用主密钥解密用户 DEK，再用 DEK 加密目标秘钥。
@@ -64,12 +96,8 @@ class CryptoService:
             raise ValueError("Invalid DEK: encrypted_dek_b64 is empty")
             
         # 1. 用主密钥解开用户的 DEK
-        try:
-            dek_bytes = self._master_fernet.decrypt(encrypted_dek_b64.encode())
-        except InvalidToken:
-            raise ValueError("Invalid DEK (Master Key might have changed)")
+        user_fernet = self._user_fernet(encrypted_dek_b64)
         # 2. 用 DEK 加密目标数据
-        user_fernet = Fernet(dek_bytes)
         return user_fernet.encrypt(secret_str.encode()).decode()
 
     def decrypt_user_secret(self, encrypted_dek: str, encrypted_secret: str) -> str:
@@ -77,12 +105,43 @@ class CryptoService:
         Decrypt User's DEK with Master Key, then decrypt their Secret with DEK.
         """
         # 1. Decrypt DEK
-        try:
-            dek_bytes = self._master_fernet.decrypt(encrypted_dek.encode())
-        except InvalidToken:
-            raise ValueError("Invalid DEK (Master Key might have changed)")
-        user_fernet = Fernet(dek_bytes)
+        user_fernet = self._user_fernet(encrypted_dek)
         # 2. Decrypt Secret
         return user_fernet.decrypt(encrypted_secret.encode()).decode()
 
+    # --- API Secret L1 Cache ---
+    def decrypt_api_secret(self, user_id: int, api_key_id: int, encrypted_dek: str, encrypted_secret: str) -> str:
+        """
+        带短 TTL 缓存的 decrypt_user_secret，用于启动 / 恢复机器人的热路径。
+        缓存键包含密文哈希，DEK 或 Secret 轮换后自动失效。
+        """
+        key = (user_id, api_key_id, hash(encrypted_dek), hash(encrypted_secret))
+        now = time.monotonic()
+        with self._secret_cache_lock:
+            entry = self._secret_cache.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._secret_cache.move_to_end(key)
+                    return entry[1].decode()
+                self._evict_secret(key)
+
+        plain = self.decrypt_user_secret(encrypted_dek, encrypted_secret)
+        with self._secret_cache_lock:
+            if key in self._secret_cache:
+                self._evict_secret(key)
+            self._secret_cache[key] = (now + SECRET_CACHE_TTL, bytearray(plain.encode()))
+            while len(self._secret_cache) > SECRET_CACHE_MAXSIZE:
+                self._evict_secret(next(iter(self._secret_cache)))
+        return plain
+
+    def invalidate_secrets(self, user_id: int, api_key_id: int | None = None) -> None:
+        """清除某用户 (或其某个 API Key) 的缓存明文"""
+        with self._secret_cache_lock:
+            for key in [k for k in self._secret_cache if k[0] == user_id and (api_key_id is None or k[1] == api_key_id)]:
+                self._evict_secret(key)
+
+    def _evict_secret(self, key: tuple) -> None:
+        _, buf = self._secret_cache.pop(key)
+        buf[:] = bytes(len(buf))
+
 crypto_service = CryptoService()
@@ -1,9 +1,16 @@
 import aiohttp
+import asyncio
 import logging
+import time
 from typing import Optional
 
+from src.utils.http import get_shared_session
+
 logger = logging.getLogger(__name__)
 
+# 同一出口 (代理) 的检测结果缓存秒数：出口 IP 的归属地短时间内不会变化
+GEO_CACHE_TTL = 600
+
 class GeoCheckService:
     """
     地域合规预检服务。
@@ -15,17 +22,23 @@ class GeoCheckService:
     PROHIBITED_COUNTRIES = {
         "US", "CN", "NL"
     }
+
+    def __init__(self):
+        # {proxy: (过期时间, 检测结果)}，仅缓存成功探测到归属地的结果
+        self._cache: dict[Optional[str], tuple[float, tuple[bool, str]]] = {}
+        # 进行中的检测: {proxy: Future}，批量启动同一代理下的机器人只探测一次
+        self._inflight: dict[Optional[str], asyncio.Future] = {}
     
     async def get_ip_info(self, proxy: Optional[str] = None) -> Optional[dict]:
         """获取当前出口 IP 的详细信息"""
         # 使用 ip-api.com 获取 JSON 格式的 IP 地理位置
         url = "http://ip-api.com/json"
         try:
-            # 显式创建会话并应用代理
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, proxy=proxy, timeout=10) as response:
-                    if response.status == 200:
-                        return await response.json()
+            # 复用进程级共享会话，代理按请求指定
+            session = get_shared_session()
+            async with session.get(url, proxy=proxy, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status == 200:
+                    return await response.json()
         except Exception as e:
             logger.warning(f"[GeoCheck] 无法探测地理位置: {e}")
         return None
@@ -40,6 +53,19 @@ class GeoCheckService:
         if settings.BINANCE_TESTNET or settings.IGNORE_GEO_CHECK:
             return True, "Geo-check bypassed (Testnet or IgnoreEnabled)"
 
+        cached = self._cache.get(proxy)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        fut = self._inflight.get(proxy)
+        if fut is None:
+            fut = asyncio.ensure_future(self._check(proxy))
+            self._inflight[proxy] = fut
+            fut.add_done_callback(lambda _: self._inflight.pop(proxy, None))
+        # shield：单个调用方被取消时不影响其他等待同一检测的调用方
+        return await asyncio.shield(fut)
+
+    async def _check(self, proxy: Optional[str]) -> tuple[bool, str]:
         info = await self.get_ip_info(proxy)
         if not info:
             # 如果接口失效，我们选择警告通过。因为不合规在下单时币安也会返回错误。
@@ -54,15 +80,19 @@ class GeoCheckService:
         if country_code in self.PROHIBITED_COUNTRIES:
             msg = f"🚫 地域合规性拦截: 检测到受限区域 {country_code} (IP: {ip})"
             logger.error(msg)
-            return False, msg
+            return self._remember(proxy, (False, msg))
             
         # 2. 特殊地区级别拦截 (例如安大略省: Ontario)
         if country_code == "CA" and "Ontario" in region_name:
              msg = f"🚫 地域合规性拦截: 加拿大安大略省受限 (IP: {ip})"
              logger.error(msg)
-             return False, msg
+             return self._remember(proxy, (False, msg))
 
         logger.info(f"✅ 地域预检通过: {country_code} ({info.get('country')}) | IP: {ip}")
-        return True, "Compliant"
+        return self._remember(proxy, (True, "Compliant"))
+
+    def _remember(self, proxy: Optional[str], result: tuple[bool, str]) -> tuple[bool, str]:
+        self._cache[proxy] = (time.monotonic() + GEO_CACHE_TTL, result)
+        return result
 
 geo_check_service = GeoCheckService()
@@ -0,0 +1,48 @@
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+import orjson
+
+from src.db.session import redis_client
+
+logger = logging.getLogger(__name__)
+
+# 仪表盘概览为秒级变化的只读聚合，短 TTL 缓存即可吸收前端轮询；机器人增删 / 启停时主动失效
+OVERVIEW_CACHE_TTL = 30
+
+def overview_cache_key(user_id: int, api_key_id: Optional[int]) -> str:
+    return f"v1:dash:overview:{user_id}:{api_key_id}"
+
+async def cached_json(key: str, ttl: int, compute: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Cache-aside 读取：命中 Redis 直接返回，未命中则执行 compute() 并以 SETEX 回写。
+    Redis 不可用时降级为直接计算，不影响接口可用性。
+    """
+    try:
+        cached = await redis_client.get(key)
+        if cached is not None:
+            return orjson.loads(cached)
+    except Exception as e:
+        logger.warning(f"[SummaryCache] Redis 读取失败，降级直查: {e}")
+
+    result = await compute()
+
+    try:
+        await redis_client.setex(key, ttl, orjson.dumps(result))
+    except Exception as e:
+        logger.warning(f"[SummaryCache] Redis 回写失败: {e}")
+    return result
+
+async def invalidate(*keys: str) -> None:
+    """删除缓存键；Redis 不可用时仅记录告警，条目随 TTL 自然过期"""
+    try:
+        await redis_client.delete(*keys)
+    except Exception as e:
+        logger.warning(f"[SummaryCache] Redis 失效失败: {e}")
+
+async def invalidate_overview(user_id: int, api_key_id: Optional[int] = None) -> None:
+    """失效该用户的概览缓存：汇总视图，以及机器人所属 API Key 的筛选视图"""
+    keys = [overview_cache_key(user_id, None)]
+    if api_key_id is not None:
+        keys.append(overview_cache_key(user_id, api_key_id))
+    await invalidate(*keys)
@@ -36,8 +36,13 @@ async def fetchHistoricalKlines(
     interval: str,
     days: int,
     testnet: bool = False,
+    startMs: int | None = None,
 ) -> list[list]:
-    """从币安 API 下载历史 K 线数据（自动使用 .env 中的代理）"""
+    """
+    从币安 API 下载历史 K 线数据（自动使用 .env 中的代理）
+
+    @param startMs 起始时间戳 (毫秒)，供磁盘缓存增量拉取；为空时取最近 days 天
+    """
     proxyUrl = os.getenv("PROXY_URL")
     if proxyUrl:
         logger.info("🌐 使用代理: %s", proxyUrl)
@@ -48,8 +53,11 @@ async def fetchHistoricalKlines(
     )
 
     try:
-        startTime = datetime.utcnow() - timedelta(days=days)
-        startStr = startTime.strftime("%d %b %Y")
+        if startMs is not None:
+            startStr = startMs
+        else:
+            startTime = datetime.utcnow() - timedelta(days=days)
+            startStr = startTime.strftime("%d %b %Y")
 
         klines = await client.get_historical_klines(
             symbol=symbol,
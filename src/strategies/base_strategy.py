@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 from decimal import Decimal
 from typing import Any
 
+import numpy as np
+
 from src.exchanges.binance_client import BinanceClient
 from src.models.bot import BotConfig
 
@@ -19,6 +21,15 @@ class BaseStrategy(ABC):
         """
         self.bot_config = bot_config
         self._client = client
+
+    def prepare_backtest(self, closes: np.ndarray) -> None:
+        """
+        回测预处理钩子 (可选)：
+        回测引擎在逐 K 线驱动前调用一次，策略可在此一次性预计算整段指标，
+        之后 on_price_update 以 idx 直接索引预计算结果，避免逐 tick 重复计算。
+        """
+        pass
+
     @abstractmethod
     async def initialize(self) -> None:
         """
@@ -29,11 +40,12 @@ class BaseStrategy(ABC):
         pass
 
     @abstractmethod
-    async def on_price_update(self, price: Decimal) -> None:
+    async def on_price_update(self, price: Decimal, idx: int | None = None) -> None:
         """
         价格更新回调：
         由 WebSocket 行情流低延迟触发。
         核心的开平仓信号和逻辑判断应在此处处理。
+        @param idx: 回测时为当前 K 线下标 (对应 prepare_backtest 的序列)，实盘为 None
         """
         pass
 
@@ -46,6 +58,14 @@ class BaseStrategy(ABC):
         """
         pass
 
+    async def panic_close(self) -> dict[str, Any]:
+        """
+        一键平仓 (可选)：
+        撤销全部挂单并清算持仓，返回 {"status": ..., "message": ...}。
+        默认实现表示该策略不支持，需要支持的策略自行覆盖。
+        """
+        return {"status": "error", "message": "该策略类型暂不支持一键平仓"}
+
     @abstractmethod
     async def stop(self) -> None:
         """
@@ -282,7 +282,7 @@ class GridStrategy(BaseStrategy):
     # 核心交易逻辑
     # ==================================================
 
-    async def on_price_update(self, price: Decimal) -> None:
+    async def on_price_update(self, price: Decimal, idx: int | None = None) -> None:
         """
         价格更新回调 — WebSocket 推送新价格时调用。
 
@@ -295,16 +295,17 @@ class GridStrategy(BaseStrategy):
 
         self._lastPrice = price
 
-        # [P3] 实时价格广播：同步至前端监控水位线
-        asyncio.create_task(redis_bus.publish_trade_event(
-            user_id=self.bot_config.user_id,
-            bot_id=self.bot_config.id,
-            event_type="PRICE_UPDATE",
-            data={
-                "symbol": self._settings.tradingSymbol,
-                "price": float(price)
-            }
-        ))
+        # [P3] 实时价格广播：同步至前端监控水位线 (回测时 idx 非空，无需广播)
+        if idx is None:
+            asyncio.create_task(redis_bus.publish_trade_event(
+                user_id=self.bot_config.user_id,
+                bot_id=self.bot_config.id,
+                event_type="PRICE_UPDATE",
+                data={
+                    "symbol": self._settings.tradingSymbol,
+                    "price": float(price)
+                }
+            ))
 
         # --- 风控检查 ---
         if await self._checkStopLoss(price):
@@ -46,7 +46,7 @@ class HedgeStrategy(BaseStrategy):
         
         # [V4.0] 智能平衡器组件
         self._balancer_v2 = DeltaBalancerV2(bot_config, client)
-        self._v2_saved_commissions = Decimal("0") # 影子统计：V2 算法节省的预估手续费
+        self._v2_saved_commissions = 0.0 # 影子统计：V2 算法节省的预估手续费
 
     async def initialize(self) -> None:
         """初始化策略环境与初始建仓"""
@@ -124,7 +124,11 @@ class HedgeStrategy(BaseStrategy):
         except Exception as e:
             logger.error("💥 初始对冲建仓发生致命错误: %s", e)
 
-    async def on_price_update(self, price: Decimal) -> None:
+    def prepare_backtest(self, closes) -> None:
+        """回测前缓存 float 收盘价序列，逐 K 线时按下标取值，省去 Decimal → float 转换"""
+        self._backtest_closes = closes.tolist()
+
+    async def on_price_update(self, price: Decimal, idx: int | None = None) -> None:
         """
         [V4.0] 实时价格回调：智能对冲核心。
         同时运行 V1(影子) 与 V2(智能) 算法进行对比与决策。
@@ -133,27 +137,32 @@ class HedgeStrategy(BaseStrategy):
         if not self._running:
             return
 
+        # NOTE: 风险分析全程使用 float，每 tick 只做一次 Decimal → float 转换
+        price_f = float(price) if idx is None else self._backtest_closes[idx]
+        spot_f = float(self._spot_qty)
+        futures_f = float(self._futures_qty)
+
         # 1. 更新波动率感知环境
-        self._balancer_v2.update_market_context(float(price))
+        self._balancer_v2.update_market_context(price_f)
         
         # 2. 获取 V1 简单分析 (用于向下兼容或对比)
         analysis_v1 = delta_balancer.analyze_imbalance(
-            spot_qty=self._spot_qty,
-            futures_qty=self._futures_qty,
-            mid_price=price
+            spot_qty=spot_f,
+            futures_qty=futures_f,
+            mid_price=price_f
         )
         
         # 3. 获取 V2 智能分析
         analysis_v2_res = await self._balancer_v2.analyze_imbalance_v2(
-            spot_qty=self._spot_qty,
-            futures_qty=self._futures_qty,
-            price=price
+            spot_qty=spot_f,
+            futures_qty=futures_f,
+            price=price_f
         )
         analysis_v2 = analysis_v2_res["data"]
         
         # 影子交易记录：如果 V1 喊“该平衡了”但 V2 喊“不划算，别动”，累加节省成本
         if analysis_v1["needs_fix"] and not analysis_v2["needs_fix"]:
-            self._v2_saved_commissions += (analysis_v1["notional_usdt"] * Decimal("0.0004")) # 按 0.04% 预估
+            self._v2_saved_commissions += analysis_v1["notional_usdt"] * 0.0004 # 按 0.04% 预估
             logger.debug("👻 [Shadow Trade] V2 算法拦截了一次低性价比调仓。累计节省磨损: %s USDT", self._v2_saved_commissions)
 
         # 最终执行决策：目前切换至 V2 级智能决策
@@ -164,21 +173,24 @@ class HedgeStrategy(BaseStrategy):
                            analysis_v2["risk_premium"])
             
             # 兼容老版本执行格式
+            # NOTE: 下单数量直接由 Decimal 持仓精确求差，不使用 float 分析结果，避免尾差被交易所精度截断
             fix_analysis = {
-                "delta_qty": Decimal(str(analysis_v2["delta_qty"])),
+                "delta_qty": self._spot_qty + self._futures_qty,
                 "notional_usdt": Decimal(str(analysis_v2["notional_usdt"])),
                 "fix_action": "SELL_FUTURES" if analysis_v2["delta_qty"] > 0 else "BUY_FUTURES",
                 "deviation_ratio": Decimal(str(analysis_v2["deviation_ratio"]))
             }
             await self._rebalance(fix_analysis)
 
-        # 推送增强后的状态给前端仪表盘
+        # 推送增强后的状态给前端仪表盘 (回测无前端订阅，跳过)
+        if idx is not None:
+            return
         asyncio.create_task(ws_hub.send_personal_message({
             "type": "HEDGE_DELTA_UPDATE",
             "bot_id": self.bot_config.id,
             "data": {
                 **analysis_v2,
-                "v2_saved_fees": float(self._v2_saved_commissions),
+                "v2_saved_fees": self._v2_saved_commissions,
                 "is_v2": True
             }
         }, self.bot_config.user_id))
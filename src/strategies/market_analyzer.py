@@ -60,6 +60,21 @@ class GridAdjustment:
         )
 
 
+@dataclass(frozen=True)
+class IndicatorSnapshot:
+    """
+    单个 K 线窗口的技术指标快照。
+    仅依赖 K 线本身（与持仓、状态机无关），可按窗口安全复用。
+    """
+    smaShort: Decimal
+    smaLong: Decimal
+    rsi: Decimal
+    atr: Decimal
+    volumeRatio: Decimal
+    currentPrice: Decimal
+    emaMacro: Decimal
+
+
 class AsymmetricStateController:
     """
     用户推荐：非对称状态控制器。
@@ -176,21 +191,16 @@ class MarketAnalyzer:
             return self._defaultAdjustment()
 
         # --- 大周期指标 ---
-        bigCloses = [Decimal(k[4]) for k in klinesBig]
-        bigHighs = [Decimal(k[2]) for k in klinesBig]
-        bigLows = [Decimal(k[3]) for k in klinesBig]
-        bigVolumes = [Decimal(k[5]) for k in klinesBig]
-
-        smaShort = self._calcSMA(bigCloses, self.SMA_SHORT)
-        smaLong = self._calcSMA(bigCloses, self.SMA_LONG)
-        rsi = self._calcRSI(bigCloses, self.RSI_PERIOD)
-        atr = self._calcATR(bigHighs, bigLows, bigCloses, self.ATR_PERIOD)
-        volumeRatio = self._calcVolumeRatio(bigVolumes)
-        currentPrice = bigCloses[-1]
+        ind = self._calcIndicators(klinesBig)
+        smaShort = ind.smaShort
+        smaLong = ind.smaLong
+        rsi = ind.rsi
+        atr = ind.atr
+        volumeRatio = ind.volumeRatio
+        currentPrice = ind.currentPrice
 
         # v2.2: 宏观雷达 EMA200
-        emaPeriod = getattr(self._settings, "trendEmaPeriod", self.EMA_MACRO_PERIOD) if self._settings else self.EMA_MACRO_PERIOD
-        emaMacro = self._calcEMA(bigCloses, emaPeriod)
+        emaMacro = ind.emaMacro
         isMacroBullish = currentPrice > emaMacro
 
         # ATR 相对比例
@@ -266,6 +276,28 @@ class MarketAnalyzer:
     # 技术指标计算
     # ==================================================
 
+    def _calcIndicators(self, klinesBig: list[list]) -> IndicatorSnapshot:
+        """
+        计算大周期 K 线窗口的全部技术指标。
+        纯函数（除读取 settings 中的 EMA 周期外无副作用），便于回测脚本按窗口缓存。
+        """
+        bigCloses = [Decimal(k[4]) for k in klinesBig]
+        bigHighs = [Decimal(k[2]) for k in klinesBig]
+        bigLows = [Decimal(k[3]) for k in klinesBig]
+        bigVolumes = [Decimal(k[5]) for k in klinesBig]
+
+        emaPeriod = getattr(self._settings, "trendEmaPeriod", self.EMA_MACRO_PERIOD) if self._settings else self.EMA_MACRO_PERIOD
+
+        return IndicatorSnapshot(
+            smaShort=self._calcSMA(bigCloses, self.SMA_SHORT),
+            smaLong=self._calcSMA(bigCloses, self.SMA_LONG),
+            rsi=self._calcRSI(bigCloses, self.RSI_PERIOD),
+            atr=self._calcATR(bigHighs, bigLows, bigCloses, self.ATR_PERIOD),
+            volumeRatio=self._calcVolumeRatio(bigVolumes),
+            currentPrice=bigCloses[-1],
+            emaMacro=self._calcEMA(bigCloses, emaPeriod),
+        )
+
     @staticmethod
     def _calcSMA(closes: list[Decimal], period: int) -> Decimal:
         """计算简单移动平均线"""
@@ -0,0 +1,67 @@
+"""
+币安交易机器人 — 共享 HTTP 连接池
+
+进程内所有出站 HTTP 组件（Telegram 通知、币安 REST 客户端、回测行情客户端）
+共用同一个 TCPConnector，复用 keep-alive 连接与 TLS 会话，避免连接池碎片化。
+"""
+import logging
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# NOTE: 连接池参数：总连接上限 / 单主机上限 / DNS 缓存秒数 / 空闲保活秒数
+POOL_LIMIT = 100
+POOL_LIMIT_PER_HOST = 30
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 75
+
+_connector: aiohttp.TCPConnector | None = None
+_session: aiohttp.ClientSession | None = None
+
+
+def get_shared_connector() -> aiohttp.TCPConnector:
+    """
+    获取进程级共享的 TCPConnector（懒加载，须在事件循环内调用）。
+
+    python-binance 的 AsyncClient 会自建带鉴权头的 ClientSession，
+    无法直接注入 session，但可通过 session_params 共享底层连接器。
+    """
+    global _connector
+    if _connector is None or _connector.closed:
+        _connector = aiohttp.TCPConnector(
+            limit=POOL_LIMIT,
+            limit_per_host=POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+        )
+        logger.debug("🔌 共享 HTTP 连接池已创建")
+    return _connector
+
+
+def get_shared_session() -> aiohttp.ClientSession:
+    """获取进程级共享的 ClientSession（懒加载，须在事件循环内调用）"""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=get_shared_connector(),
+            connector_owner=False,
+        )
+    return _session
+
+
+def shared_session_params() -> dict:
+    """供 AsyncClient.create(session_params=...) 使用的参数，令其复用共享连接器"""
+    return {"connector": get_shared_connector(), "connector_owner": False}
+
+
+async def close_shared_session() -> None:
+    """关闭共享 session 与连接器，仅在进程退出时调用"""
+    global _connector, _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+    if _connector is not None:
+        await _connector.close()
+        _connector = None
+        logger.debug("🔌 共享 HTTP 连接池已关闭")
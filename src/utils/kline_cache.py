@@ -0,0 +1,103 @@
+"""
+币安交易机器人 — 历史 K 线磁盘缓存
+
+按 (symbol, interval) 将已下载的 K 线持久化到本地，重复回测时直接读取磁盘，
+仅对缺失的尾部区间做增量拉取。缓存有效期为「最新一根 K 线收盘前」。
+文件读写与解析在线程池中执行，不阻塞 API 进程的事件循环。
+"""
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import orjson
+from binance.helpers import interval_to_milliseconds
+
+logger = logging.getLogger(__name__)
+
+# NOTE: 可通过 KLINE_CACHE_DIR 覆盖，容器内建议挂载到持久卷
+CACHE_DIR = Path(os.getenv("KLINE_CACHE_DIR", str(Path.home() / ".cache" / "binancebot" / "klines")))
+
+DAY_MS = 86_400_000
+
+# 缓存文件最多保留的天数 (单次请求窗口更长时按请求窗口保留)，超出部分在写回前裁掉，文件不再无限增长
+KLINE_CACHE_MAX_DAYS = 90
+
+# 增量拉取函数：接收起始时间戳 (毫秒)，返回从该时间起的 K 线
+KlineFetcher = Callable[[int], Awaitable[list[list]]]
+
+
+def _cachePath(symbol: str, interval: str) -> Path:
+    return CACHE_DIR / f"{symbol.upper()}_{interval}.json"
+
+
+def _readCache(path: Path) -> list[list]:
+    try:
+        return orjson.loads(path.read_bytes())
+    except FileNotFoundError:
+        return []
+    except Exception as e:
+        logger.warning("⚠️ K 线缓存损坏，忽略并重新拉取: %s (%s)", path, e)
+        return []
+
+
+def _writeCache(path: Path, klines: list[list]) -> None:
+    """原子写入：先写临时文件再替换，避免多进程并发读到半截文件"""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmpPath = path.with_suffix(f".{os.getpid()}.tmp")
+        tmpPath.write_bytes(orjson.dumps(klines))
+        os.replace(tmpPath, path)
+    except OSError as e:
+        logger.warning("⚠️ K 线缓存写入失败: %s (%s)", path, e)
+
+
+async def load_klines(
+    symbol: str,
+    interval: str,
+    days: int,
+    fetcher: KlineFetcher,
+) -> list[list]:
+    """
+    读取最近 days 天的 K 线，优先命中磁盘缓存。
+
+    @param symbol 交易对
+    @param interval K 线周期
+    @param days 回看天数
+    @param fetcher 增量拉取函数，fetcher(startMs) -> K 线列表
+    @returns 开盘时间 >= now - days 的 K 线
+    """
+    path = _cachePath(symbol, interval)
+    nowMs = int(time.time() * 1000)
+    startMs = nowMs - days * DAY_MS
+    intervalMs = interval_to_milliseconds(interval) or 0
+
+    cached = await asyncio.to_thread(_readCache, path)
+
+    # 缓存未覆盖请求窗口起点时整体重拉
+    if cached and cached[0][0] > startMs + intervalMs:
+        cached = []
+
+    if cached and nowMs < cached[-1][6]:
+        logger.debug("✅ K 线磁盘缓存命中: %s %s", symbol, interval)
+    else:
+        # NOTE: 从最后一根 (可能未收盘) K 线的开盘时间开始增量拉取，覆盖其旧值
+        fetchFrom = cached[-1][0] if cached else startMs
+        while True:
+            batch = await fetcher(fetchFrom)
+            if not batch:
+                break
+            cached = [k for k in cached if k[0] < batch[0][0]] + batch
+            if batch[-1][6] >= nowMs:
+                break
+            fetchFrom = batch[-1][0] + intervalMs
+
+        keepFromMs = nowMs - max(days, KLINE_CACHE_MAX_DAYS) * DAY_MS
+        cached = [k for k in cached if k[0] >= keepFromMs]
+        if cached:
+            await asyncio.to_thread(_writeCache, path, cached)
+            logger.debug("💾 K 线缓存已更新: %s %s (%d 根)", symbol, interval, len(cached))
+
+    return [k for k in cached if k[0] >= startMs]
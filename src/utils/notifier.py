@@ -10,6 +10,8 @@ from collections import deque
 
 import aiohttp
 
+from src.utils.http import get_shared_session
+
 logger = logging.getLogger(__name__)
 
 # Telegram Bot API 基础地址
@@ -28,14 +30,21 @@ class Notifier:
     避免突发大量通知触发 Telegram API 限流。
     """
 
-    def __init__(self, botToken: str = "", chatId: str = "", proxyUrl: str | None = None) -> None:
+    def __init__(
+        self,
+        botToken: str = "",
+        chatId: str = "",
+        proxyUrl: str | None = None,
+        session: aiohttp.ClientSession | None = None,
+    ) -> None:
         self._botToken = botToken
         self._chatId = chatId
         self._proxyUrl = proxyUrl
         self._enabled = bool(botToken and chatId)
         self._queue: deque[str] = deque(maxlen=MAX_QUEUE_SIZE)
         self._sendTask: asyncio.Task | None = None
-        self._session: aiohttp.ClientSession | None = None
+        # NOTE: session 由外部 (默认为进程级共享连接池) 持有，通知器不负责关闭
+        self._session: aiohttp.ClientSession | None = session
 
         if self._enabled:
             logger.info("📱 Telegram 通知已启用 (代理: %s)", proxyUrl or "直连")
@@ -47,7 +56,8 @@ class Notifier:
         if not self._enabled:
             return
         # NOTE: 显式注入代理，不依赖 os.environ 的全局生效时机
-        self._session = aiohttp.ClientSession()
+        if self._session is None:
+            self._session = get_shared_session()
         self._sendTask = asyncio.create_task(self._sendLoop())
         logger.debug("Telegram 通知后台任务已启动")
 
@@ -59,8 +69,6 @@ class Notifier:
                 await self._sendTask
             except asyncio.CancelledError:
                 pass
-        if self._session:
-            await self._session.close()
         logger.debug("Telegram 通知后台任务已停止")
 
     def notify(self, message: str) -> None:
@@ -0,0 +1,81 @@
+"""
+参数扫描 (多进程 + 共享内存) 回测单元测试
+"""
+from decimal import Decimal
+from multiprocessing import shared_memory
+from typing import Any
+
+import pytest
+
+import src.models.notification  # noqa: F401  注册全部 ORM 映射，BotConfig 才能实例化
+from src.engine import backtest_engine
+from src.engine.backtest_engine import BacktestEngine
+from src.models.bot import BotConfig
+from src.strategies.base_strategy import BaseStrategy
+
+
+class BuyOnceStrategy(BaseStrategy):
+    """首根 K 线按 parameters["qty"] 市价买入并持有 (模块级定义，子进程可按名导入)"""
+
+    async def initialize(self) -> None:
+        self._bought = False
+
+    async def on_price_update(self, price: Decimal, idx: int | None = None) -> None:
+        if not self._bought:
+            self._bought = True
+            await self._client.createOrder(
+                symbol=self.bot_config.symbol, side="BUY", type="MARKET",
+                quantity=Decimal(str(self.bot_config.parameters["qty"])),
+            )
+
+    async def on_order_update(self, event: dict[str, Any]) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+def makeConfig(qty: float) -> BotConfig:
+    return BotConfig(
+        id=0, user_id=1, name=f"sweep_{qty}", symbol="BTCUSDT", strategy_type="grid",
+        parameters={"qty": qty}, total_investment=Decimal("1000"), is_testnet=True,
+    )
+
+
+def makeKlines(closes: list[float]) -> list[list]:
+    return [[i, c, c, c, c, 0] for i, c in enumerate(closes)]
+
+
+class TestRunSweep:
+    """run_sweep：结果顺序与配置一致，共享内存用后即释放"""
+
+    def test_twoConfigSweep(self, monkeypatch) -> None:
+        created = []
+        realSharedMemory = shared_memory.SharedMemory
+
+        def recordingSharedMemory(*args, **kwargs):
+            shm = realSharedMemory(*args, **kwargs)
+            created.append(shm.name)
+            return shm
+
+        monkeypatch.setattr(backtest_engine.shared_memory, "SharedMemory", recordingSharedMemory)
+
+        results = BacktestEngine.run_sweep(
+            BuyOnceStrategy, [makeConfig(1.0), makeConfig(2.0)], makeKlines([100.0, 90.0, 120.0, 110.0]),
+        )
+
+        assert len(results) == 2
+        # 首根 100 买入，末根 110：每单位盈利 10
+        assert results[0]["total_pnl"] == pytest.approx(10.0)
+        assert results[1]["total_pnl"] == pytest.approx(20.0)
+        assert results[0]["trade_count"] == results[1]["trade_count"] == 1
+        # 2 单位持仓在 90 处回撤 20 / 1000
+        assert results[1]["max_drawdown"] == pytest.approx(2.0)
+
+        # 父进程只创建一段共享内存，扫描结束后已 unlink
+        assert len(created) == 1
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=created[0])
+
+    def test_emptyConfigs(self) -> None:
+        assert BacktestEngine.run_sweep(BuyOnceStrategy, [], makeKlines([1.0])) == []
@@ -104,6 +104,16 @@ class TestSettings:
         s.validate()
 
 
+    def test_gridLevels(self) -> None:
+        """float 网格价位应与 Decimal 等差网格一致"""
+        s = Settings(gridLowerPrice=Decimal("60000"), gridUpperPrice=Decimal("70000"), gridCount=10)
+        levels = s.gridLevels()
+        assert len(levels) == 11
+        assert levels[0] == 60000.0
+        assert levels[-1] == 70000.0
+        assert levels[1] - levels[0] == pytest.approx(1000.0)
+
+
 class TestLoadSettings:
     """配置文件加载测试"""
 
@@ -142,6 +152,24 @@ class TestLoadSettings:
         finally:
             os.unlink(tmpPath)
 
+    def test_loadSettingsCached(self) -> None:
+        """相同路径重复加载应返回缓存实例，cache_clear 后重新解析"""
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".env", delete=False
+        ) as f:
+            f.write("TRADING_SYMBOL=BNBUSDT\n")
+            tmpPath = f.name
+
+        try:
+            first = loadSettings(envPath=tmpPath)
+            assert loadSettings(envPath=tmpPath) is first
+
+            loadSettings.cache_clear()
+            assert loadSettings(envPath=tmpPath) is not first
+        finally:
+            loadSettings.cache_clear()
+            os.unlink(tmpPath)
+
     def test_validateGridCountExceedsMaxOrders(self) -> None:
         """网格数量超过最大挂单数应抛出 ValueError"""
         s = Settings(
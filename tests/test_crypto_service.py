@@ -0,0 +1,102 @@
+"""
+API Secret 明文 L1 缓存单元测试
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import crypto_service as crypto_module
+from src.services.crypto_service import CryptoService, SECRET_CACHE_TTL
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(crypto_module, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+@pytest.fixture
+def service(monkeypatch) -> CryptoService:
+    """统计真实解密次数的 CryptoService"""
+    svc = CryptoService()
+    svc.decrypt_calls = 0
+    realDecrypt = svc.decrypt_user_secret
+
+    def countingDecrypt(encrypted_dek: str, encrypted_secret: str) -> str:
+        svc.decrypt_calls += 1
+        return realDecrypt(encrypted_dek, encrypted_secret)
+
+    monkeypatch.setattr(svc, "decrypt_user_secret", countingDecrypt)
+    return svc
+
+
+def makeSecret(svc: CryptoService, secret: str = "s3cret") -> tuple[str, str]:
+    _, encryptedDek = svc.generate_user_dek()
+    return encryptedDek, svc.encrypt_secret_with_dek(encryptedDek, secret)
+
+
+def cachedBuffer(svc: CryptoService, userId: int, apiKeyId: int) -> bytearray:
+    return next(buf for key, (_, buf) in svc._secret_cache.items() if key[:2] == (userId, apiKeyId))
+
+
+class TestSecretCache:
+    """TTL、淘汰清零与主动失效"""
+
+    def test_hitWithinTtl(self, service, clock) -> None:
+        dek, secret = makeSecret(service)
+        assert service.decrypt_api_secret(1, 1, dek, secret) == "s3cret"
+        clock.now += SECRET_CACHE_TTL - 1
+        assert service.decrypt_api_secret(1, 1, dek, secret) == "s3cret"
+        assert service.decrypt_calls == 1
+
+    def test_expiredEntryRedecryptedAndZeroed(self, service, clock) -> None:
+        dek, secret = makeSecret(service)
+        service.decrypt_api_secret(1, 1, dek, secret)
+        stale = cachedBuffer(service, 1, 1)
+        clock.now += SECRET_CACHE_TTL + 1
+        assert service.decrypt_api_secret(1, 1, dek, secret) == "s3cret"
+        assert service.decrypt_calls == 2
+        assert stale == bytearray(len(stale)) and len(stale) > 0
+
+    def test_lruEvictionZeroesPlaintext(self, service, clock, monkeypatch) -> None:
+        monkeypatch.setattr(crypto_module, "SECRET_CACHE_MAXSIZE", 2)
+        entries = [makeSecret(service, f"secret-{i}") for i in range(3)]
+        service.decrypt_api_secret(1, 0, *entries[0])
+        oldest = cachedBuffer(service, 1, 0)
+        service.decrypt_api_secret(1, 1, *entries[1])
+        service.decrypt_api_secret(1, 2, *entries[2])
+        assert len(service._secret_cache) == 2
+        assert oldest == bytearray(len(oldest))
+        assert {k[1] for k in service._secret_cache} == {1, 2}
+
+    def test_invalidateForcesRedecrypt(self, service, clock) -> None:
+        dek, secret = makeSecret(service)
+        service.decrypt_api_secret(1, 1, dek, secret)
+        buf = cachedBuffer(service, 1, 1)
+        service.invalidate_secrets(1, 1)
+        assert buf == bytearray(len(buf))
+        assert service.decrypt_api_secret(1, 1, dek, secret) == "s3cret"
+        assert service.decrypt_calls == 2
+
+    def test_keyRotationThenInvalidateUser(self, service, clock) -> None:
+        dek, secret = makeSecret(service, "old-secret")
+        service.decrypt_api_secret(1, 1, dek, secret)
+        service.decrypt_api_secret(2, 5, *makeSecret(service, "other-user"))
+        oldBuf = cachedBuffer(service, 1, 1)
+
+        # DEK 轮换后重新加密：旧明文整体失效，新密文必须重新解密
+        newDek, newSecret = makeSecret(service, "new-secret")
+        service.invalidate_secrets(1)
+        assert oldBuf == bytearray(len(oldBuf))
+        assert [k[0] for k in service._secret_cache] == [2]
+        assert service.decrypt_api_secret(1, 1, newDek, newSecret) == "new-secret"
+        assert service.decrypt_calls == 3
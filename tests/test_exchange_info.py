@@ -0,0 +1,123 @@
+"""
+交易对精度加载 (exchangeInfo) 单元测试
+"""
+from decimal import Decimal
+
+import pytest
+from binance import AsyncClient
+
+from src.exchanges import binance_client
+from src.exchanges.binance_client import BinanceClient, ClientConfig
+from src.utils.rate_limiter import RateLimiter
+
+SYMBOL_INFO = {
+    "symbol": "BTCUSDT",
+    "filters": [
+        {"filterType": "PRICE_FILTER", "tickSize": "0.01000000"},
+        {"filterType": "LOT_SIZE", "stepSize": "0.00001000", "minQty": "0.00001000"},
+        {"filterType": "NOTIONAL", "minNotional": "5.00000000"},
+    ],
+}
+
+
+class FakeAsyncClient:
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def _get(self, path: str, **kwargs):
+        self.calls.append(("_get", path, kwargs))
+        return {"symbols": [SYMBOL_INFO]}
+
+    async def get_symbol_info(self, symbol: str):
+        self.calls.append(("get_symbol_info", symbol))
+        return SYMBOL_INFO if symbol == "BTCUSDT" else None
+
+
+def makeClient(symbol: str = "BTCUSDT") -> tuple[BinanceClient, FakeAsyncClient]:
+    client = BinanceClient(ClientConfig("k", "s", True, symbol), RateLimiter())
+    fake = FakeAsyncClient()
+    client._client = fake
+    return client, fake
+
+
+class TestLoadExchangeInfo:
+    """单交易对请求与公开接口回退"""
+
+    @pytest.mark.asyncio
+    async def test_singleSymbolRequest(self) -> None:
+        client, fake = makeClient()
+        await client._loadExchangeInfo()
+        assert fake.calls == [("_get", "exchangeInfo", {"data": {"symbol": "BTCUSDT"}})]
+        assert client.formatPrice(Decimal("123.4567")) == "123.45"
+        assert client.formatQuantity(Decimal("0.1234567")) == "0.12345"
+
+    @pytest.mark.asyncio
+    async def test_fallbackToPublicApi(self, monkeypatch) -> None:
+        monkeypatch.setattr(binance_client, "_SYMBOL_EXCHANGE_INFO_SUPPORTED", False)
+        client, fake = makeClient()
+        await client._loadExchangeInfo()
+        assert fake.calls == [("get_symbol_info", "BTCUSDT")]
+        assert client.formatPrice(Decimal("123.4567")) == "123.45"
+
+    @pytest.mark.asyncio
+    async def test_unknownSymbolKeepsDefaults(self, monkeypatch) -> None:
+        monkeypatch.setattr(binance_client, "_SYMBOL_EXCHANGE_INFO_SUPPORTED", False)
+        client, _ = makeClient("NOPEUSDT")
+        before = (client._pricePrecision, client._quantityPrecision)
+        await client._loadExchangeInfo()
+        assert (client._pricePrecision, client._quantityPrecision) == before
+
+    def test_signatureProbe(self) -> None:
+        assert binance_client._forwardsRequestParams(lambda path, **kwargs: None)
+        assert binance_client._forwardsRequestParams(lambda path, data=None: None)
+        assert not binance_client._forwardsRequestParams(lambda path, signed=False: None)
+        assert not binance_client._forwardsRequestParams(None)
+
+
+class FakeResponse:
+    status = 200
+    headers: dict = {}
+
+    async def text(self) -> str:
+        return '{"symbols": []}'
+
+    async def json(self) -> dict:
+        return {"symbols": [SYMBOL_INFO]}
+
+    async def __aenter__(self) -> "FakeResponse":
+        return self
+
+    async def __aexit__(self, *exc) -> bool:
+        return False
+
+
+class FakeHttpSession:
+    """替换 AsyncClient 的 aiohttp 会话，只记录请求 URL，不走网络"""
+
+    def __init__(self) -> None:
+        self.urls: list[str] = []
+
+    def get(self, url, **kwargs) -> FakeResponse:
+        self.urls.append(str(url))
+        return FakeResponse()
+
+
+class TestInstalledPythonBinance:
+    """针对实际安装的 python-binance：库升级改动 _get 时这里先失败，而不是静默回退到全量 exchangeInfo"""
+
+    def test_installedSignatureSupported(self) -> None:
+        assert binance_client._forwardsRequestParams(AsyncClient._get)
+        assert binance_client._SYMBOL_EXCHANGE_INFO_SUPPORTED is True
+
+    @pytest.mark.asyncio
+    async def test_symbolReachesQueryString(self) -> None:
+        asyncClient = AsyncClient("k", "s")
+        realSession, asyncClient.session = asyncClient.session, FakeHttpSession()
+        try:
+            client = BinanceClient(ClientConfig("k", "s", False, "BTCUSDT"), RateLimiter())
+            info = await client._fetchSymbolInfo(asyncClient)
+        finally:
+            await realSession.close()
+        assert info == SYMBOL_INFO
+        assert len(asyncClient.session.urls) == 1
+        assert asyncClient.session.urls[0].endswith("/exchangeInfo?symbol=BTCUSDT")
@@ -0,0 +1,99 @@
+"""
+历史 K 线磁盘缓存单元测试
+"""
+import threading
+import time
+
+import orjson
+import pytest
+
+from src.utils import kline_cache
+from src.utils.kline_cache import DAY_MS, load_klines
+
+HOUR_MS = 3_600_000
+
+
+def makeKline(openMs: int) -> list:
+    return [openMs, "1", "1", "1", "1", "0", openMs + HOUR_MS - 1]
+
+
+class FakeFetcher:
+    """按起始时间返回至当前时刻为止的 1h K 线 (单批最多 1000 根)"""
+
+    def __init__(self, nowMs: int) -> None:
+        self.nowMs = nowMs
+        self.starts: list[int] = []
+
+    async def __call__(self, startMs: int) -> list[list]:
+        self.starts.append(startMs)
+        openMs = startMs - startMs % HOUR_MS
+        batch = []
+        while openMs <= self.nowMs and len(batch) < 1000:
+            batch.append(makeKline(openMs))
+            openMs += HOUR_MS
+        return batch
+
+
+@pytest.fixture
+def cacheDir(tmp_path, monkeypatch):
+    monkeypatch.setattr(kline_cache, "CACHE_DIR", tmp_path)
+    return tmp_path
+
+
+class TestLoadKlines:
+    """增量拉取、文件裁剪与线程池 IO"""
+
+    @pytest.mark.asyncio
+    async def test_hitSkipsFetcher(self, cacheDir) -> None:
+        fetcher = FakeFetcher(int(time.time() * 1000))
+        first = await load_klines("BTCUSDT", "1h", 2, fetcher)
+        calls = len(fetcher.starts)
+        second = await load_klines("BTCUSDT", "1h", 2, fetcher)
+        assert second == first and len(fetcher.starts) == calls
+        assert len(first) >= 47
+
+    @pytest.mark.asyncio
+    async def test_cacheFileTrimmedToWindow(self, cacheDir, monkeypatch) -> None:
+        monkeypatch.setattr(kline_cache, "KLINE_CACHE_MAX_DAYS", 3)
+        nowMs = int(time.time() * 1000)
+        # 预置一份覆盖 10 天、且最新一根已收盘的旧缓存
+        staleFrom = nowMs - 10 * DAY_MS
+        stale = [makeKline(t) for t in range(staleFrom - staleFrom % HOUR_MS, nowMs - 2 * HOUR_MS, HOUR_MS)]
+        (cacheDir / "BTCUSDT_1h.json").write_bytes(orjson.dumps(stale))
+
+        fetcher = FakeFetcher(nowMs)
+        result = await load_klines("BTCUSDT", "1h", 1, fetcher)
+
+        # 只增量拉取尾部
+        assert fetcher.starts == [stale[-1][0]]
+        assert all(k[0] >= nowMs - DAY_MS for k in result)
+        stored = orjson.loads((cacheDir / "BTCUSDT_1h.json").read_bytes())
+        assert stored[0][0] >= nowMs - 3 * DAY_MS
+        assert stored[-1][0] == result[-1][0]
+
+    @pytest.mark.asyncio
+    async def test_longerRequestKeepsItsWindow(self, cacheDir, monkeypatch) -> None:
+        monkeypatch.setattr(kline_cache, "KLINE_CACHE_MAX_DAYS", 1)
+        nowMs = int(time.time() * 1000)
+        await load_klines("BTCUSDT", "1h", 5, FakeFetcher(nowMs))
+        stored = orjson.loads((cacheDir / "BTCUSDT_1h.json").read_bytes())
+        assert stored[0][0] < nowMs - 4 * DAY_MS
+
+    @pytest.mark.asyncio
+    async def test_fileIoOffEventLoop(self, cacheDir, monkeypatch) -> None:
+        threads = []
+        realRead, realWrite = kline_cache._readCache, kline_cache._writeCache
+
+        def read(path):
+            threads.append(threading.current_thread())
+            return realRead(path)
+
+        def write(path, klines):
+            threads.append(threading.current_thread())
+            realWrite(path, klines)
+
+        monkeypatch.setattr(kline_cache, "_readCache", read)
+        monkeypatch.setattr(kline_cache, "_writeCache", write)
+        await load_klines("BTCUSDT", "1h", 1, FakeFetcher(int(time.time() * 1000)))
+        assert len(threads) == 2
+        assert all(t is not threading.main_thread() for t in threads)
@@ -0,0 +1,94 @@
+"""
+BinanceClient K 线缓存 (实例内存 + 可选共享 Redis) 单元测试
+"""
+import subprocess
+import sys
+
+import orjson
+import pytest
+
+from src.exchanges.binance_client import BinanceClient, ClientConfig
+from src.utils.rate_limiter import RateLimiter
+
+KLINES = [[1, "1", "1", "1", "1", "0", 2]]
+
+
+class FakeAsyncClient:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def get_klines(self, **kwargs):
+        self.calls += 1
+        return KLINES
+
+
+class FakeRedis:
+    def __init__(self, down: bool = False) -> None:
+        self.store: dict[str, bytes] = {}
+        self.down = down
+        self.ops = 0
+
+    async def get(self, key: str):
+        self.ops += 1
+        if self.down:
+            raise ConnectionError("redis down")
+        return self.store.get(key)
+
+    async def setex(self, key: str, ttl: int, value: bytes) -> None:
+        self.ops += 1
+        if self.down:
+            raise ConnectionError("redis down")
+        self.store[key] = value
+
+
+def makeClient(klineRedis=None) -> tuple[BinanceClient, FakeAsyncClient]:
+    client = BinanceClient(ClientConfig("k", "s", True, "BTCUSDT"), RateLimiter(), klineRedis=klineRedis)
+    fake = FakeAsyncClient()
+    client._client = fake
+    return client, fake
+
+
+class TestKlineCache:
+    """共享缓存可选注入，不可达时降级且不反复重试"""
+
+    def test_clientImportDoesNotPullDatabase(self) -> None:
+        code = (
+            "import sys, src.exchanges.binance_client; "
+            "sys.exit(any(m.startswith(('src.db', 'sqlalchemy', 'redis')) for m in sys.modules))"
+        )
+        assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+    @pytest.mark.asyncio
+    async def test_localCacheOnlyByDefault(self) -> None:
+        client, fake = makeClient()
+        assert await client.getKlines("1h", 1) == KLINES
+        assert await client.getKlines("1h", 1) == KLINES
+        assert fake.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_sharedCacheHitSkipsRest(self) -> None:
+        redis = FakeRedis()
+        redis.store["klines:testnet:BTCUSDT_1h_1"] = orjson.dumps(KLINES)
+        client, fake = makeClient(redis)
+        assert await client.getKlines("1h", 1) == KLINES
+        assert fake.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_sharedCacheFilledOnMiss(self) -> None:
+        redis = FakeRedis()
+        client, fake = makeClient(redis)
+        await client.getKlines("1h", 1)
+        assert fake.calls == 1
+        assert orjson.loads(redis.store["klines:testnet:BTCUSDT_1h_1"]) == KLINES
+
+    @pytest.mark.asyncio
+    async def test_unreachableRedisSuspended(self, caplog) -> None:
+        redis = FakeRedis(down=True)
+        client, fake = makeClient(redis)
+        assert await client.getKlines("1h", 1) == KLINES
+        assert await client.getKlines("4h", 1) == KLINES
+        assert fake.calls == 2
+        # 首次读取失败后暂停使用共享缓存，后续请求不再等待 Redis
+        assert redis.ops == 1
+        warnings = [r.message for r in caplog.records if "[KlineCache]" in r.getMessage()]
+        assert len(warnings) == 1
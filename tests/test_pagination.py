@@ -0,0 +1,201 @@
+"""
+机器人列表与通知流水的 keyset 分页测试
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Response
+
+from src.main import create_app
+from src.db.session import get_db, get_db_readonly
+from src.core.security import create_access_token
+from src.models.user import User
+from src.api.v1.bots import list_bots
+from src.api.v1.notifications import get_notifications
+
+
+class FakeResult:
+    """模拟 execute() / scalars() 的返回值"""
+
+    def __init__(self, rows: list) -> None:
+        self._rows = rows
+
+    def scalars(self) -> "FakeResult":
+        return self
+
+    def all(self) -> list:
+        return self._rows
+
+
+class FakeSession:
+    """按语句中的 id 游标 / LIMIT / OFFSET 对内存数据做倒序切片"""
+
+    def __init__(self, ids: list[int]) -> None:
+        self.rows = [SimpleNamespace(id=i) for i in sorted(ids, reverse=True)]
+        self.statements = []
+        self.userLookups = []
+
+    async def get(self, model, pk):
+        self.userLookups.append((model, pk))
+        return SimpleNamespace(id=pk, is_active=True)
+
+    def _apply(self, stmt) -> FakeResult:
+        self.statements.append(stmt)
+        afterId = stmt.compile().params.get("id_1")
+        rows = [r for r in self.rows if afterId is None or r.id < afterId]
+        offset = stmt._offset or 0
+        limit = stmt._limit
+        return FakeResult(rows[offset:None if limit is None else offset + limit])
+
+    async def scalars(self, stmt) -> FakeResult:
+        return self._apply(stmt)
+
+    async def execute(self, stmt) -> FakeResult:
+        return self._apply(stmt)
+
+
+USER = SimpleNamespace(id=1)
+
+
+async def asgiGet(app, path: str, query: str = "", token: str | None = None) -> tuple[int, dict, bytes]:
+    """不依赖 httpx，直接以 ASGI 协议发起一次 GET 请求"""
+    headers = [(b"host", b"test"), (b"origin", b"http://frontend.test")]
+    if token is not None:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 1234), "server": ("test", 80),
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    start = next(m for m in sent if m["type"] == "http.response.start")
+    headers = {k.decode().lower(): v.decode() for k, v in start["headers"]}
+    body = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    return start["status"], headers, body
+
+
+async def pageThrough(fetch) -> list[list[int]]:
+    """沿 X-Next-Cursor 翻页直到没有下一页"""
+    pages, cursor = [], None
+    while True:
+        response = Response()
+        rows = await fetch(response, cursor)
+        pages.append([r.id for r in rows])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+        cursor = int(cursor)
+
+
+class TestKeysetPagination:
+    """游标翻页"""
+
+    @pytest.mark.asyncio
+    async def test_botsPageThrough(self) -> None:
+        db = FakeSession(list(range(1, 8)))
+        pages = await pageThrough(lambda resp, cursor: list_bots(
+            resp, db=db, current_user=USER, api_key_id=None, after_id=cursor, limit=3, skip=0,
+        ))
+        assert pages == [[7, 6, 5], [4, 3, 2], [1]]
+
+    @pytest.mark.asyncio
+    async def test_notificationsPageThrough(self) -> None:
+        db = FakeSession(list(range(1, 7)))
+        pages = await pageThrough(lambda resp, cursor: get_notifications(
+            resp, limit=2, after_id=cursor, db=db, current_user=USER,
+        ))
+        # 最后一页恰好满页时会多翻一次空页
+        assert pages == [[6, 5], [4, 3], [2, 1], []]
+
+    @pytest.mark.asyncio
+    async def test_deprecatedSkipStillOffsets(self) -> None:
+        db = FakeSession(list(range(1, 8)))
+        bots = await list_bots(
+            Response(), db=db, current_user=USER, api_key_id=None, after_id=None, limit=2, skip=3,
+        )
+        assert [b.id for b in bots] == [4, 3]
+
+
+class TestReadOnlyEndpoints:
+    """列表接口走只读 (AUTOCOMMIT) 会话，越界 limit 在参数校验阶段即被拒绝"""
+
+    @pytest.fixture
+    def app(self):
+        app = create_app()
+        db = FakeSession([1, 2, 3])
+
+        async def fakeDb():
+            yield db
+
+        async def writableDb():
+            raise AssertionError("只读接口不应申请读写会话")
+            yield
+
+        app.dependency_overrides[get_db_readonly] = fakeDb
+        app.dependency_overrides[get_db] = writableDb
+        app.state.fakeDb = db
+        app.state.token = create_access_token(subject=USER.id)
+        return app
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("path, query", [
+        ("/api/v1/bots/", "limit=0"),
+        ("/api/v1/bots/", "limit=-1"),
+        ("/api/v1/bots/", "limit=501"),
+        ("/api/v1/bots/", "skip=-1"),
+        ("/api/v1/notifications/", "limit=0"),
+        ("/api/v1/notifications/", "limit=-5"),
+        ("/api/v1/notifications/", "limit=101"),
+    ])
+    async def test_outOfRangeRejected(self, app, path: str, query: str) -> None:
+        status, _, _ = await asgiGet(app, path, query, app.state.token)
+        assert status == 422
+        assert app.state.fakeDb.statements == []
+
+    @pytest.mark.asyncio
+    async def test_cursorHeaderExposedToBrowser(self, app) -> None:
+        status, headers, body = await asgiGet(app, "/api/v1/notifications/", "limit=2", app.state.token)
+        assert status == 200
+        assert json.loads(body) == [{"id": 3}, {"id": 2}]
+        assert headers["x-next-cursor"] == "2"
+        assert "X-Next-Cursor" in headers["access-control-expose-headers"]
+
+    @pytest.mark.asyncio
+    async def test_apiKeyListUsesReadOnlySession(self, app) -> None:
+        app.state.fakeDb.rows = [SimpleNamespace(id=9, exchange="binance", api_key="k", is_testnet=False)]
+        status, _, body = await asgiGet(app, "/api/v1/keys/", token=app.state.token)
+        assert status == 200
+        assert json.loads(body) == [{"id": 9, "exchange": "binance", "api_key": "k", "is_testnet": False}]
+        assert len(app.state.fakeDb.statements) == 1
+        # 用户鉴权查询与列表查询落在同一个只读会话上
+        assert app.state.fakeDb.userLookups == [(User, USER.id)]
+
+    @pytest.mark.asyncio
+    async def test_dashboardOverviewUsesReadOnlySession(self, app, monkeypatch) -> None:
+        from src.api.v1 import dashboard
+
+        async def passthrough(key, ttl, compute):
+            return {"key": key}
+
+        monkeypatch.setattr(dashboard, "cached_json", passthrough)
+        status, _, body = await asgiGet(app, "/api/v1/dashboard/overview", token=app.state.token)
+        assert status == 200
+        assert json.loads(body) == {"key": "v1:dash:overview:1:None"}
+        assert app.state.fakeDb.userLookups == [(User, USER.id)]
+
+    @pytest.mark.asyncio
+    async def test_missingTokenRejected(self, app) -> None:
+        status, _, _ = await asgiGet(app, "/api/v1/bots/")
+        assert status == 401
+        assert app.state.fakeDb.statements == []
@@ -0,0 +1,135 @@
+"""
+代理调度器 (最小载荷分桶 / 探活剔除) 单元测试
+"""
+import asyncio
+
+import pytest
+
+from src.engine.proxy_scheduler import ProxyScheduler, MAX_CONSECUTIVE_FAILURES
+
+PROXIES = ["http://a:1", "http://b:1", "http://c:1"]
+
+
+def assertConsistent(scheduler: ProxyScheduler) -> None:
+    """分桶与代理池一致，且 _min_load 等于实际最小载荷"""
+    rebuilt: dict[int, set] = {}
+    for url, load in scheduler._pool.items():
+        rebuilt.setdefault(load, set()).add(url)
+    assert scheduler._load_buckets == rebuilt
+    assert scheduler._min_load == min(scheduler._pool.values(), default=0)
+
+
+class FailingSession:
+    closed = False
+
+    def get(self, *args, **kwargs):
+        raise ConnectionError("unreachable")
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def scheduler(monkeypatch) -> ProxyScheduler:
+    monkeypatch.delenv("BINANCE_PROXY_POOL", raising=False)
+    return ProxyScheduler(PROXIES)
+
+
+class TestLoadBuckets:
+    """分配 / 回收始终落在最小载荷节点"""
+
+    def test_emptyPool(self, monkeypatch) -> None:
+        monkeypatch.delenv("BINANCE_PROXY_POOL", raising=False)
+        assert ProxyScheduler().get_best_proxy() is None
+
+    def test_acquireSpreadsEvenly(self, scheduler) -> None:
+        first = {scheduler.get_best_proxy() for _ in PROXIES}
+        assert first == set(PROXIES)
+        assert scheduler._min_load == 1
+        second = {scheduler.get_best_proxy() for _ in PROXIES}
+        assert second == set(PROXIES)
+        assertConsistent(scheduler)
+
+    def test_releaseLowersMinLoad(self, scheduler) -> None:
+        for _ in range(6):
+            scheduler.get_best_proxy()
+        scheduler.release_proxy("http://b:1")
+        assert scheduler._min_load == 1
+        # 下一次分配必然落到刚回收的节点
+        assert scheduler.get_best_proxy() == "http://b:1"
+        assertConsistent(scheduler)
+
+    def test_releaseNeverNegative(self, scheduler) -> None:
+        scheduler.release_proxy("http://a:1")
+        scheduler.release_proxy("http://unknown:1")
+        scheduler.release_proxy(None)
+        assert scheduler._pool["http://a:1"] == 0
+        assertConsistent(scheduler)
+
+    def test_addProxyResetsMinLoad(self, scheduler) -> None:
+        for _ in PROXIES:
+            scheduler.get_best_proxy()
+        scheduler.add_proxy("http://d:1")
+        assert scheduler._min_load == 0
+        assert scheduler.get_best_proxy() == "http://d:1"
+        assertConsistent(scheduler)
+
+
+class TestEviction:
+    """连续探活失败剔除后，_min_load 仍指向剩余节点的最小载荷"""
+
+    @pytest.mark.asyncio
+    async def test_evictAfterConsecutiveFailures(self, scheduler, monkeypatch) -> None:
+        # a 载荷 0，b / c 载荷 1
+        scheduler._pool = {"http://a:1": 0, "http://b:1": 1, "http://c:1": 1}
+        scheduler._rebuild_buckets()
+        session = FailingSession()
+        monkeypatch.setattr(scheduler, "_get_session", lambda url: session)
+        sem = asyncio.Semaphore(1)
+
+        for _ in range(MAX_CONSECUTIVE_FAILURES - 1):
+            await scheduler._check_node("http://a:1", sem)
+        assert "http://a:1" in scheduler._pool
+        assert scheduler._failures["http://a:1"] == MAX_CONSECUTIVE_FAILURES - 1
+
+        await scheduler._check_node("http://a:1", sem)
+        assert "http://a:1" not in scheduler._pool
+        assert "http://a:1" not in scheduler._failures
+        # 唯一的 0 载荷桶被清空，_min_load 恢复为 1
+        assert scheduler._min_load == 1
+        assertConsistent(scheduler)
+        assert scheduler.get_best_proxy() in {"http://b:1", "http://c:1"}
+        assertConsistent(scheduler)
+
+    @pytest.mark.asyncio
+    async def test_successResetsFailureCount(self, scheduler, monkeypatch) -> None:
+        sem = asyncio.Semaphore(1)
+        monkeypatch.setattr(scheduler, "_get_session", lambda url: FailingSession())
+        for _ in range(MAX_CONSECUTIVE_FAILURES - 1):
+            await scheduler._check_node("http://a:1", sem)
+
+        class OkResponse:
+            status = 200
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                pass
+
+        class OkSession(FailingSession):
+            def get(self, *args, **kwargs):
+                return OkResponse()
+
+        monkeypatch.setattr(scheduler, "_get_session", lambda url: OkSession())
+        await scheduler._check_node("http://a:1", sem)
+        assert "http://a:1" not in scheduler._failures
+        assert "http://a:1" in scheduler._pool
+
+    @pytest.mark.asyncio
+    async def test_evictAll(self, scheduler) -> None:
+        for url in PROXIES:
+            await scheduler._evict(url)
+        assert scheduler._pool == {} and scheduler._load_buckets == {}
+        assert scheduler._min_load == 0
+        assert scheduler.get_best_proxy() is None
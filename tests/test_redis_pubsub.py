@@ -0,0 +1,81 @@
+"""
+交易事件发件箱 (批量 pipeline 发布) 单元测试
+"""
+import asyncio
+
+import orjson
+import pytest
+
+from src.engine import redis_pubsub
+from src.engine.redis_pubsub import RedisEventBus, TRADE_EVENT_BATCH_SIZE
+
+
+class FakePipeline:
+    def __init__(self, sink: list) -> None:
+        self._sink = sink
+        self._queued = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+    def publish(self, channel: str, payload: bytes) -> None:
+        self._queued.append(payload)
+
+    async def execute(self) -> None:
+        self._sink.append(self._queued)
+
+
+class FakeRedis:
+    """记录每次 pipeline 发出的事件批次"""
+
+    def __init__(self) -> None:
+        self.batches: list[list[bytes]] = []
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self.batches)
+
+    @property
+    def published(self) -> list[int]:
+        return [orjson.loads(p)["bot_id"] for batch in self.batches for p in batch]
+
+
+@pytest.fixture
+def fakeRedis(monkeypatch) -> FakeRedis:
+    fake = FakeRedis()
+    monkeypatch.setattr(redis_pubsub, "redis_client", fake)
+    return fake
+
+
+class TestTradeEventOutbox:
+    """发件箱聚合与停止时的补发"""
+
+    @pytest.mark.asyncio
+    async def test_windowMergesIntoOnePipeline(self, fakeRedis) -> None:
+        bus = RedisEventBus()
+        for botId in range(3):
+            await bus.publish_trade_event(1, botId, "FILL", {})
+        await asyncio.sleep(0.05)
+        assert fakeRedis.batches and len(fakeRedis.batches) == 1
+        assert fakeRedis.published == [0, 1, 2]
+        await bus.stop()
+
+    @pytest.mark.asyncio
+    async def test_stopFlushesInFlightBatchAndQueue(self, fakeRedis, monkeypatch) -> None:
+        # 拉长聚合窗口，保证 stop() 时后台任务正持有在途批次
+        monkeypatch.setattr(redis_pubsub, "TRADE_EVENT_FLUSH_INTERVAL", 10)
+        bus = RedisEventBus()
+        total = TRADE_EVENT_BATCH_SIZE + 10
+        await bus.publish_trade_event(1, 0, "FILL", {})
+        await asyncio.sleep(0)
+        assert bus._pending and bus._outbox.empty()
+
+        for botId in range(1, total):
+            await bus.publish_trade_event(1, botId, "FILL", {})
+        await bus.stop()
+
+        assert fakeRedis.published == list(range(total))
+        assert all(len(batch) <= TRADE_EVENT_BATCH_SIZE for batch in fakeRedis.batches)
+        assert bus._flusher_task.done() and bus._pending == []
@@ -0,0 +1,68 @@
+"""
+JWT 签发与验签缓存单元测试
+"""
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import jwt
+import pytest
+
+from src.core import security
+from src.core.security import create_access_token, decode_access_token
+
+
+@pytest.fixture(autouse=True)
+def clearDecodeCache():
+    security._decode_verified.cache_clear()
+    yield
+    security._decode_verified.cache_clear()
+
+
+def tamperSignature(token: str) -> str:
+    head, payload, sig = token.split(".")
+    return ".".join((head, payload, ("A" if sig[0] != "A" else "B") + sig[1:]))
+
+
+class TestDecodeCache:
+    """验签结果缓存：命中缓存也不能放行伪造或过期的 token"""
+
+    def test_validTokenCached(self) -> None:
+        token = create_access_token(subject=42)
+        assert decode_access_token(token)["sub"] == "42"
+        assert decode_access_token(token)["sub"] == "42"
+        assert security._decode_verified.cache_info().hits == 1
+
+    def test_forgedTokenRejectedAfterGenuineCached(self) -> None:
+        token = create_access_token(subject=42)
+        assert decode_access_token(token) is not None
+        forged = tamperSignature(token)
+        for _ in range(2):
+            assert decode_access_token(forged) is None
+        # 失败的验签不占用缓存条目
+        assert security._decode_verified.cache_info().currsize == 1
+
+    def test_foreignKeyTokenRejected(self) -> None:
+        token = jwt.encode({"sub": "42", "exp": int(time.time()) + 60}, "other-secret", algorithm=security.ALGORITHM)
+        assert decode_access_token(token) is None
+        assert decode_access_token(token) is None
+
+    def test_expiredTokenRejectedOnCacheHit(self, monkeypatch) -> None:
+        token = create_access_token(subject=42, expires_delta=timedelta(minutes=5))
+        assert decode_access_token(token) is not None
+        future = time.time() + 600
+        monkeypatch.setattr(security, "time", SimpleNamespace(time=lambda: future))
+        assert decode_access_token(token) is None
+        assert security._decode_verified.cache_info().hits == 1
+
+    def test_audienceTokenRejected(self) -> None:
+        token = jwt.encode(
+            {"sub": "42", "exp": int(time.time()) + 60, "aud": "other-service"},
+            security._SIGNING_KEY, algorithm=security.ALGORITHM,
+        )
+        assert decode_access_token(token) is None
+
+    def test_payloadCopyIsolated(self) -> None:
+        token = create_access_token(subject=42)
+        decode_access_token(token)["sub"] = "tampered"
+        assert decode_access_token(token)["sub"] == "42"
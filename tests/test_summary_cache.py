@@ -0,0 +1,102 @@
+"""
+Redis 汇总缓存 (cache-aside) 与概览失效单元测试
+"""
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from src.services import summary_cache
+from src.services.summary_cache import cached_json, invalidate_overview, overview_cache_key
+from src.api.v1 import bots
+from src.models.bot import BotStatus
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+        self.down = False
+
+    def _check(self) -> None:
+        if self.down:
+            raise ConnectionError("redis down")
+
+    async def get(self, key: str):
+        self._check()
+        return self.store.get(key)
+
+    async def setex(self, key: str, ttl: int, value: bytes) -> None:
+        self._check()
+        self.store[key] = value
+
+    async def delete(self, *keys: str) -> int:
+        self._check()
+        return sum(self.store.pop(k, None) is not None for k in keys)
+
+
+@pytest.fixture
+def fakeRedis(monkeypatch) -> FakeRedis:
+    fake = FakeRedis()
+    monkeypatch.setattr(summary_cache, "redis_client", fake)
+    return fake
+
+
+class TestCachedJson:
+    """cache-aside 读写"""
+
+    @pytest.mark.asyncio
+    async def test_missThenHit(self, fakeRedis) -> None:
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return {"active_bots": 2, "total_profit": 1.5}
+
+        assert await cached_json("k", 30, compute) == {"active_bots": 2, "total_profit": 1.5}
+        assert await cached_json("k", 30, compute) == {"active_bots": 2, "total_profit": 1.5}
+        assert len(calls) == 1
+        assert orjson.loads(fakeRedis.store["k"])["active_bots"] == 2
+
+    @pytest.mark.asyncio
+    async def test_redisDownFallsBackToCompute(self, fakeRedis) -> None:
+        fakeRedis.down = True
+
+        async def compute():
+            return [1, 2]
+
+        assert await cached_json("k", 30, compute) == [1, 2]
+        await invalidate_overview(1, 2)  # 不抛异常
+
+
+class TestOverviewInvalidation:
+    """机器人状态变化后概览缓存立即失效"""
+
+    @pytest.mark.asyncio
+    async def test_invalidateOverviewKeys(self, fakeRedis) -> None:
+        for key in (overview_cache_key(1, None), overview_cache_key(1, 7), overview_cache_key(1, 8), overview_cache_key(2, None)):
+            fakeRedis.store[key] = b"{}"
+        await invalidate_overview(1, 7)
+        assert sorted(fakeRedis.store) == sorted([overview_cache_key(1, 8), overview_cache_key(2, None)])
+
+    @pytest.mark.asyncio
+    async def test_stopBotInvalidatesOverview(self, fakeRedis, monkeypatch) -> None:
+        bot = SimpleNamespace(id=3, api_key_id=7, status=BotStatus.RUNNING)
+
+        class FakeDb:
+            async def execute(self, stmt):
+                return SimpleNamespace(scalar_one_or_none=lambda: bot)
+
+            async def commit(self):
+                pass
+
+        async def fakeStop(botId: int) -> bool:
+            return True
+
+        monkeypatch.setattr(bots.strategy_manager, "stop_bot", fakeStop)
+        fakeRedis.store[overview_cache_key(1, None)] = b"{}"
+        fakeRedis.store[overview_cache_key(1, 7)] = b"{}"
+
+        await bots.stop_bot(3, db=FakeDb(), current_user=SimpleNamespace(id=1))
+
+        assert bot.status == BotStatus.STOPPED
+        assert fakeRedis.store == {}
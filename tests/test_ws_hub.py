@@ -0,0 +1,81 @@
+"""
+WebSocket Hub 私有消息合并推送单元测试
+"""
+import asyncio
+
+import orjson
+import pytest
+
+from src.engine import ws_hub as ws_hub_module
+from src.engine.ws_hub import ConnectionManager, PERSONAL_MAX_BATCH
+
+
+class FakeWebSocket:
+    def __init__(self) -> None:
+        self.frames: list[str] = []
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, payload: str) -> None:
+        self.frames.append(payload)
+
+    def decoded(self) -> list:
+        return [orjson.loads(frame) for frame in self.frames]
+
+
+@pytest.fixture
+def hub(monkeypatch) -> ConnectionManager:
+    # 缩短合并窗口以加快测试
+    monkeypatch.setattr(ws_hub_module, "PERSONAL_FLUSH_INTERVAL", 0.01)
+    return ConnectionManager()
+
+
+class TestPersonalMessageCoalescing:
+    """合并窗口、条数上限与单条消息"""
+
+    @pytest.mark.asyncio
+    async def test_windowMergesIntoArrayFrame(self, hub) -> None:
+        ws = FakeWebSocket()
+        await hub.connect(ws, user_id=1)
+        for i in range(3):
+            await hub.send_personal_message({"seq": i}, 1)
+        assert ws.frames == []
+        await asyncio.sleep(0.05)
+        assert ws.decoded() == [[{"seq": 0}, {"seq": 1}, {"seq": 2}]]
+
+    @pytest.mark.asyncio
+    async def test_capForcesImmediateFlush(self, hub) -> None:
+        ws = FakeWebSocket()
+        await hub.connect(ws, user_id=1)
+        for i in range(PERSONAL_MAX_BATCH + 1):
+            await hub.send_personal_message({"seq": i}, 1)
+        # 达到上限的一批不等窗口立即推送，超出的一条留给定时任务
+        assert len(ws.frames) == 1
+        assert [m["seq"] for m in ws.decoded()[0]] == list(range(PERSONAL_MAX_BATCH))
+        await asyncio.sleep(0.05)
+        assert ws.decoded()[1] == {"seq": PERSONAL_MAX_BATCH}
+        assert hub._flush_tasks == {} and hub._pending == {}
+
+    @pytest.mark.asyncio
+    async def test_singleMessageSentAsObject(self, hub) -> None:
+        ws = FakeWebSocket()
+        await hub.connect(ws, user_id=1)
+        await hub.send_personal_message({"type": "FILL"}, 1)
+        await asyncio.sleep(0.05)
+        assert ws.decoded() == [{"type": "FILL"}]
+
+    @pytest.mark.asyncio
+    async def test_offlineUserDropped(self, hub) -> None:
+        await hub.send_personal_message({"type": "FILL"}, 99)
+        assert hub._pending == {} and hub._flush_tasks == {}
+
+    @pytest.mark.asyncio
+    async def test_disconnectCancelsPendingFlush(self, hub) -> None:
+        ws = FakeWebSocket()
+        await hub.connect(ws, user_id=1)
+        await hub.send_personal_message({"type": "FILL"}, 1)
+        hub.disconnect(ws)
+        await asyncio.sleep(0.05)
+        assert ws.frames == []
+        assert hub._pending == {} and hub._flush_tasks == {}